@@ -0,0 +1,79 @@
+"""Benchmark checking Markdown code blocks.
+
+Measures the time to check a corpus of Markdown code blocks by rendering every block with a new
+``markdown-it-py`` pipeline, as a naive checker would, by the batch checks of the Markdown plugin
+and end to end by checking rst documents containing the blocks.
+
+Usage::
+
+    python benchmarks/markdown_blocks.py
+    python benchmarks/markdown_blocks.py --blocks 10000 --blocks-per-document 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import typing as t
+
+import markdown_it
+
+from rstcheck import Session, _checkers
+
+EXAMPLE_BLOCKS = (
+    "# Title {index}\n\nSome *text* with a [link](https://example.com/{index}) and `code`.\n",
+    "- item {index}\n- item with **bold** text\n\n```python\nprint({index})\n```\n",
+    "See [the docs][docs] for block {index}.\n\n[docs]: https://example.com/docs\n",
+    "> Quote {index}\n>\n> | a | b |\n",
+)
+
+
+def measure(function: t.Callable[[], object]) -> float:
+    """Measure the wall time of a function.
+
+    :param function: Function to call
+    :return: Wall time in seconds
+    """
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--blocks", type=int, default=5000)
+    parser.add_argument("--blocks-per-document", type=int, default=50)
+    args = parser.parse_args()
+
+    sources = [
+        EXAMPLE_BLOCKS[index % len(EXAMPLE_BLOCKS)].format(index=index)
+        for index in range(args.blocks)
+    ]
+    documents = [
+        "Title\n=====\n\n"
+        + "".join(
+            ".. code-block:: markdown\n\n"
+            + "".join(f"    {line}\n" if line else "\n" for line in source.splitlines())
+            + "\n"
+            for source in sources[start : start + args.blocks_per_document]
+        )
+        for start in range(0, args.blocks, args.blocks_per_document)
+    ]
+
+    session = Session()
+    results = {
+        "render per block": measure(
+            lambda: [markdown_it.MarkdownIt().render(source) for source in sources]
+        ),
+        "plugin batch": measure(lambda: _checkers.MarkdownChecker().check_batch(sources)),
+        "rst documents": measure(lambda: [session.check_text(document) for document in documents]),
+    }
+
+    print(f"{args.blocks} Markdown blocks in {len(documents)} documents; times in seconds")
+    for name, duration in results.items():
+        print(f"{name:<18}{duration:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
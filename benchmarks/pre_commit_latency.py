@@ -0,0 +1,75 @@
+"""Benchmark the latency of the CLI for the few files of a typical commit.
+
+Measures the wall time of ``rstcheck`` runs with and without ``--pre-commit`` for different
+numbers of files. Every run is a fresh interpreter, like the runs of a pre-commit hook.
+
+Usage::
+
+    python benchmarks/pre_commit_latency.py
+    python benchmarks/pre_commit_latency.py --files 1 3 32 --repeat 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+EXAMPLE_SOURCE = """
+Example
+=======
+
+Some text with a ``literal``.
+
+.. code-block:: python
+
+    print("Hello World")
+"""
+
+
+def measure(arguments: list[str], repeat: int) -> float:
+    """Measure the median wall time of a CLI run.
+
+    :param arguments: Arguments to pass to the CLI
+    :param repeat: Number of runs
+    :return: Median wall time in milliseconds
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(  # noqa: S603
+            [sys.executable, "-m", "rstcheck", *arguments], capture_output=True, check=True
+        )
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1000
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, nargs="+", default=[1, 3, 16, 64])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        files = []
+        for index in range(max(args.files)):
+            file = pathlib.Path(temp_dir) / f"file_{index}.rst"
+            file.write_text(EXAMPLE_SOURCE, encoding="utf-8")
+            files.append(str(file))
+
+        print(f"median wall time of {args.repeat} runs in milliseconds")
+        print(f"{'files':>6}{'default':>10}{'--pre-commit':>14}")
+        for file_count in args.files:
+            arguments = ["--config", "NONE", *files[:file_count]]
+            default = measure(arguments, args.repeat)
+            pre_commit = measure(["--pre-commit", *arguments], args.repeat)
+            print(f"{file_count:>6}{default:>10.1f}{pre_commit:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
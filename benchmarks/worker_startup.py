@@ -0,0 +1,104 @@
+"""Benchmark the startup of worker processes for parallel checks.
+
+Measures the time from starting the check of many small files until the first result arrives
+(time-to-first-result) and until all results arrived for different worker start methods and pool
+sizes. Every measurement runs in a fresh interpreter, so no start method profits from state warmed
+up by another measurement.
+
+Usage::
+
+    python benchmarks/worker_startup.py
+    python benchmarks/worker_startup.py --workers 8 32 64 --files 512
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+
+EXAMPLE_SOURCE = """
+Example
+=======
+
+Some text with a ``literal``.
+
+.. code-block:: python
+
+    print("Hello World")
+"""
+
+
+def measure(start_method: str, workers: int, files_dir: pathlib.Path) -> tuple[float, float]:
+    """Measure time-to-first-result and total time of a parallel check.
+
+    :param start_method: Start method of the worker processes
+    :param workers: Number of worker processes
+    :param files_dir: Directory with the files to check
+    :return: Seconds until the first and until the last result arrived
+    """
+    start = time.perf_counter()
+
+    from rstcheck_core import config  # noqa: PLC0415
+
+    from rstcheck import _runner  # noqa: PLC0415
+
+    main_runner = _runner.RstcheckMainRunner(
+        [files_dir], config.RstcheckConfig(recursive=True, config_path=pathlib.Path("NONE"))
+    )
+    main_runner.start_method = None if start_method == "auto" else start_method
+    main_runner._pool_size = workers  # noqa: SLF001
+
+    first_result = None
+    for _ in main_runner._run_checks_parallel():  # noqa: SLF001
+        if first_result is None:
+            first_result = time.perf_counter() - start
+    total = time.perf_counter() - start
+
+    return (first_result or total, total)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[8, 32, 64])
+    parser.add_argument("--files", type=int, default=256)
+    parser.add_argument(
+        "--start-methods",
+        nargs="+",
+        default=["auto", *multiprocessing.get_all_start_methods()],
+        help="'auto' uses the start method chosen by rstcheck",
+    )
+    parser.add_argument("--measure", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        (start_method, workers, files_dir) = args.measure
+        print(*measure(start_method, int(workers), pathlib.Path(files_dir)))
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        files_dir = pathlib.Path(temp_dir)
+        for index in range(args.files):
+            (files_dir / f"file_{index}.rst").write_text(EXAMPLE_SOURCE, encoding="utf-8")
+
+        print(f"{args.files} files; times in seconds")
+        print(f"{'start method':<14}{'workers':>8}{'first result':>14}{'all results':>13}")
+        for start_method in args.start_methods:
+            for workers in args.workers:
+                output = subprocess.run(  # noqa: S603
+                    [sys.executable, __file__, "--measure", start_method, str(workers), temp_dir],
+                    capture_output=True,
+                    check=True,
+                    text=True,
+                ).stdout
+                (first_result, total) = (float(value) for value in output.split())
+                print(f"{start_method:<14}{workers:>8}{first_result:>14.3f}{total:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+from __future__ import annotations
+
+from .results import LintResults as LintResults
+from .session import Session as Session
@@ -0,0 +1,225 @@
+"""Baseline of accepted issues, e.g. of legacy documents, which are not reported.
+
+Every issue is identified by a fingerprint of:
+
+- the path of the file relative to the directory of the baseline file,
+- the message with normalized numbers and whitespace and
+- a hash of the stripped content of the line of the issue and the line before it.
+
+The fingerprint does not contain the line number, so issues still match after lines were
+inserted or removed above them. The baseline counts the issues per fingerprint and suppresses at
+most that many matching issues, so new copies of an accepted issue are reported.
+"""
+
+from __future__ import annotations
+
+import collections
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import re
+import typing as t
+
+from .results import LintResults
+
+if t.TYPE_CHECKING:
+    from rstcheck_core import types
+
+logger = logging.getLogger(__name__)
+
+BASELINE_FORMAT = "rstcheck-baseline"
+"""Identifier of baseline files."""
+BASELINE_VERSION = 1
+"""Version of the format of baseline files."""
+
+CONTEXT_LINES = 2
+"""Number of lines up to the line of an issue whose content is hashed into its fingerprint."""
+
+NUMBER_REGEX = re.compile(r"\d+")
+WHITESPACE_REGEX = re.compile(r"\s+")
+
+_Fingerprint = tuple[str, str, str]
+
+
+def normalize_message(message: str) -> str:
+    """Normalize a message, so it still matches when numbers in it change, e.g. line numbers.
+
+    :param message: Message of an issue
+    :return: Normalized message
+    """
+    return WHITESPACE_REGEX.sub(" ", NUMBER_REGEX.sub("0", message)).strip()
+
+
+def _file(source_origin: types.SourceFileOrString) -> pathlib.Path | None:
+    """Get the file of the origin of an issue.
+
+    :param source_origin: Origin of the source with the issue; paths may be strings, e.g. in
+        results files
+    :return: Path of the file; :py:obj:`None` for origins like ``<stdin>``
+    """
+    if isinstance(source_origin, pathlib.Path):
+        return source_origin
+    if source_origin.startswith("<"):
+        return None
+    return pathlib.Path(source_origin)
+
+
+class _Fingerprinter:
+    """Creates fingerprints of issues and reads every file only once."""
+
+    def __init__(self, root: pathlib.Path) -> None:
+        """Initialize :py:class:`_Fingerprinter`.
+
+        :param root: Directory the paths in the fingerprints are relative to
+        """
+        self.root = root.resolve()
+        self._lines: dict[types.SourceFileOrString, list[str]] = {}
+        self._paths: dict[types.SourceFileOrString, str] = {}
+
+    def path(self, source_origin: types.SourceFileOrString) -> str:
+        """Get the path of a file as used in fingerprints.
+
+        :param source_origin: Origin of the source with the issue
+        :return: POSIX path relative to the root; origins like ``<stdin>`` as they are
+        """
+        path = self._paths.get(source_origin)
+        if path is None:
+            file = _file(source_origin)
+            path = (
+                pathlib.Path(os.path.relpath(file.resolve(), self.root)).as_posix()
+                if file is not None
+                else str(source_origin)
+            )
+            self._paths[source_origin] = path
+        return path
+
+    def context(self, source_origin: types.SourceFileOrString, line_number: int) -> str:
+        """Get the hash of the content up to the line of an issue.
+
+        :param source_origin: Origin of the source with the issue
+        :param line_number: Line number of the issue
+        :return: Hash of the stripped lines; of no lines for sources which cannot be read
+        """
+        lines = self._lines.get(source_origin)
+        if lines is None:
+            lines = []
+            file = _file(source_origin)
+            if file is not None:
+                try:
+                    lines = file.read_text("utf-8", errors="replace").splitlines()
+                except OSError:
+                    logger.debug("Could not read file for baseline: '%s'.", source_origin)
+            self._lines[source_origin] = lines
+
+        context = lines[max(line_number - CONTEXT_LINES, 0) : max(line_number, 0)]
+        content = "\n".join(line.strip() for line in context)
+        return hashlib.blake2b(content.encode("utf-8"), digest_size=8).hexdigest()
+
+    def fingerprint(self, error: types.LintError) -> _Fingerprint:
+        """Get the fingerprint of an issue.
+
+        :param error: Issue
+        :return: Path, normalized message and context hash
+        """
+        return (
+            self.path(error["source_origin"]),
+            normalize_message(error["message"]),
+            self.context(error["source_origin"], error["line_number"]),
+        )
+
+
+class Baseline:
+    """Accepted issues by fingerprint."""
+
+    def __init__(
+        self, root: pathlib.Path, counts: t.Mapping[_Fingerprint, int] | None = None
+    ) -> None:
+        """Initialize :py:class:`Baseline`.
+
+        :param root: Directory the paths in the fingerprints are relative to
+        :param counts: Number of accepted issues by fingerprint; defaults to none
+        """
+        self.root = root
+        self.counts: dict[_Fingerprint, int] = dict(counts or {})
+
+    def __len__(self) -> int:
+        """Get the number of accepted issues."""
+        return sum(self.counts.values())
+
+    @classmethod
+    def from_results(cls, results: t.Iterable[types.LintError], root: pathlib.Path) -> Baseline:
+        """Create a baseline accepting the given issues.
+
+        :param results: Issues to accept
+        :param root: Directory the paths in the fingerprints are relative to, usually the
+            directory of the baseline file
+        :return: Baseline
+        """
+        fingerprinter = _Fingerprinter(root)
+        return cls(root, collections.Counter(fingerprinter.fingerprint(error) for error in results))
+
+    @classmethod
+    def load(cls, baseline_file: pathlib.Path) -> Baseline:
+        """Load a baseline file written by :py:meth:`Baseline.write`.
+
+        :param baseline_file: Path of the baseline file
+        :raises ValueError: If the file is no baseline file
+        :raises OSError: If the file cannot be read
+        :return: Baseline with the directory of the file as root
+        """
+        try:
+            content = json.loads(baseline_file.read_text("utf-8"))
+        except ValueError:
+            content = None
+        if not isinstance(content, dict) or content.get("format") != BASELINE_FORMAT:
+            msg = f"Not a rstcheck baseline file: '{baseline_file}'."
+            raise ValueError(msg)
+        if content.get("version") != BASELINE_VERSION:
+            msg = f"Unsupported baseline file version {content.get('version')}: '{baseline_file}'."
+            raise ValueError(msg)
+
+        try:
+            counts = {
+                (issue["path"], issue["message"], issue["context"]): issue.get("count", 1)
+                for issue in content["issues"]
+            }
+        except (KeyError, TypeError, AttributeError) as exception:
+            msg = f"Invalid issues in rstcheck baseline file: '{baseline_file}'."
+            raise ValueError(msg) from exception
+        logger.debug("Loaded %s fingerprints from baseline: '%s'.", len(counts), baseline_file)
+        return cls(baseline_file.parent, counts)
+
+    def write(self, baseline_file: pathlib.Path) -> None:
+        """Write the baseline as JSON, sorted to keep diffs small.
+
+        :param baseline_file: Path of the file; overwritten if it exists
+        """
+        issues = [
+            {"path": path, "message": message, "context": context, "count": count}
+            for (path, message, context), count in sorted(self.counts.items())
+        ]
+        content = {"format": BASELINE_FORMAT, "version": BASELINE_VERSION, "issues": issues}
+        baseline_file.write_text(json.dumps(content, indent=1) + "\n", "utf-8")
+        logger.debug("Wrote %s issues to baseline: '%s'.", len(self), baseline_file)
+
+    def apply(self, results: t.Iterable[types.LintError]) -> tuple[LintResults, int]:
+        """Remove the accepted issues from results.
+
+        :param results: Issues to filter
+        :return: Issues not accepted by the baseline and the number of removed issues
+        """
+        fingerprinter = _Fingerprinter(self.root)
+        remaining = dict(self.counts)
+        new_results = LintResults()
+        suppressed = 0
+        for error in results:
+            fingerprint = fingerprinter.fingerprint(error)
+            count = remaining.get(fingerprint, 0)
+            if count:
+                remaining[fingerprint] = count - 1
+                suppressed += 1
+                continue
+            new_results.append(error)
+        return (new_results, suppressed)
@@ -0,0 +1,1207 @@
+"""Checking functionality on top of :py:mod:`rstcheck_core.checker`.
+
+The checker of ``rstcheck-core`` runs every code block check right when the document is walked.
+This module splits a check into two phases:
+
+#. :py:func:`prepare_source` parses the document and collects the code blocks to check.
+#. :py:func:`run_code_block_checks` runs the collected code block checks.
+
+This allows callers to decide how and where the code block checks are run, e.g. external tools
+can be run via :py:mod:`asyncio` subprocesses.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import copy
+import doctest
+import functools
+import io
+import locale
+import logging
+import os
+import pathlib
+import shlex
+import sys
+import tempfile
+import threading
+import typing as t
+
+import docutils.core
+import docutils.frontend
+import docutils.io
+import docutils.nodes
+import docutils.parsers.rst
+import docutils.readers.standalone
+import docutils.utils
+from rstcheck_core import (
+    _extras,
+    _sphinx,
+    _sphinx_workarounds,
+    checker,
+    config,
+    inline_config,
+    types,
+)
+
+from . import _headers, _metrics, _registry, _subprocesses, _syntax, plugins
+
+logger = logging.getLogger(__name__)
+
+DOCTEST_CACHE_SIZE = 4096
+"""Maximum number of doctest sources whose check result is memoized."""
+NESTED_RST_CACHE_SIZE = 1024
+"""Maximum number of nested rst sources whose check result is memoized."""
+MAX_NESTING_DEPTH = 8
+"""Maximum depth of rst code blocks nested in rst; deeper code blocks are not checked."""
+
+PATH_DEPENDENT_MARKERS = ("include", ":file:")
+"""Content which may reference other files relative to the checked file."""
+CODE_BLOCK_MARKERS = ("code", ">>>", "include")
+"""Lowercase content of sources which may contain code blocks, directly or via includes."""
+
+_DOCTEST_PARSER = doctest.DocTestParser()
+
+docutils_lock = threading.RLock()
+"""Lock to hold while using docutils, whose directive and role registries are global state."""
+
+_DocutilsSettingsKey = tuple[int, pathlib.Path, str | None]
+_docutils_settings: dict[_DocutilsSettingsKey, docutils.frontend.Values] = {}
+_idle_readers: list[docutils.readers.standalone.Reader[str]] = []
+
+_NestedRstKey = tuple[t.Any, ...]
+_nested_rst_cache: dict[_NestedRstKey, list[tuple[int, str]]] = {}
+_nesting = threading.local()
+
+
+class ExternalCheck(t.NamedTuple):
+    """Command line of an external tool to check a code block with."""
+
+    arguments: list[str]
+    """Command and arguments to run; the path of the temporary source file is appended."""
+    filename_suffix: str
+    """File suffix for the temporary source file."""
+    source_code: str
+    """Source code to write into the temporary source file."""
+
+
+class CodeBlockChecker(checker.CodeBlockChecker):
+    """Checker for code blocks with different languages.
+
+    In contrast to :py:class:`rstcheck_core.checker.CodeBlockChecker` building the command line
+    for external tools and parsing their output are separate steps, so the tool itself can be run
+    by the caller.
+
+    The result of nested rst checks is memoized by the source code and the ignore information.
+
+    Languages not checked by ``rstcheck-core`` are checked by the plugins of
+    :py:data:`rstcheck.plugins.registry`.
+    """
+
+    def plugin(self, language: str) -> plugins.CodeBlockPlugin | None:
+        """Get the plugin checking a language, loading it on first use.
+
+        :param language: Language of a code block
+        :return: Plugin; :py:obj:`None` for languages checked by ``rstcheck-core`` or without plugin
+        """
+        if super().language_is_supported(language):
+            return None
+        return plugins.registry.get(language)
+
+    def language_is_supported(self, language: str) -> bool:
+        """Check if given language can be checked, by ``rstcheck-core`` or a plugin.
+
+        :param language: Language to check
+        :return: If language can be checked
+        """
+        return super().language_is_supported(language) or self.plugin(language) is not None
+
+    def is_batched(self, language: str) -> bool:
+        """Check if the code blocks of a language are checked in one batch per document.
+
+        :param language: Language of a code block
+        :return: If the code blocks are checked via :py:func:`run_batch_checks`
+        """
+        if language == "doctest":
+            return True
+        plugin = self.plugin(language)
+        return plugin is not None and plugin.kind == "batch"
+
+    def check(self, source_code: str, language: str) -> types.YieldedLintError:
+        """Call the appropriate checker function for the given language to check given source.
+
+        :param source_code: Source code to check
+        :param language: Language of the source code
+        :return: :py:obj:`None` if language is not supported
+        :yield: Found issues
+        """
+        plugin = self.plugin(language)
+        if plugin is None:
+            yield from super().check(source_code, language)
+        elif plugin.kind == "subprocess":
+            yield from self._check_externally(source_code, language)
+        elif plugin.kind == "batch":
+            yield from self.plugin_errors(plugin.check_batch([source_code])[0])
+        else:
+            yield from self.plugin_errors(plugin.check(source_code))
+
+    def plugin_errors(self, issues: t.Iterable[plugins.Issue]) -> types.YieldedLintError:
+        """Create issues of the source of the checker from the issues of a plugin.
+
+        :param issues: Line numbers and messages
+        :return: :py:obj:`None`
+        :yield: Issues
+        """
+        for line_number, message in issues:
+            yield types.LintError(
+                source_origin=self.source_origin, line_number=line_number, message=message
+            )
+
+    def check_rst(self, source_code: str) -> types.YieldedLintError:
+        """Check nested rst source for syntax errors.
+
+        Rst nested deeper than :py:data:`MAX_NESTING_DEPTH` is not checked.
+
+        :param source_code: rst source code to check
+        :return: :py:obj:`None`
+        :yield: Found issues
+        """
+        logger.debug("Check RST source.")
+        depth = getattr(_nesting, "depth", 0)
+        if depth >= MAX_NESTING_DEPTH:
+            logger.warning(
+                "Skip check of rst nested deeper than %s levels in source: '%s'.",
+                MAX_NESTING_DEPTH,
+                self.source_origin,
+            )
+            return
+
+        key = (depth, *self._nested_rst_key(source_code))
+        issues = _nested_rst_cache.get(key)
+        _metrics.count("cache_misses" if issues is None else "cache_hits", "nested_rst")
+        if issues is None:
+            _nesting.depth = depth + 1
+            try:
+                errors = list(
+                    check_source(
+                        source_code,
+                        source_file=self.source_origin,
+                        # Copy the ignores, so the memoization key stays valid.
+                        ignores=copy_ignore_dict(self.ignores or types.construct_ignore_dict()),
+                        report_level=self.report_level,
+                        sphinx_source_dir=self.sphinx_source_dir,
+                        warn_unknown_settings=self.warn_unknown_settings,
+                    )
+                )
+            finally:
+                _nesting.depth = depth
+
+            issues = [(error["line_number"], error["message"]) for error in errors]
+            if len(_nested_rst_cache) >= NESTED_RST_CACHE_SIZE:
+                del _nested_rst_cache[next(iter(_nested_rst_cache))]
+            _nested_rst_cache[key] = issues
+
+        for line_number, message in issues:
+            yield types.LintError(
+                source_origin=self.source_origin, line_number=line_number, message=message
+            )
+
+    def _nested_rst_key(self, source_code: str) -> _NestedRstKey:
+        """Get the key the check result of nested rst source is memoized by.
+
+        :param source_code: rst source code to check
+        :return: Key of the source code, all settings of the check and for source code
+            referencing other files the source origin
+        """
+        ignores = self.ignores or types.construct_ignore_dict()
+        messages = ignores["messages"]
+        path_dependent = any(marker in source_code for marker in PATH_DEPENDENT_MARKERS)
+        return (
+            source_code,
+            frozenset(ignores["languages"]),
+            frozenset(ignores["directives"]),
+            frozenset(ignores["roles"]),
+            frozenset(ignores["substitutions"]),
+            messages.pattern if messages is not None else None,
+            self.report_level,
+            self.sphinx_source_dir,
+            self.warn_unknown_settings,
+            str(self.source_origin) if path_dependent else None,
+        )
+
+    def check_doctest(self, source_code: str) -> types.YieldedLintError:
+        """Check doctest source for syntax errors.
+
+        Like :py:meth:`rstcheck_core.checker.CodeBlockChecker.check_doctest` the examples are not
+        run or compiled. The result is memoized by the source code.
+
+        :param source_code: doctest source code to check
+        :return: :py:obj:`None`
+        :yield: Found issues
+        """
+        logger.debug("Check doctest source.")
+        issue = _lookup_doctest_source(source_code)
+        if issue is not None:
+            yield types.LintError(
+                source_origin=self.source_origin, line_number=issue[0], message=issue[1]
+            )
+
+    def check_bash(self, source_code: str) -> types.YieldedLintError:
+        """Check bash source for syntax errors.
+
+        :param source_code: bash source code to check
+        :return: :py:obj:`None`
+        :yield: Found issues
+        """
+        logger.debug("Check bash source.")
+        yield from self._check_externally(source_code, "bash")
+
+    def check_c(self, source_code: str) -> types.YieldedLintError:
+        """Check C source for syntax errors.
+
+        :param source_code: C source code to check
+        :return: :py:obj:`None`
+        :yield: Found issues
+        """
+        logger.debug("Check C source.")
+        yield from self._check_externally(source_code, "c")
+
+    def check_cpp(self, source_code: str) -> types.YieldedLintError:
+        """Check C++ source for syntax errors.
+
+        :param source_code: C++ source code to check
+        :return: :py:obj:`None`
+        :yield: Found issues
+        """
+        logger.debug("Check C++ source.")
+        yield from self._check_externally(source_code, "cpp")
+
+    def check_json(self, source_code: str) -> types.YieldedLintError:
+        """Check JSON source for syntax errors without loading it into Python objects.
+
+        :param source_code: JSON source code to check
+        :return: :py:obj:`None`
+        :yield: Found issues
+        """
+        logger.debug("Check JSON source.")
+        message = _syntax.validate_json(source_code)
+        if message is not None:
+            yield self._syntax_error(message)
+
+    def check_xml(self, source_code: str) -> types.YieldedLintError:
+        """Check XML source for syntax errors without building an element tree.
+
+        :param source_code: XML source code to check
+        :return: :py:obj:`None`
+        :yield: Found issues
+        """
+        logger.debug("Check XML source.")
+        message = _syntax.validate_xml(source_code)
+        if message is not None:
+            yield self._syntax_error(message)
+
+    def check_yaml(self, source_code: str) -> types.YieldedLintError:
+        """Check YAML source for syntax errors without constructing its values.
+
+        :param source_code: YAML source code to check
+        :return: :py:obj:`None`
+        :yield: Found issues
+        """
+        if not _syntax.yaml_imported:
+            logger.debug("PyYAML is not installed, ignoring YAML source.")
+            return
+        logger.debug("Check YAML source.")
+        message = _syntax.validate_yaml(source_code)
+        if message is not None:
+            yield self._syntax_error(message)
+
+    def _syntax_error(self, message: str) -> types.LintError:
+        """Create an issue for a syntax error like ``rstcheck-core``.
+
+        :param message: Message of the syntax error ending with the line number
+        :return: Issue
+        """
+        found = checker.EXCEPTION_LINE_NO_REGEX.search(message)
+        line_number = int(found.group(1)) if found else 0
+        return types.LintError(
+            source_origin=self.source_origin, line_number=line_number, message=message
+        )
+
+    def external_check(self, source_code: str, language: str) -> ExternalCheck | None:
+        """Get the external tool command line to check the given source with.
+
+        :param source_code: Source code to check
+        :param language: Language of the source code
+        :return: :py:obj:`None` if the language is not checked by an external tool
+        """
+        plugin = self.plugin(language)
+        if plugin is not None:
+            command = plugin.external_command(source_code) if plugin.kind == "subprocess" else None
+            return (
+                ExternalCheck(command.arguments, command.filename_suffix, source_code)
+                if command is not None
+                else None
+            )
+
+        if language == "bash":
+            return ExternalCheck(["bash", "-n"], ".bash", source_code)
+
+        if language == "c":
+            arguments = [
+                os.getenv("CC", "gcc"),
+                *shlex.split(os.getenv("CFLAGS", "")),
+                *shlex.split(os.getenv("CPPFLAGS", "")),
+                "-I.",
+                "-I..",
+            ]
+            return ExternalCheck([*arguments, "-pedantic", "-fsyntax-only"], ".c", source_code)
+
+        if language == "cpp":
+            arguments = [
+                os.getenv("CXX", "g++"),
+                *shlex.split(os.getenv("CXXFLAGS", "")),
+                *shlex.split(os.getenv("CPPFLAGS", "")),
+                "-I.",
+                "-I..",
+            ]
+            # Add a newline to ignore "no newline at end of file" errors
+            # that are reported using clang (e.g. on macOS).
+            return ExternalCheck(
+                [*arguments, "-pedantic", "-fsyntax-only"], ".cpp", source_code + "\n"
+            )
+
+        return None
+
+    def parse_external_output(
+        self, language: str, output: str, temporary_file_path: pathlib.Path
+    ) -> types.YieldedLintError:
+        """Parse the error output of an external tool.
+
+        :param language: Language of the checked source code
+        :param output: Error output of the tool
+        :param temporary_file_path: Path of the temporary source file passed to the tool
+        :return: :py:obj:`None`
+        :yield: Found issues
+        """
+        plugin = self.plugin(language)
+        if plugin is not None:
+            yield from self.plugin_errors(plugin.parse_output(output, temporary_file_path))
+            return
+
+        if language == "bash":
+            prefix = str(temporary_file_path) + ": line "
+            for line in output.splitlines():
+                if not line.startswith(prefix):  # pragma: no cover # NOTE: Case not reproducible
+                    continue
+                message = line[len(prefix) :]
+                split_message = message.split(":", 1)
+                yield types.LintError(
+                    source_origin=self.source_origin,
+                    line_number=int(split_message[0]) - 1,
+                    message=split_message[1].strip(),
+                )
+            return
+
+        for line in output.splitlines():
+            try:
+                yield checker._parse_gcc_style_error_message(  # noqa: SLF001
+                    line, source_origin=self.source_origin, temp_file_name=temporary_file_path
+                )
+            except ValueError:
+                continue
+
+    def use_precompiled_header(self, external_check: ExternalCheck, language: str) -> ExternalCheck:
+        """Check the include lines of C and C++ code blocks with a precompiled header.
+
+        The precompiled header is built when the include lines were used often enough, see
+        :py:mod:`rstcheck._headers`, so this may run the compiler.
+
+        :param external_check: Command line to check the code block with
+        :param language: Language of the code block
+        :return: Command line using the precompiled header, if any
+        """
+        if language not in _headers.HEADER_LANGUAGES or self.plugin(language) is not None:
+            return external_check
+        precompiled = _headers.get().apply(
+            language, external_check.arguments, external_check.source_code, self.working_directory
+        )
+        if precompiled is None:
+            return external_check
+        (arguments, source_code) = precompiled
+        return ExternalCheck(arguments, external_check.filename_suffix, source_code)
+
+    @property
+    def working_directory(self) -> pathlib.Path:
+        """Directory external tools are run in."""
+        return pathlib.Path(self.source_origin).parent
+
+    def _check_externally(self, source_code: str, language: str) -> types.YieldedLintError:
+        """Check source code with an external tool (Helper function).
+
+        :param source_code: Source code to check
+        :param language: Language of the source code
+        :return: :py:obj:`None`
+        :yield: Found issues
+        """
+        external_check = self.external_check(source_code, language)
+        if external_check is None:  # pragma: no cover
+            return
+
+        external_check = self.use_precompiled_header(external_check, language)
+        try:
+            result = self._run_in_subprocess(
+                external_check.source_code,
+                external_check.filename_suffix,
+                external_check.arguments,
+                language=language,
+            )
+        except _subprocesses.LimitExceededError as exception:
+            yield limit_exceeded_error(self.source_origin, exception)
+            return
+        if result:
+            (output, temporary_file_path) = result
+            yield from self.parse_external_output(language, output, temporary_file_path)
+
+    def _run_in_subprocess(
+        self,
+        code: str,
+        filename_suffix: str,
+        arguments: list[str],
+        *,
+        language: str = "",
+    ) -> tuple[str, pathlib.Path] | None:
+        """Run checker in a subprocess with the limits of :py:mod:`rstcheck._subprocesses`.
+
+        :param code: Source code to check
+        :param filename_suffix: File suffix for language of the source code
+        :param arguments: Command and arguments to run
+        :param language: Language of the source code to select the timeout by;
+            defaults to the default timeout
+        :raises rstcheck._subprocesses.LimitExceededError: If the subprocess exceeded a limit
+        :return: :py:obj:`None` if no issues were found else a tuple of the stderr and temp-file
+            name
+        """
+        encoding = locale.getpreferredencoding() or sys.getdefaultencoding()
+        _metrics.count("subprocesses", pathlib.Path(arguments[0]).name)
+
+        # NOTE: On windows a file cannot be opened twice.
+        # Therefore close it before using it in subprocess.
+        with tempfile.NamedTemporaryFile(
+            mode="wb", suffix=filename_suffix, delete=False
+        ) as temporary_file:
+            temporary_file.write(code.encode("utf-8"))
+        temporary_file_path = pathlib.Path(temporary_file.name)
+
+        try:
+            (returncode, stderr) = _subprocesses.run(
+                [*arguments, temporary_file.name], language=language, cwd=self.working_directory
+            )
+        finally:
+            temporary_file_path.unlink(missing_ok=True)
+
+        if returncode != 0:
+            return (stderr.decode(encoding), temporary_file_path)
+        return None
+
+
+def copy_ignore_dict(ignores: types.IgnoreDict) -> types.IgnoreDict:
+    """Copy an ignore dict, e.g. before inline config of a source is added to it.
+
+    :param ignores: Ignore dict to copy
+    :return: Copy with own lists
+    """
+    return types.construct_ignore_dict(
+        messages=ignores["messages"],
+        languages=list(ignores["languages"]),
+        directives=list(ignores["directives"]),
+        roles=list(ignores["roles"]),
+        substitutions=list(ignores["substitutions"]),
+    )
+
+
+def limit_exceeded_error(
+    source_origin: types.SourceFileOrString, exception: _subprocesses.LimitExceededError
+) -> types.LintError:
+    """Create the issue for a code block whose external tool exceeded a limit.
+
+    The issue is reported at the first line of the code block.
+
+    :param source_origin: Origin of the source the code block belongs to
+    :param exception: Exceeded limit
+    :return: Issue with the line number relative to the code block
+    """
+    return types.LintError(source_origin=source_origin, line_number=1, message=str(exception))
+
+
+@functools.lru_cache(maxsize=DOCTEST_CACHE_SIZE)
+def _check_doctest_source(source_code: str) -> tuple[int, str] | None:
+    """Parse doctest source with a shared parser and get the first issue.
+
+    :param source_code: doctest source code to check
+    :return: Line number and message of the issue; :py:obj:`None` if there is no issue
+    """
+    try:
+        _DOCTEST_PARSER.parse(source_code)
+    except ValueError as exception:
+        message = f"{exception}"
+        match = checker.DOCTEST_LINE_NO_REGEX.match(message)
+        if match:
+            return (int(match.group(1)), message)
+    return None
+
+
+def _lookup_doctest_source(source_code: str) -> tuple[int, str] | None:
+    """Get the first issue of doctest source from :py:func:`_check_doctest_source`.
+
+    Cache hits and misses are counted if metrics are collected.
+
+    :param source_code: doctest source code to check
+    :return: Line number and message of the issue; :py:obj:`None` if there is no issue
+    """
+    if _metrics.current is None:
+        return _check_doctest_source(source_code)
+
+    misses = _check_doctest_source.cache_info().misses
+    issue = _check_doctest_source(source_code)
+    hit = _check_doctest_source.cache_info().misses == misses
+    _metrics.current.count("cache_hits" if hit else "cache_misses", "doctest")
+    return issue
+
+
+class CodeBlockCheck:
+    """A code block found in a document which is to be checked."""
+
+    __slots__ = ("first_line", "language", "source_code")
+
+    def __init__(self, language: str, source_code: str, first_line: int | None) -> None:
+        """Initialize :py:class:`CodeBlockCheck`.
+
+        :param language: Language of the code block
+        :param source_code: Source code of the code block
+        :param first_line: Line of the document the code block begins at;
+            :py:obj:`None` if unknown
+        """
+        self.language = language
+        self.source_code = source_code
+        self.first_line = first_line
+
+    def map_errors(self, errors: t.Iterable[types.LintError]) -> types.YieldedLintError:
+        """Map issues found inside the code block to the surrounding document.
+
+        Issues of code blocks without a known beginning are dropped.
+
+        :param errors: Issues with line numbers relative to the code block
+        :return: :py:obj:`None`
+        :yield: Issues with line numbers relative to the document
+        """
+        for error in errors:
+            if self.first_line is None:
+                continue
+            yield types.LintError(
+                source_origin=error["source_origin"],
+                line_number=self.first_line + error["line_number"] - 1,
+                message=f"({self.language}) {error['message']}",
+            )
+
+
+class _CheckTranslator(checker._CheckTranslator):  # noqa: SLF001
+    """Visits code blocks and collects them as :py:class:`CodeBlockCheck` s."""
+
+    code_block_checker: CodeBlockChecker
+
+    def __init__(  # noqa: PLR0913
+        self,
+        document: docutils.nodes.document,
+        source: str,
+        source_origin: types.SourceFileOrString,
+        ignores: types.IgnoreDict | None = None,
+        report_level: config.ReportLevel = config.DEFAULT_REPORT_LEVEL,
+        sphinx_source_dir: pathlib.Path | None = None,
+        *,
+        warn_unknown_settings: bool = False,
+    ) -> None:
+        """Initialize :py:class:`_CheckTranslator`.
+
+        :param document: Document node
+        :param source: Rst source to check
+        :param source_origin: Path to file the source comes from
+        :param ignores: Ignore information; defaults to :py:obj:`None`
+        :param report_level: Report level;
+            defaults to :py:data:`rstcheck_core.config.DEFAULT_REPORT_LEVEL`
+        :param sphinx_source_dir: Path to the sphinx 'source' directory;
+            defaults to :py:obj:`None`
+        :param warn_unknown_settings: If a warning should be logged for unknown settings in config
+            file;
+            defaults to :py:obj:`False`
+        """
+        super().__init__(
+            document,
+            source,
+            source_origin,
+            ignores,
+            report_level,
+            sphinx_source_dir,
+            warn_unknown_settings=warn_unknown_settings,
+        )
+        self.code_block_checker = CodeBlockChecker(
+            source_origin,
+            ignores,
+            report_level,
+            warn_unknown_settings=warn_unknown_settings,
+            sphinx_source_dir=sphinx_source_dir,
+        )
+        self.checks: list[CodeBlockCheck] = []
+
+    def _add_check(
+        self,
+        node: docutils.nodes.Element,
+        run: types.CheckerRunFunction,  # noqa: ARG002
+        language: str,
+        *,
+        is_code_node: bool,
+    ) -> None:
+        """Add code block check that will be run.
+
+        :param node: The node to check
+        :param run: The runner function that checks the node; unused
+        :param language: The language of the node
+        :param is_code_node: If it is a code block node
+        """
+        line_number = getattr(node, "line", None)
+        first_line = None
+        if line_number is not None:
+            first_line = checker._beginning_of_code_block(  # noqa: SLF001
+                node=node,
+                line_number=line_number,
+                full_contents=self.source,
+                is_code_node=is_code_node,
+            )
+        self.checks.append(CodeBlockCheck(language, node.rawsource, first_line))
+
+    def visit_paragraph(self, node: docutils.nodes.Element) -> None:
+        """Check for links in Markdown style, unless warnings are not reported.
+
+        :param node: The rst node
+        """
+        if self.report_level.value > config.ReportLevel.WARNING.value:
+            return
+        super().visit_paragraph(node)
+
+
+class _CheckWriter(checker._CheckWriter):  # noqa: SLF001
+    """Runs :py:class:`_CheckTranslator` on the document."""
+
+    checks: list[CodeBlockCheck]
+    code_block_checker: CodeBlockChecker
+
+    def translate(self) -> None:
+        """Run :py:class:`_CheckTranslator`."""
+        if self.document is None:
+            err_msg = "No document to check."
+            raise AssertionError(err_msg)
+
+        visitor = _CheckTranslator(
+            self.document,
+            source=self.source,
+            source_origin=self.source_origin,
+            ignores=self.ignores,
+            report_level=self.report_level,
+            warn_unknown_settings=self.warn_unknown_settings,
+            sphinx_source_dir=self.sphinx_source_dir,
+        )
+        self.document.walkabout(visitor)
+        self.checks = visitor.checks
+        self.code_block_checker = visitor.code_block_checker
+
+
+class PreparedSource(t.NamedTuple):
+    """Parsed rst source with the collected code blocks to check."""
+
+    source_origin: types.SourceFileOrString
+    """Origin of the source."""
+    ignores: types.IgnoreDict
+    """Ignore information incl. the inline config of the source."""
+    include_errors: list[types.LintError]
+    """Issues with include directives; only found if sphinx is installed."""
+    rst_errors: list[types.LintError]
+    """Issues reported by docutils."""
+    checks: list[CodeBlockCheck]
+    """Code blocks to check."""
+    code_block_checker: CodeBlockChecker
+    """Checker to run the code block checks with."""
+
+
+def prepare_source(
+    source: str,
+    source_file: types.SourceFileOrString | None = None,
+    ignores: types.IgnoreDict | None = None,
+    report_level: config.ReportLevel = config.DEFAULT_REPORT_LEVEL,
+    sphinx_source_dir: pathlib.Path | None = None,
+    *,
+    warn_unknown_settings: bool = False,
+) -> PreparedSource:
+    """Parse the given rst source and collect the code blocks to check.
+
+    Modifies the global directive and role registries of docutils. The docutils settings and
+    parser objects are reused across sources, see :py:func:`_get_docutils_settings`.
+
+    :param source: Rst source to check
+    :param source_file: Path to file the source comes from if it comes from a file;
+        defaults to :py:obj:`None`
+    :param ignores: Ignore information; defaults to :py:obj:`None`
+    :param report_level: Report level; defaults to
+        :py:data:`rstcheck_core.config.DEFAULT_REPORT_LEVEL`
+    :param sphinx_source_dir: Path to the sphinx 'source' directory; defaults to :py:obj:`None`
+    :param warn_unknown_settings: If a warning should be logged for unknown settings in config file;
+        defaults to :py:obj:`False`
+    :return: Prepared source
+    """
+    source_origin: types.SourceFileOrString = source_file or "<string>"
+    if isinstance(source_origin, pathlib.Path) and source_origin.name == "-":
+        source_origin = "<stdin>"
+    logger.info("Check source from '%s'", source_origin)
+    ignores = ignores or types.construct_ignore_dict()
+    ignores["directives"].extend(
+        inline_config.find_ignored_directives(
+            source, source_origin, warn_unknown_settings=warn_unknown_settings
+        )
+    )
+    ignores["roles"].extend(
+        inline_config.find_ignored_roles(
+            source, source_origin, warn_unknown_settings=warn_unknown_settings
+        )
+    )
+    ignores["substitutions"].extend(
+        inline_config.find_ignored_substitutions(
+            source, source_origin, warn_unknown_settings=warn_unknown_settings
+        )
+    )
+    ignores["languages"].extend(
+        inline_config.find_ignored_languages(
+            source, source_origin, warn_unknown_settings=warn_unknown_settings
+        )
+    )
+
+    include_errors: list[types.LintError] = []
+    if _extras.SPHINX_INSTALLED:
+        include_errors = list(
+            _sphinx_workarounds.yield_include_errors(
+                source, source_origin, ignores["messages"], sphinx_source_dir=sphinx_source_dir
+            )
+        )
+        source = _sphinx_workarounds.strip_include_directives(source)
+
+    source = checker._replace_ignored_substitutions(  # noqa: SLF001
+        source, ignores["substitutions"]
+    )
+
+    _registry.registry.register(ignores["directives"] or [], ignores["roles"] or [])
+
+    if _extras.SPHINX_INSTALLED:
+        _sphinx.load_sphinx_ignores()
+
+    code_block_checker = CodeBlockChecker(
+        source_origin,
+        ignores,
+        report_level,
+        warn_unknown_settings=warn_unknown_settings,
+        sphinx_source_dir=sphinx_source_dir,
+    )
+    if report_level == config.ReportLevel.NONE and not may_contain_code_blocks(source):
+        logger.debug("Skip parsing source without code blocks and rst issues to report.")
+        return PreparedSource(
+            source_origin=source_origin,
+            ignores=ignores,
+            include_errors=include_errors,
+            rst_errors=[],
+            checks=[],
+            code_block_checker=code_block_checker,
+        )
+
+    writer = _CheckWriter(
+        source, source_origin, ignores, report_level, sphinx_source_dir=sphinx_source_dir
+    )
+    writer.checks = []
+    writer.code_block_checker = code_block_checker
+
+    string_io = io.StringIO()
+
+    # This is a hack to avoid false positive from docutils (#23). docutils mistakes BOMs for actual
+    # visible letters. This results in the "underline too short" warning firing.
+    # This is tested in the CLI integration tests with the `testing/examples/good/bom.rst` file.
+    with contextlib.suppress(UnicodeError):
+        source = source.encode("utf-8").decode("utf-8-sig")
+
+    with contextlib.suppress(docutils.utils.SystemMessage), _docutils_reader() as reader:
+        docutils_settings = copy.copy(_get_docutils_settings(report_level, reader, writer))
+        docutils_settings.warning_stream = string_io
+        # Included files are recorded in the settings, which must not grow across sources.
+        docutils_settings.record_dependencies = docutils.utils.DependencyList()
+        # Sphinx will sometimes throw an `AttributeError` trying to access
+        # "self.state.document.settings.env". Ignore this for now until we
+        # figure out a better approach.
+        # https://github.com/rstcheck/rstcheck-core/issues/3
+        try:
+            docutils.core.publish_string(
+                source,
+                reader=reader,
+                parser=reader.parser,
+                writer=writer,
+                source_path=str(source_origin),
+                settings=docutils_settings,
+            )
+        except AttributeError:
+            if not _extras.SPHINX_INSTALLED:
+                raise
+            logger.warning(
+                "An `AttributeError` error occured. This is most probably due to a code block "
+                "directive (code/code-block/sourcecode) without a specified language. "
+                "This may result in a false negative for source: '%s'. "
+                "The reason can also be another directive. "
+                "For more information see the FAQ (https://rstcheck-core.rtfd.io/en/latest/faq) "
+                "or the corresponding github issue: "
+                "https://github.com/rstcheck/rstcheck-core/issues/3.",
+                source_origin,
+            )
+
+    rst_errors = string_io.getvalue().strip()
+
+    if _metrics.current is not None:
+        for code_block_check in writer.checks:
+            _metrics.current.count("code_blocks", code_block_check.language)
+
+    return PreparedSource(
+        source_origin=source_origin,
+        ignores=ignores,
+        include_errors=include_errors,
+        rst_errors=list(
+            checker._parse_and_filter_rst_errors(  # noqa: SLF001
+                rst_errors, source_origin, ignores["messages"]
+            )
+        )
+        if rst_errors
+        else [],
+        checks=writer.checks,
+        code_block_checker=writer.code_block_checker,
+    )
+
+
+@contextlib.contextmanager
+def _docutils_reader() -> t.Iterator[docutils.readers.standalone.Reader[str]]:
+    """Take an idle docutils reader with its rst parser or create one.
+
+    Readers and parsers keep no state between documents, so they are reused instead of being
+    created for every source. A reader is only used by one parse at a time, e.g. not by a nested
+    parse started during the outer one.
+
+    :yield: Reader with :py:attr:`docutils.readers.Reader.parser` set
+    """
+    try:
+        reader = _idle_readers.pop()
+    except IndexError:
+        reader = docutils.readers.standalone.Reader(parser=docutils.parsers.rst.Parser())
+    try:
+        yield reader
+    finally:
+        _idle_readers.append(reader)
+
+
+def _get_docutils_settings(
+    report_level: config.ReportLevel,
+    reader: docutils.readers.standalone.Reader[str],
+    writer: _CheckWriter,
+) -> docutils.frontend.Values:
+    """Get the docutils settings for a report level.
+
+    Building the settings from the option specs of all components and the docutils config files
+    takes longer than parsing small sources, so they are built once per report level and
+    directory of the config files and must be copied before changing them.
+
+    :param report_level: Report level
+    :param reader: Reader whose option specs to build the settings from
+    :param writer: Writer whose option specs to build the settings from
+    :return: Shared settings
+    """
+    # The config files are searched in the working directory or at DOCUTILSCONFIG.
+    key = (report_level.value, pathlib.Path.cwd(), os.environ.get("DOCUTILSCONFIG"))
+    settings = _docutils_settings.get(key)
+    _metrics.count("cache_misses" if settings is None else "cache_hits", "docutils_settings")
+    if settings is None:
+        publisher = docutils.core.Publisher(
+            reader,
+            reader.parser,
+            writer,
+            source_class=docutils.io.StringInput,
+            destination_class=docutils.io.StringOutput,
+        )
+        publisher.process_programmatic_settings(
+            None, {"halt_level": 5, "report_level": report_level.value}, None
+        )
+        settings = _docutils_settings.setdefault(key, publisher.settings)  # type: ignore[arg-type]
+    return settings
+
+
+def may_contain_code_blocks(source: str) -> bool:
+    """Check if a source may contain code blocks to check.
+
+    Sources without any of the :py:data:`CODE_BLOCK_MARKERS` can only have rst issues, so they
+    need not be parsed when no rst issues are reported.
+
+    :param source: Rst source
+    :return: :py:obj:`False` if the source contains no code blocks for sure
+    """
+    lowercase_source = source.lower()
+    return any(marker in lowercase_source for marker in CODE_BLOCK_MARKERS)
+
+
+def filter_ignored_messages(
+    errors: t.Iterable[types.LintError], ignore_messages: t.Pattern[str] | None = None
+) -> types.YieldedLintError:
+    """Filter out issues with ignored messages.
+
+    :param errors: Issues to filter
+    :param ignore_messages: Regex for ignoring error messages; defaults to :py:obj:`None`
+    :return: :py:obj:`None`
+    :yield: Issues not ignored
+    """
+    for error in errors:
+        if ignore_messages and ignore_messages.search(error["message"]):
+            continue
+        yield error
+
+
+def run_code_block_check(
+    prepared_source: PreparedSource, code_block_check: CodeBlockCheck
+) -> types.YieldedLintError:
+    """Run a single code block check in the current process.
+
+    :param prepared_source: Prepared source the code block belongs to
+    :param code_block_check: Code block check to run
+    :return: :py:obj:`None`
+    :yield: Found issues, not filtered by ignored messages
+    """
+    if code_block_check.first_line is None:
+        return
+    yield from code_block_check.map_errors(
+        prepared_source.code_block_checker.check(
+            code_block_check.source_code, code_block_check.language
+        )
+    )
+
+
+def run_batch_checks(prepared_source: PreparedSource) -> dict[int, list[types.LintError]]:
+    """Run all collected doctest checks and checks of batch plugins of a prepared source.
+
+    The checks are run in one batch per language, in which every distinct source is checked only
+    once; the issues are then mapped to the line of each code block in the document.
+
+    :param prepared_source: Prepared source to run the batched checks for
+    :return: Found issues, not filtered by ignored messages, by index of the check in
+        :py:attr:`PreparedSource.checks`
+    """
+    code_block_checker = prepared_source.code_block_checker
+    batches: dict[str, dict[int, CodeBlockCheck]] = {}
+    for index, code_block_check in enumerate(prepared_source.checks):
+        if code_block_checker.is_batched(code_block_check.language):
+            batches.setdefault(code_block_check.language, {})[index] = code_block_check
+
+    batch_errors: dict[int, list[types.LintError]] = {}
+    for language, checks in batches.items():
+        sources = list(dict.fromkeys(check.source_code for check in checks.values()))
+        issues = dict(
+            zip(sources, _check_batch(code_block_checker, language, sources), strict=True)
+        )
+        for index, code_block_check in checks.items():
+            batch_errors[index] = list(
+                code_block_check.map_errors(
+                    code_block_checker.plugin_errors(issues[code_block_check.source_code])
+                )
+            )
+    return batch_errors
+
+
+def _check_batch(
+    code_block_checker: CodeBlockChecker, language: str, sources: list[str]
+) -> list[list[plugins.Issue]]:
+    """Check distinct sources of a batched language.
+
+    :param code_block_checker: Checker of the document
+    :param language: Language of the sources
+    :param sources: Distinct sources to check
+    :return: Found issues per source
+    """
+    if language == "doctest":
+        return [
+            [issue] if (issue := _lookup_doctest_source(source_code)) is not None else []
+            for source_code in sources
+        ]
+    plugin = code_block_checker.plugin(language)
+    if plugin is None:  # pragma: no cover
+        return [[] for _ in sources]
+    return plugin.check_batch(sources)
+
+
+def run_in_process_checks(
+    prepared_source: PreparedSource,
+) -> tuple[dict[int, list[types.LintError]], list[int]]:
+    """Run the collected code block checks which do not run an external tool.
+
+    Nested rst is parsed with the directive and role registries of docutils, so this must run
+    right after :py:func:`prepare_source` without releasing :py:data:`docutils_lock` in between.
+
+    :param prepared_source: Prepared source to run the code block checks for
+    :return: Found issues, not filtered by ignored messages, by index of the check in
+        :py:attr:`PreparedSource.checks` and the indices of the checks run by an external tool
+    """
+    code_block_errors = run_batch_checks(prepared_source)
+    external_indices = []
+    for index, code_block_check in enumerate(prepared_source.checks):
+        if index in code_block_errors:
+            continue
+        if (
+            prepared_source.code_block_checker.external_check(
+                code_block_check.source_code, code_block_check.language
+            )
+            is not None
+        ):
+            external_indices.append(index)
+            continue
+        code_block_errors[index] = list(run_code_block_check(prepared_source, code_block_check))
+    return (code_block_errors, external_indices)
+
+
+def run_code_block_checks(prepared_source: PreparedSource) -> types.YieldedLintError:
+    """Run all collected code block checks in the current process.
+
+    Doctest checks and checks of batch plugins are run via :py:func:`run_batch_checks`.
+
+    :param prepared_source: Prepared source to run the code block checks for
+    :return: :py:obj:`None`
+    :yield: Found issues, filtered by ignored messages
+    """
+    batch_errors = run_batch_checks(prepared_source)
+    for index, code_block_check in enumerate(prepared_source.checks):
+        errors = (
+            batch_errors[index]
+            if index in batch_errors
+            else run_code_block_check(prepared_source, code_block_check)
+        )
+        yield from filter_ignored_messages(errors, prepared_source.ignores["messages"])
+
+
+def check_source(
+    source: str,
+    source_file: types.SourceFileOrString | None = None,
+    ignores: types.IgnoreDict | None = None,
+    report_level: config.ReportLevel = config.DEFAULT_REPORT_LEVEL,
+    sphinx_source_dir: pathlib.Path | None = None,
+    *,
+    warn_unknown_settings: bool = False,
+) -> types.YieldedLintError:
+    """Check the given rst source for issues.
+
+    Drop-in replacement for :py:func:`rstcheck_core.checker.check_source`.
+
+    :param source: Rst source to check
+    :param source_file: Path to file the source comes from if it comes from a file;
+        defaults to :py:obj:`None`
+    :param ignores: Ignore information; defaults to :py:obj:`None`
+    :param report_level: Report level; defaults to
+        :py:data:`rstcheck_core.config.DEFAULT_REPORT_LEVEL`
+    :param sphinx_source_dir: Path to the sphinx 'source' directory; defaults to :py:obj:`None`
+    :param warn_unknown_settings: If a warning should be logged for unknown settings in config file;
+        defaults to :py:obj:`False`
+    :return: :py:obj:`None`
+    :yield: Found issues
+    """
+    prepared_source = prepare_source(
+        source,
+        source_file=source_file,
+        ignores=ignores,
+        report_level=report_level,
+        sphinx_source_dir=sphinx_source_dir,
+        warn_unknown_settings=warn_unknown_settings,
+    )
+    yield from prepared_source.include_errors
+    yield from run_code_block_checks(prepared_source)
+    yield from prepared_source.rst_errors
+
+
+def prepare_file(
+    source_file: pathlib.Path,
+    rstcheck_config: config.RstcheckConfig,
+    overwrite_with_file_config: bool = True,  # noqa: FBT001,FBT002
+) -> PreparedSource:
+    """Load the given file and its config and parse it.
+
+    On every call docutils' roles and directives are reset to the state for the ignores of the
+    run config via :py:data:`rstcheck._registry.registry`.
+
+    Like :py:func:`prepare_source` it is to be called within
+    :py:func:`rstcheck_core._sphinx.load_sphinx_if_available`, so the callers can run the code
+    block checks with the same dummy Sphinx application.
+
+    :param source_file: Path to file to check
+    :param rstcheck_config: Main configuration of the application
+    :param overwrite_with_file_config: If the loaded file config should overwrite the
+        ``rstcheck_config``;
+        defaults to :py:obj:`True`
+    :return: Prepared source
+    """
+    logger.info("Check file '%s'", source_file)
+    run_config = checker._load_run_config(  # noqa: SLF001
+        source_file.parent, rstcheck_config, overwrite_config=overwrite_with_file_config
+    )
+    ignore_dict = checker._create_ignore_dict_from_config(run_config)  # noqa: SLF001
+
+    source = checker._get_source(source_file)  # noqa: SLF001
+    if _metrics.current is not None:
+        _metrics.current.count("files_checked")
+        _metrics.current.count("bytes_read", amount=len(source.encode("utf-8")))
+
+    _registry.registry.activate(ignore_dict["directives"], ignore_dict["roles"])
+
+    return prepare_source(
+        source,
+        source_file=source_file,
+        ignores=ignore_dict,
+        report_level=run_config.report_level or config.DEFAULT_REPORT_LEVEL,
+        sphinx_source_dir=run_config.sphinx_source_dir,
+        warn_unknown_settings=run_config.warn_unknown_settings or False,
+    )
+
+
+def check_file(
+    source_file: pathlib.Path,
+    rstcheck_config: config.RstcheckConfig,
+    overwrite_with_file_config: bool = True,  # noqa: FBT001,FBT002
+) -> list[types.LintError]:
+    """Check the given file for issues.
+
+    Drop-in replacement for :py:func:`rstcheck_core.checker.check_file`.
+
+    :param source_file: Path to file to check
+    :param rstcheck_config: Main configuration of the application
+    :param overwrite_with_file_config: If the loaded file config should overwrite the
+        ``rstcheck_config``;
+        defaults to :py:obj:`True`
+    :return: A list of found issues
+    """
+    with docutils_lock, _sphinx.load_sphinx_if_available():
+        prepared_source = prepare_file(source_file, rstcheck_config, overwrite_with_file_config)
+        (code_block_errors, external_indices) = run_in_process_checks(prepared_source)
+
+    # External tools run without holding the lock, so other threads can use docutils meanwhile.
+    for index in external_indices:
+        code_block_errors[index] = list(
+            run_code_block_check(prepared_source, prepared_source.checks[index])
+        )
+
+    return [
+        *prepared_source.include_errors,
+        *filter_ignored_messages(
+            (error for _, errors in sorted(code_block_errors.items()) for error in errors),
+            prepared_source.ignores["messages"],
+        ),
+        *prepared_source.rst_errors,
+    ]
@@ -0,0 +1,176 @@
+"""Checker plugins shipped with rstcheck, see :py:data:`rstcheck.plugins.BUILTIN_PLUGINS`."""
+
+from __future__ import annotations
+
+import configparser
+import logging
+import re
+import typing as t
+
+from .plugins import CodeBlockPlugin, Issue
+
+if t.TYPE_CHECKING:
+    import types
+
+logger = logging.getLogger(__name__)
+
+TOML_LINE_REGEX = re.compile(r"\(at line (\d+), column \d+\)$")
+"""Location at the end of the messages of :py:class:`tomllib.TOMLDecodeError`."""
+MARKDOWN_REFERENCE_REGEX = re.compile(r"(?<![\w\])}])\[([^\[\]]+)\]\[([^\[\]]*)\]")
+"""Full or collapsed reference link; left as text by Markdown parsers if it is not defined.
+
+Brackets directly after a word or closing bracket are indexes like ``matrix[0][1]``.
+"""
+MARKDOWN_INDEX_REGEX = re.compile(r"[\d\s.,:+\-*/%]+")
+"""Numeric or expression-like link text, e.g. of ``[0][1]``, which is no reference link."""
+MARKDOWN_CODE_SPAN_REGEX = re.compile(r"(`+).+?\1", re.DOTALL)
+"""Code span, whose content is no reference link."""
+
+
+class TomlChecker(CodeBlockPlugin):
+    """Checks TOML code blocks for syntax errors; requires ``tomli`` before Python 3.11."""
+
+    kind = "cpu"
+
+    def __init__(self) -> None:
+        """Initialize :py:class:`TomlChecker`."""
+        try:
+            import tomllib  # noqa: PLC0415
+        except ModuleNotFoundError:  # pragma: no cover
+            try:
+                import tomli as tomllib  # type: ignore[import-not-found,no-redef] # noqa: PLC0415
+            except ModuleNotFoundError:
+                tomllib = None  # type: ignore[assignment]
+        self.tomllib: types.ModuleType | None = tomllib
+
+    def check(self, source_code: str) -> t.Iterator[Issue]:
+        """Check TOML source for syntax errors.
+
+        :param source_code: TOML source code to check
+        :return: :py:obj:`None`
+        :yield: Found issues
+        """
+        if self.tomllib is None:  # pragma: no cover
+            logger.debug("No TOML library is installed, ignoring TOML source.")
+            return
+        logger.debug("Check TOML source.")
+        try:
+            self.tomllib.loads(source_code)
+        except self.tomllib.TOMLDecodeError as exception:
+            message = f"{exception}"
+            found = TOML_LINE_REGEX.search(message)
+            yield (int(found.group(1)) if found else 0, message)
+
+
+class IniChecker(CodeBlockPlugin):
+    """Checks INI code blocks for syntax errors like :py:mod:`configparser` reads them."""
+
+    kind = "cpu"
+
+    def check(self, source_code: str) -> t.Iterator[Issue]:
+        """Check INI source for syntax errors.
+
+        Only the first invalid line is reported.
+
+        :param source_code: INI source code to check
+        :return: :py:obj:`None`
+        :yield: Found issues
+        """
+        logger.debug("Check INI source.")
+        parser = configparser.ConfigParser(interpolation=None)
+        try:
+            parser.read_string(source_code)
+        except configparser.MissingSectionHeaderError as exception:
+            yield (exception.lineno, "File contains no section headers.")
+        except (configparser.DuplicateSectionError, configparser.DuplicateOptionError) as exception:
+            message = f"{exception}".split(": ", 1)[-1]
+            yield (exception.lineno or 0, message)
+        except configparser.ParsingError as exception:
+            (line_number, line) = exception.errors[0]
+            yield (line_number, f"Invalid line: {line}")
+
+
+class MarkdownChecker(CodeBlockPlugin):
+    """Checks Markdown code blocks for undefined link references.
+
+    Unclosed code fences are no error, as CommonMark closes them at the end of the document.
+    The sources are only parsed into tokens, never rendered. The parser is created once per
+    process; only sources which may contain reference links are parsed.
+    Requires ``markdown-it-py``, which is installed with ``typer``.
+    """
+
+    kind = "batch"
+
+    def __init__(self) -> None:
+        """Initialize :py:class:`MarkdownChecker`."""
+        try:
+            import markdown_it  # noqa: PLC0415
+        except ModuleNotFoundError:  # pragma: no cover
+            self.parser = None
+            return
+        self.parser = markdown_it.MarkdownIt("commonmark")
+
+    def check_batch(self, sources: t.Sequence[str]) -> list[list[Issue]]:
+        """Check Markdown sources for undefined link references.
+
+        :param sources: Markdown source code of the code blocks
+        :return: Found issues per source, in order of the sources
+        """
+        if self.parser is None:  # pragma: no cover
+            logger.debug("markdown-it-py is not installed, ignoring Markdown sources.")
+            return [[] for _ in sources]
+        logger.debug("Check %s Markdown source(s).", len(sources))
+        results = []
+        for source_code in sources:
+            issues: list[Issue] = []
+            results.append(issues)
+            if "][" not in source_code:
+                continue
+            env: dict[str, t.Any] = {}
+            for token in self.parser.parse(source_code, env):
+                if token.type == "inline" and token.children and token.map is not None:
+                    issues.extend(
+                        _undefined_references(token.content, token.map[0], env, token.children)
+                    )
+        return results
+
+    def check(self, source_code: str) -> t.Iterator[Issue]:
+        """Check Markdown source for undefined link references.
+
+        :param source_code: Markdown source code to check
+        :return: :py:obj:`None`
+        :yield: Found issues
+        """
+        yield from self.check_batch([source_code])[0]
+
+
+def _undefined_references(
+    content: str, first_line: int, env: dict[str, t.Any], children: list[t.Any]
+) -> t.Iterator[Issue]:
+    """Find reference links left as text of an inline token because they are not defined.
+
+    :param content: Raw content of the inline token; reference links only count if found in it
+    :param first_line: Line index of the inline token in the source, starting at 0
+    :param env: Environment of the parser with the defined references
+    :param children: Child tokens of the inline token
+    :return: :py:obj:`None`
+    :yield: Found issues
+    """
+    from markdown_it.common.utils import normalizeReference  # noqa: PLC0415
+
+    references = env.get("references", {})
+    content = MARKDOWN_CODE_SPAN_REGEX.sub(
+        lambda code_span: re.sub(r"[^\n]", " ", code_span.group(0)), content
+    )
+    for child in children:
+        if child.type != "text":
+            continue
+        for found in MARKDOWN_REFERENCE_REGEX.finditer(child.content):
+            if MARKDOWN_INDEX_REGEX.fullmatch(found.group(1)):
+                continue
+            label = found.group(2) or found.group(1)
+            offset = content.find(found.group(0))
+            if offset < 0 or normalizeReference(label) in references:
+                continue
+            line_number = first_line + content.count("\n", 0, offset) + 1
+            yield (line_number, f"Link reference '{label}' is not defined.")
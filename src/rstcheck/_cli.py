@@ -4,11 +4,14 @@ from __future__ import annotations
 
 import logging
 import pathlib
+import sys
 import typing as t
 from importlib.metadata import version
 
 import typer
-from rstcheck_core import _extras, config as config_mod, runner
+from rstcheck_core import _extras, config as config_mod
+
+from . import _baseline, _discovery, _metrics, _runner, _subprocesses
 
 HELP_CONFIG = """Config file to load. Can be a INI file or directory.
 If a directory is passed it will be searched for .rstcheck.cfg | setup.cfg.
@@ -22,6 +25,19 @@ If 'NONE' is passed no config file is loaded at all.
 HELP_WARN_UNKNOWN_SETTINGS = """Log a WARNING for unknown settings in config files.
 Can be hidden via --log-level."""
 HELP_RECURSIVE = "Recursively search passed directories for RST files to check."
+HELP_EXCLUDE = """Comma-separated-list of gitignore style patterns of files and directories to
+skip when searching directories. Files and directories ignored by '.gitignore' files are
+skipped too, unless --no-gitignore is passed.
+Can be set in config file.
+"""
+HELP_GITIGNORE = """Skip files and directories ignored by '.gitignore' files when searching
+directories. Defaults to on.
+Can be set in config file.
+"""
+HELP_INCLUDE = """Comma-separated-list of gitignore style patterns of files to check when searching
+directories. Defaults to '*.rst'.
+Can be set in config file.
+"""
 HELP_REPORT_LEVEL = f"""The report level of the linting issues found.
 Valid levels are: INFO | WARNING | ERROR | SEVERE | NONE.
 Defaults to {config_mod.DEFAULT_REPORT_LEVEL.name}.
@@ -52,6 +68,46 @@ and automatic discovery fails.
 May be relative or absolute.
 Can be set in config file.
 """
+HELP_CACHE_DIR = """Directory to keep data between runs in.
+The check duration of every file is stored there and used to check the slowest files first.
+Not used if not set.
+"""
+HELP_PRE_COMMIT = """Optimize for the few files of a commit.
+Small batches of files are checked without starting worker processes.
+Used by the 'rstcheck-parallel' pre-commit hook.
+"""
+HELP_METRICS_FILE = """File to write metrics of the checks to, like the number of files and code
+blocks checked, cache hits and misses and a histogram of the check duration per file.
+Written in the OpenMetrics text format for the suffixes '.prom', '.om' and '.txt', else as JSON.
+"""
+HELP_SUBPROCESS_TIMEOUT = f"""Comma-separated-list of timeouts in seconds for external tools checking
+code blocks, e.g. gcc. Entries like 'cpp=120' set the timeout for a language, a plain number the
+default timeout. 0 disables a timeout.
+Defaults to {_subprocesses.DEFAULT_TIMEOUT:g}.
+"""
+HELP_SUBPROCESS_MEMORY_LIMIT = """Address space limit in MiB for external tools checking code
+blocks. 0 disables the limit. Not supported on Windows.
+Defaults to no limit.
+"""
+HELP_MAX_SUBPROCESSES = """Maximum number of external tools checking code blocks running at the
+same time across all worker processes.
+Defaults to the number of worker processes.
+"""
+HELP_SHARD = """Check only a part of the files, e.g. '2/3' for the second of three parts, to split a
+run across CI machines. The files are balanced by the timing history in --cache-dir or else by
+size; all shards must get the same paths and options.
+Combine the results of the shards via --results-file and 'rstcheck merge'.
+"""
+HELP_RESULTS_FILE = """File to write the found issues to as JSON, to combine the results of
+shards via 'rstcheck merge RESULTS_FILES...'.
+"""
+HELP_BASELINE = """File with accepted issues, e.g. of legacy documents, which are not reported.
+Issues match by file, message and the content of their line, so they still match after lines
+were inserted or removed above them. Write it via --write-baseline.
+"""
+HELP_WRITE_BASELINE = """Write all found issues into the --baseline file to accept them.
+"""
+HELP_MERGE_RESULTS_FILES = "Results files written with --results-file."
 HELP_VERSION = "Print versions and exit."
 
 
@@ -69,6 +125,22 @@ def setup_logger(loglevel: str) -> None:
     logging.basicConfig(level=numeric_level)
 
 
+def _load_baseline(baseline_file: pathlib.Path) -> _baseline.Baseline:
+    """Load the baseline file passed via ``--baseline``.
+
+    :param baseline_file: Path of the baseline file
+    :raises typer.BadParameter: If the file cannot be read or is no baseline file
+    :return: Baseline
+    """
+    try:
+        return _baseline.Baseline.load(baseline_file)
+    except OSError as exc:
+        msg = f"Could not read baseline file '{baseline_file}': {exc.strerror}."
+        raise typer.BadParameter(msg, param_hint="--baseline") from None
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--baseline") from None
+
+
 def version_callback(value: bool) -> None:  # noqa: FBT001
     """Print the version and exit."""
     if value:
@@ -84,6 +156,9 @@ def cli(  # noqa: PLR0913, PLR0917
         None, "--warn-unknown-settings", help=HELP_WARN_UNKNOWN_SETTINGS
     ),
     recursive: bool | None = typer.Option(None, "--recursive", "-r", help=HELP_RECURSIVE),  # noqa: FBT001
+    exclude: str | None = typer.Option(None, metavar="PATTERNS", help=HELP_EXCLUDE),
+    include: str | None = typer.Option(None, metavar="PATTERNS", help=HELP_INCLUDE),
+    gitignore: bool | None = typer.Option(None, "--gitignore/--no-gitignore", help=HELP_GITIGNORE),  # noqa: FBT001
     report_level: str | None = typer.Option(None, metavar="LEVEL", help=HELP_REPORT_LEVEL),
     # TODO: #i# use `t.Literal["INFO", "WARNING", "ERROR", "SEVERE", "NONE"]` when supported
     log_level: str = typer.Option("WARNING", metavar="LEVEL", help=HELP_LOG_LEVEL),
@@ -93,6 +168,24 @@ def cli(  # noqa: PLR0913, PLR0917
     ignore_languages: str | None = typer.Option(None, help=HELP_IGNORE_LANGUAGES),
     ignore_messages: str | None = typer.Option(None, metavar="REGEX", help=HELP_IGNORE_MESSAGES),
     sphinx_source_dir: pathlib.Path | None = typer.Option(None, help=HELP_SPHINX_SOURCE_DIR),
+    cache_dir: pathlib.Path | None = typer.Option(None, metavar="DIR", help=HELP_CACHE_DIR),
+    pre_commit: bool | None = typer.Option(None, "--pre-commit", help=HELP_PRE_COMMIT),  # noqa: FBT001
+    metrics_file: pathlib.Path | None = typer.Option(None, metavar="FILE", help=HELP_METRICS_FILE),
+    subprocess_timeout: str | None = typer.Option(
+        None, metavar="TIMEOUTS", help=HELP_SUBPROCESS_TIMEOUT
+    ),
+    subprocess_memory_limit: int | None = typer.Option(
+        None, metavar="MIB", min=0, help=HELP_SUBPROCESS_MEMORY_LIMIT
+    ),
+    max_subprocesses: int | None = typer.Option(None, min=1, help=HELP_MAX_SUBPROCESSES),
+    shard: str | None = typer.Option(None, metavar="INDEX/TOTAL", help=HELP_SHARD),
+    results_file: pathlib.Path | None = typer.Option(None, metavar="FILE", help=HELP_RESULTS_FILE),
+    baseline_file: pathlib.Path | None = typer.Option(
+        None, "--baseline", metavar="FILE", dir_okay=False, help=HELP_BASELINE
+    ),
+    write_baseline: bool | None = typer.Option(  # noqa: FBT001
+        None, "--write-baseline", help=HELP_WRITE_BASELINE
+    ),
     version: bool | None = typer.Option(  # noqa: ARG001, FBT001
         None, "--version", callback=version_callback, is_eager=True, help=HELP_VERSION
     ),
@@ -105,10 +198,15 @@ def cli(  # noqa: PLR0913, PLR0917
         typer.echo("'-' is only allowed without additional files.", err=True)
         raise typer.Abort
 
+    try:
+        parsed_shard = _runner.parse_shard(shard) if shard is not None else None
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--shard") from None
+
     sphinx_source_dir_absolute = sphinx_source_dir
     if sphinx_source_dir is not None and not sphinx_source_dir.is_absolute():
         sphinx_source_dir_absolute = pathlib.Path.cwd() / sphinx_source_dir
-        logger.info(f"Relative sphinx 'source' dir path resolved to: {sphinx_source_dir_absolute}")
+        logger.info("Relative sphinx 'source' dir path resolved to: %s", sphinx_source_dir_absolute)
 
     logger.info("Create main configuration from CLI options.")
     rstcheck_config = config_mod.RstcheckConfig(
@@ -124,16 +222,51 @@ def cli(  # noqa: PLR0913, PLR0917
         sphinx_source_dir=sphinx_source_dir_absolute,
     )
 
+    try:
+        subprocess_limits = _subprocesses.SubprocessLimits.from_options(
+            subprocess_timeout, subprocess_memory_limit, max_subprocesses
+        )
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--subprocess-timeout") from None
+
+    if write_baseline and baseline_file is None:
+        msg = "--write-baseline requires --baseline."
+        raise typer.BadParameter(msg, param_hint="--write-baseline")
+    baseline = _load_baseline(baseline_file) if baseline_file and not write_baseline else None
+
     exit_code = 1
+    metrics = _metrics.Metrics() if metrics_file is not None else None
 
     try:
         logger.debug("Create main runner instance.")
-        _runner = runner.RstcheckMainRunner(
-            check_paths=files, rstcheck_config=rstcheck_config, overwrite_config=False
+        main_runner = _runner.RstcheckMainRunner(
+            check_paths=files,
+            rstcheck_config=rstcheck_config,
+            overwrite_config=False,
+            cache_dir=cache_dir,
+            pre_commit=pre_commit or False,
+            exclude=_discovery.split_patterns(exclude),
+            include=_discovery.split_patterns(include),
+            metrics=metrics,
+            subprocess_limits=subprocess_limits,
+            shard=parsed_shard,
+            baseline=baseline,
+            use_gitignore=gitignore,
         )
         logger.info("Run main runner instance.")
-        _runner.check()
-        exit_code = _runner.print_result()
+        main_runner.check()
+        if write_baseline and baseline_file is not None:
+            baseline = _baseline.Baseline.from_results(main_runner.results, baseline_file.parent)
+            baseline.write(baseline_file)
+            main_runner.apply_baseline(baseline)
+        if metrics_file is not None and metrics is not None:
+            try:
+                metrics.write(metrics_file)
+            except OSError:
+                logger.warning("Could not write metrics to: '%s'.", metrics_file)
+        exit_code = main_runner.print_result()
+        if results_file is not None:
+            main_runner.write_results(results_file)
 
     except FileNotFoundError as exc:
         if exc.strerror == "Passed config path not found.":  # pragma: no cover
@@ -161,13 +294,61 @@ Pass "-" if you want to read from stdin.
 """
 
 
+def merge(
+    results_files: t.List[pathlib.Path] = typer.Argument(  # noqa: UP006
+        ..., exists=True, dir_okay=False, help=HELP_MERGE_RESULTS_FILES
+    ),
+    log_level: str = typer.Option("WARNING", metavar="LEVEL", help=HELP_LOG_LEVEL),
+    baseline_file: pathlib.Path | None = typer.Option(
+        None, "--baseline", metavar="FILE", dir_okay=False, help=HELP_BASELINE
+    ),
+) -> None:
+    """Combine the results of shards into one report.
+
+    Pass the RESULTS_FILES written by 'rstcheck --shard INDEX/TOTAL --results-file FILE' for all
+    shards. The issues are printed in the order of an unsharded run and the exit code is 1 if
+    any shard found issues.
+    """
+    setup_logger(log_level)
+
+    try:
+        merged = _runner.merge_results(results_files)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="RESULTS_FILES") from None
+
+    results = merged.results
+    baseline_count = 0
+    if baseline_file is not None:
+        (results, baseline_count) = _load_baseline(baseline_file).apply(results)
+
+    exit_code = _runner.write_report(
+        results,
+        duplicate_count=merged.duplicate_count,
+        has_nonexisting_paths=bool(merged.nonexisting_paths),
+        baseline_count=baseline_count,
+    )
+    raise typer.Exit(code=exit_code)
+
+
 app = typer.Typer()
 app.command()(cli)
 typer_click_object = typer.main.get_command(app)
 
+merge_app = typer.Typer()
+merge_app.command()(merge)
+
+MERGE_COMMAND = "merge"
+"""First argument which runs :py:func:`merge` instead of :py:func:`cli`; pass a file named like
+this with a directory, e.g. './merge'."""
+
 
 def main() -> None:  # pragma: no cover
     """Run CLI."""
+    if sys.argv[1:2] == [MERGE_COMMAND]:
+        typer.main.get_command(merge_app)(
+            args=sys.argv[2:], prog_name=f"{pathlib.Path(sys.argv[0]).name} {MERGE_COMMAND}"
+        )
+        return
     typer.run(cli)
 
 
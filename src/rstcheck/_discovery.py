@@ -0,0 +1,442 @@
+"""Discovery of files to check.
+
+Directories are traversed with :py:func:`os.scandir` and pruned as early as possible:
+
+- Hidden files and directories (starting with ``.``) are skipped.
+- Virtual environments (directories with a ``pyvenv.cfg`` file) are skipped.
+- Files and directories ignored by ``.gitignore`` files are skipped, unless disabled. The
+  ``.gitignore`` files of the traversed directories and of their parent directories up to the
+  git repository root are used.
+- Files and directories matching an exclude pattern are skipped.
+
+Files are yielded as soon as they are found, so checking them can start before the traversal is
+done. The discovery settings are read only from the config file of the run, see
+:py:func:`load_path_patterns`; config files in the searched directories are not used for them.
+"""
+
+from __future__ import annotations
+
+import configparser
+import logging
+import os
+import pathlib
+import re
+import typing as t
+
+from rstcheck_core import config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INCLUDE = ["*.rst"]
+"""Patterns of files to check in searched directories, if no patterns are configured."""
+GITIGNORE_FILE_NAME = ".gitignore"
+"""Name of the files with patterns of files git ignores."""
+VIRTUALENV_MARKER = "pyvenv.cfg"
+"""File name marking a directory as virtual environment."""
+
+
+class PathPatterns(t.NamedTuple):
+    """Patterns for the discovery of files set in a config file."""
+
+    exclude: list[str] | None
+    """Patterns of files and directories to skip in searched directories."""
+    include: list[str] | None
+    """Patterns of files to check in searched directories."""
+    gitignore: bool | None = None
+    """If ``.gitignore`` files are respected in searched directories."""
+
+
+def split_patterns(value: str | list[str] | None) -> list[str] | None:
+    """Split a comma-separated-list of patterns.
+
+    :param value: Comma-separated-list or list of patterns
+    :return: List of patterns; :py:obj:`None` if no value is given
+    """
+    if value is None:
+        return None
+    values = value.split(",") if isinstance(value, str) else value
+    return [pattern.strip() for pattern in values if pattern.strip()]
+
+
+def parse_bool(value: str | bool | None) -> bool | None:  # noqa: FBT001
+    """Parse a boolean setting of a config file.
+
+    :param value: Boolean or string like ``true`` or ``no``
+    :raises ValueError: If the string is no boolean
+    :return: Parsed value; :py:obj:`None` if no value is given
+    """
+    if value is None or isinstance(value, bool):
+        return value
+    try:
+        return configparser.ConfigParser.BOOLEAN_STATES[value.strip().casefold()]
+    except KeyError:
+        msg = f"Invalid boolean value: '{value}'."
+        raise ValueError(msg) from None
+
+
+def _load_toml_file(toml_file: pathlib.Path) -> dict[str, t.Any] | None:
+    """Load a TOML file.
+
+    :param toml_file: TOML file to load
+    :return: Loaded data; :py:obj:`None` if no TOML library is installed
+    """
+    try:
+        import tomllib  # noqa: PLC0415
+    except ModuleNotFoundError:  # pragma: no cover
+        try:
+            import tomli as tomllib  # type: ignore[import-not-found,no-redef] # noqa: PLC0415
+        except ModuleNotFoundError:
+            return None
+
+    with toml_file.open("rb") as toml_file_handle:
+        return tomllib.load(toml_file_handle)
+
+
+def _load_path_patterns_from_file(config_file: pathlib.Path) -> PathPatterns | None:
+    """Load the discovery patterns from a config file.
+
+    :param config_file: INI or TOML config file
+    :return: Loaded patterns; :py:obj:`None` if the file has no rstcheck section
+    """
+    section: dict[str, t.Any] | None
+    if config_file.suffix.casefold() == ".toml":
+        toml_dict = _load_toml_file(config_file)
+        section = toml_dict.get("tool", {}).get("rstcheck") if toml_dict is not None else None
+    else:
+        parser = configparser.ConfigParser()
+        parser.read(config_file)
+        section = dict(parser.items("rstcheck")) if parser.has_section("rstcheck") else None
+
+    if section is None:
+        return None
+
+    logger.debug("Loaded discovery patterns from config file: '%s'.", config_file)
+    return PathPatterns(
+        exclude=split_patterns(section.get("exclude")),
+        include=split_patterns(section.get("include")),
+        gitignore=parse_bool(section.get("gitignore")),
+    )
+
+
+def _load_path_patterns_from_dir(directory: pathlib.Path) -> PathPatterns | None:
+    """Load the discovery patterns from the first config file with a rstcheck section.
+
+    :param directory: Directory to search for the files in
+        :py:data:`rstcheck_core.config.CONFIG_FILES`
+    :return: Loaded patterns; :py:obj:`None` if no config file has a rstcheck section
+    """
+    for file_name in config.CONFIG_FILES:
+        config_file = directory / file_name
+        if config_file.is_file():
+            path_patterns = _load_path_patterns_from_file(config_file)
+            if path_patterns is not None:
+                return path_patterns
+    return None
+
+
+def load_path_patterns(config_path: pathlib.Path | None) -> PathPatterns:
+    """Load the discovery patterns from the config file.
+
+    Without a config path the current working directory and its parents are searched for a
+    config file. Only this one config file is used for all searched directories.
+
+    :param config_path: Config file or directory to load the patterns from
+    :return: Loaded patterns; unset patterns are :py:obj:`None`
+    """
+    path_patterns = None
+    if config_path is None:
+        search_dir = pathlib.Path.cwd()
+        for directory in (search_dir, *search_dir.parents):
+            path_patterns = _load_path_patterns_from_dir(directory)
+            if path_patterns is not None:
+                break
+    elif config_path.name == "NONE":
+        pass
+    elif config_path.is_file():
+        path_patterns = _load_path_patterns_from_file(config_path)
+    elif config_path.is_dir():
+        path_patterns = _load_path_patterns_from_dir(config_path)
+
+    return path_patterns or PathPatterns(exclude=None, include=None)
+
+
+def _translate_glob(pattern: str) -> str:
+    """Translate a gitignore style glob pattern into a regular expression.
+
+    ``*`` and ``?`` do not match ``/``; ``**`` matches across directories.
+
+    :param pattern: Glob pattern without leading or trailing ``/``
+    :return: Regular expression
+    """
+    regex = ""
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if pattern.startswith("**/", index):
+            regex += "(?:.*/)?"
+            index += 3
+            continue
+        if pattern.startswith("**", index):
+            regex += ".*"
+            index += 2
+            continue
+        if char == "*":
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[" and "]" in pattern[index + 2 :]:
+            end = pattern.index("]", index + 2)
+            char_class = pattern[index + 1 : end]
+            if char_class.startswith("!"):
+                char_class = "^" + char_class[1:]
+            regex += f"[{char_class}]"
+            index = end
+        elif char == "\\" and index + 1 < len(pattern):
+            index += 1
+            regex += re.escape(pattern[index])
+        else:
+            regex += re.escape(char)
+        index += 1
+    return regex
+
+
+class _PathRule(t.NamedTuple):
+    """A gitignore style pattern relative to a base directory."""
+
+    base: str
+    """Absolute path of the base directory with trailing ``/``."""
+    regex: re.Pattern[str]
+    """Compiled pattern, matched against the path relative to the base directory."""
+    anchored: bool
+    """If the pattern only matches relative to the base directory."""
+    negated: bool
+    """If a match re-includes the path."""
+    directory_only: bool
+    """If the pattern only matches directories."""
+
+    @classmethod
+    def from_pattern(cls, pattern: str, base: str, *, ignore_case: bool = False) -> _PathRule:
+        """Create a rule from a gitignore style pattern.
+
+        :param pattern: Pattern
+        :param base: Absolute path of the base directory with ``/`` as separator
+        :param ignore_case: If the pattern matches case insensitive; defaults to :py:obj:`False`
+        :return: Rule
+        """
+        negated = pattern.startswith("!")
+        pattern = pattern.removeprefix("!")
+        directory_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        anchored = "/" in pattern
+        pattern = pattern.lstrip("/")
+        regex = _translate_glob(pattern)
+        if not anchored:
+            regex = "(?:.*/)?" + regex
+        return cls(
+            base=base.rstrip("/") + "/",
+            regex=re.compile(regex + r"\Z", re.IGNORECASE if ignore_case else 0),
+            anchored=anchored,
+            negated=negated,
+            directory_only=directory_only,
+        )
+
+    def matches(self, path: str, *, is_dir: bool) -> bool:
+        """Check if the rule matches a path.
+
+        :param path: Absolute path with ``/`` as separator
+        :param is_dir: If the path is a directory
+        :return: If the rule matches
+        """
+        if self.directory_only and not is_dir:
+            return False
+        if path.startswith(self.base):
+            relative_path = path[len(self.base) :]
+        elif self.anchored:
+            return False
+        else:
+            relative_path = path.lstrip("/")
+        return self.regex.match(relative_path) is not None
+
+
+def _is_excluded(rules: t.Sequence[_PathRule], path: str, *, is_dir: bool) -> bool:
+    """Check if a path is excluded by gitignore style rules; the last matching rule wins.
+
+    :param rules: Rules in order of precedence, lowest first
+    :param path: Absolute path with ``/`` as separator
+    :param is_dir: If the path is a directory
+    :return: If the path is excluded
+    """
+    excluded = False
+    for rule in rules:
+        if excluded is not rule.negated:
+            continue
+        if rule.matches(path, is_dir=is_dir):
+            excluded = not rule.negated
+    return excluded
+
+
+def _posix_path(path: str) -> str:
+    """Use ``/`` as separator in a path.
+
+    :param path: Path
+    :return: Path with ``/`` as separator
+    """
+    return path if os.sep == "/" else path.replace(os.sep, "/")
+
+
+def _read_gitignore(directory: str) -> list[_PathRule]:
+    """Read the rules of the ``.gitignore`` file in a directory.
+
+    :param directory: Absolute path of the directory
+    :return: Rules; empty if there is no ``.gitignore`` file
+    """
+    try:
+        with open(os.path.join(directory, GITIGNORE_FILE_NAME), encoding="utf-8") as gitignore:
+            lines = gitignore.read().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return []
+
+    base = _posix_path(directory)
+    rules = []
+    for line in lines:
+        pattern = line.rstrip(" ")
+        if not pattern or pattern.startswith("#"):
+            continue
+        rules.append(_PathRule.from_pattern(pattern, base))
+    return rules
+
+
+def _parent_gitignore_rules(directory: str) -> list[_PathRule]:
+    """Read the ``.gitignore`` files of the parents of a directory inside a git repository.
+
+    :param directory: Absolute path of the directory
+    :return: Rules of the parents from the repository root downwards; empty outside of a git
+        repository
+    """
+    if os.path.exists(os.path.join(directory, ".git")):
+        return []
+
+    parents = []
+    current = directory
+    while True:
+        parent = os.path.dirname(current)
+        if parent == current:
+            return []
+        parents.append(parent)
+        if os.path.exists(os.path.join(parent, ".git")):
+            break
+        current = parent
+
+    return [rule for parent in reversed(parents) for rule in _read_gitignore(parent)]
+
+
+class FileFinder:
+    """Find files to check in the given paths."""
+
+    def __init__(
+        self,
+        *,
+        recursive: bool,
+        exclude: t.Sequence[str] | None = None,
+        include: t.Sequence[str] | None = None,
+        use_gitignore: bool = True,
+    ) -> None:
+        """Initialize :py:class:`FileFinder`.
+
+        Patterns are gitignore style patterns. Patterns containing a ``/`` are relative to the
+        current working directory, others match the file or directory name in any directory.
+
+        :param recursive: If directories are searched
+        :param exclude: Patterns of files and directories to skip in searched directories;
+            defaults to none
+        :param include: Patterns of files to check; defaults to :py:data:`DEFAULT_INCLUDE`
+        :param use_gitignore: If ``.gitignore`` files are respected in searched directories;
+            defaults to :py:obj:`True`
+        """
+        base = _posix_path(os.getcwd())
+        self.recursive = recursive
+        self.use_gitignore = use_gitignore
+        self._exclude_rules = [_PathRule.from_pattern(pattern, base) for pattern in exclude or ()]
+        self._include_rules = [
+            _PathRule.from_pattern(pattern, base, ignore_case=True)
+            for pattern in include or DEFAULT_INCLUDE
+        ]
+
+    def is_included(self, path: str) -> bool:
+        """Check if a file is to be checked by its name.
+
+        :param path: Absolute path with ``/`` as separator
+        :return: If the file is to be checked
+        """
+        return any(rule.matches(path, is_dir=False) for rule in self._include_rules)
+
+    def find(self, paths: t.Iterable[pathlib.Path]) -> t.Iterator[pathlib.Path]:
+        """Find the files to check.
+
+        Passed files are used if they match an include pattern. Passed directories are searched
+        if :py:attr:`recursive` is set.
+
+        :param paths: Existing files and directories
+        :return: :py:obj:`None`
+        :yield: Files to check
+        """
+        for path in paths:
+            absolute_path = os.path.abspath(path)
+            if os.path.isdir(absolute_path):
+                if self.recursive:
+                    yield from self._search(str(path), absolute_path)
+                continue
+
+            name = os.path.basename(absolute_path)
+            if not name.startswith(".") and self.is_included(_posix_path(absolute_path)):
+                yield path
+
+    def _search(self, directory: str, absolute_directory: str) -> t.Iterator[pathlib.Path]:
+        """Search a directory tree.
+
+        :param directory: Directory as passed
+        :param absolute_directory: Absolute path of the directory
+        :return: :py:obj:`None`
+        :yield: Files to check
+        """
+        logger.debug("Search directory: '%s'.", directory)
+        gitignore_rules = _parent_gitignore_rules(absolute_directory) if self.use_gitignore else []
+        stack = [(directory, absolute_directory, gitignore_rules)]
+
+        while stack:
+            (current, absolute_current, rules) = stack.pop()
+            try:
+                with os.scandir(absolute_current) as scanned:
+                    entries = sorted(scanned, key=lambda entry: entry.name)
+            except OSError as exc:
+                logger.warning("Cannot search directory: '%s': %s", current, exc)
+                continue
+
+            if any(entry.name == VIRTUALENV_MARKER for entry in entries):
+                logger.debug("Skip virtual environment: '%s'.", current)
+                continue
+            if self.use_gitignore and any(entry.name == GITIGNORE_FILE_NAME for entry in entries):
+                rules = [*rules, *_read_gitignore(absolute_current)]
+
+            subdirectories = []
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if not is_dir and not entry.is_file():
+                    continue
+
+                absolute_path = _posix_path(entry.path)
+                if _is_excluded(rules, absolute_path, is_dir=is_dir) or _is_excluded(
+                    self._exclude_rules, absolute_path, is_dir=is_dir
+                ):
+                    logger.debug("Skip excluded path: '%s'.", entry.path)
+                    continue
+
+                if is_dir:
+                    subdirectories.append((os.path.join(current, entry.name), entry.path, rules))
+                elif self.is_included(absolute_path):
+                    yield pathlib.Path(current, entry.name)
+
+            stack.extend(reversed(subdirectories))
@@ -0,0 +1,296 @@
+"""Precompiled headers for the include lines of C and C++ code blocks.
+
+Code blocks often start with the same ``#include`` lines, e.g. the headers of a documented
+library. Every compiler run parses these headers again, which usually takes much longer than
+checking the code block itself. Once the same include lines were seen :py:data:`MIN_USES` times
+with the same compiler arguments and working directory, :py:class:`PrecompiledHeaders` compiles
+them into a precompiled header. Further code blocks with these include lines are checked with the
+precompiled header passed via ``-include`` and their include lines replaced by blank lines, so
+the line numbers of issues are kept.
+
+The local headers a precompiled header depends on, as listed by the ``-MMD`` option of the
+compiler, are recorded with their modification time and size. A precompiled header is rebuilt
+when one of them changed. If it cannot be built, e.g. because the compiler does not support
+precompiled headers or a header has errors, code blocks are checked without it. A compiler
+ignores a precompiled header which does not fit its options and reads the header itself instead.
+
+All processes of a run share the precompiled headers in the directory of the main process, see
+:py:func:`get` and :py:func:`configure`. The directory is created when the first precompiled
+header is built, so runs without C or C++ code blocks do not create it.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import re
+import secrets
+import shutil
+import tempfile
+import threading
+
+from . import _metrics, _subprocesses
+
+logger = logging.getLogger(__name__)
+
+HEADER_LANGUAGES = {"c": "c-header", "cpp": "c++-header"}
+"""Languages whose include lines are precompiled with the compiler language of their headers."""
+MIN_USES = 2
+"""Number of code blocks with the same include lines from which on they are precompiled."""
+MAX_HEADERS = 32
+"""Maximum number of precompiled headers built per process, as they are large."""
+
+INCLUDE_REGEX = re.compile(r'\s*#\s*include\s*(?:<[^>]*>|"[^"]*")\s*(?://.*)?')
+"""Include line; with an optional line comment."""
+DEPENDENCY_SEPARATOR_REGEX = re.compile(r"(?<!\\)\s+")
+"""Separator of the paths in a make rule written by ``-MMD``."""
+
+
+def split_includes(source_code: str) -> tuple[list[str], str]:
+    """Split off the include lines at the start of C or C++ source.
+
+    Include lines are taken until the first line which is no include line, blank line or line
+    comment, e.g. a ``#define`` changing the meaning of later includes.
+
+    :param source_code: Source code of a code block
+    :return: Include lines and source code with the include lines replaced by blank lines
+    """
+    lines = source_code.split("\n")
+    includes = []
+    for index, line in enumerate(lines):
+        if INCLUDE_REGEX.fullmatch(line):
+            includes.append(line.strip())
+            lines[index] = ""
+        elif line.strip() and not line.lstrip().startswith("//"):
+            break
+    if not includes:
+        return ([], source_code)
+    return (includes, "\n".join(lines))
+
+
+def parse_dependencies(make_rule: str, cwd: pathlib.Path) -> list[pathlib.Path]:
+    """Parse the files a precompiled header depends on from the make rule written by ``-MMD``.
+
+    :param make_rule: Content of the dependency file
+    :param cwd: Working directory of the compiler; relative paths are relative to it
+    :return: Paths of the dependencies
+    """
+    (_, _, prerequisites) = make_rule.partition(": ")
+    prerequisites = prerequisites.replace("\\\n", " ").strip()
+    return [
+        cwd / path.replace("\\ ", " ")
+        for path in DEPENDENCY_SEPARATOR_REGEX.split(prerequisites)
+        if path
+    ]
+
+
+class PrecompiledHeaders:
+    """Precompiled headers for the include lines of code blocks, kept in a directory."""
+
+    def __init__(
+        self,
+        directory: pathlib.Path,
+        *,
+        min_uses: int = MIN_USES,
+        max_headers: int = MAX_HEADERS,
+    ) -> None:
+        """Initialize :py:class:`PrecompiledHeaders`.
+
+        :param directory: Directory to keep the precompiled headers in; shared between processes
+            and created when the first precompiled header is built
+        :param min_uses: Number of code blocks with the same include lines from which on they are
+            precompiled; defaults to :py:data:`MIN_USES`
+        :param max_headers: Maximum number of precompiled headers built by this instance;
+            defaults to :py:data:`MAX_HEADERS`
+        """
+        self.directory = directory
+        self.min_uses = min_uses
+        self.max_headers = max_headers
+        self._uses: dict[str, int] = {}
+        self._failed: set[str] = set()
+        self._built = 0
+        self._lock = threading.Lock()
+        self._key_locks: dict[str, threading.Lock] = {}
+
+    def apply(
+        self, language: str, arguments: list[str], source_code: str, cwd: pathlib.Path
+    ) -> tuple[list[str], str] | None:
+        """Use a precompiled header for the include lines of a code block, if worthwhile.
+
+        The precompiled header is built when the include lines are used often enough and there
+        is no current one. This runs the compiler.
+
+        :param language: Language of the code block; one of :py:data:`HEADER_LANGUAGES`
+        :param arguments: Compiler command and arguments to check the code block with
+        :param source_code: Source code of the code block
+        :param cwd: Working directory of the compiler
+        :return: Compiler arguments with the precompiled header and source code without its
+            include lines; :py:obj:`None` to check the code block unchanged
+        """
+        (includes, stripped_source_code) = split_includes(source_code)
+        if not includes:
+            return None
+
+        cwd = cwd.absolute()
+        key = hashlib.sha256(
+            json.dumps([language, arguments, str(cwd), includes]).encode("utf-8")
+        ).hexdigest()[:32]
+        with self._lock:
+            uses = self._uses[key] = self._uses.get(key, 0) + 1
+            failed = key in self._failed
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            usable = not failed and (
+                self._is_current(key)
+                or (
+                    uses >= self.min_uses
+                    and self._reserve()
+                    and self._build(key, language, arguments, includes, cwd)
+                )
+            )
+        if not usable:
+            _metrics.count("cache_misses", "precompiled_headers")
+            return None
+
+        _metrics.count("cache_hits", "precompiled_headers")
+        header = self.directory / f"{key}.h"
+        return ([arguments[0], "-include", str(header), *arguments[1:]], stripped_source_code)
+
+    def _is_current(self, key: str) -> bool:
+        """Check if the precompiled header exists and its dependencies did not change.
+
+        :param key: Key of the include lines
+        :return: If the precompiled header can be used
+        """
+        try:
+            dependencies = json.loads((self.directory / f"{key}.json").read_text("utf-8"))
+            for path, stat in dependencies.items():
+                current = pathlib.Path(path).stat()
+                if [current.st_mtime_ns, current.st_size] != stat:
+                    logger.debug("Dependency of precompiled header changed: '%s'.", path)
+                    return False
+            return (self.directory / f"{key}.h.gch").is_file()
+        except (OSError, ValueError):
+            return False
+
+    def _reserve(self) -> bool:
+        """Reserve a build of a precompiled header within :py:attr:`max_headers`.
+
+        :return: If a precompiled header may be built
+        """
+        with self._lock:
+            if self._built >= self.max_headers:
+                return False
+            self._built += 1
+            return True
+
+    def _build(
+        self,
+        key: str,
+        language: str,
+        arguments: list[str],
+        includes: list[str],
+        cwd: pathlib.Path,
+    ) -> bool:
+        """Build the precompiled header for include lines and record its dependencies.
+
+        :param key: Key of the include lines
+        :param language: Language of the code block
+        :param arguments: Compiler command and arguments to check the code block with
+        :param includes: Include lines to precompile
+        :param cwd: Working directory of the compiler
+        :return: If the precompiled header was built
+        """
+        header = self.directory / f"{key}.h"
+        suffix = f".{os.getpid()}-{threading.get_ident()}"
+        output = self.directory / f"{key}.h.gch{suffix}"
+        dependency_file = self.directory / f"{key}.d{suffix}"
+        logger.debug("Build precompiled header for: %s", includes)
+        try:
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            _write_atomically(header, "\n".join(includes) + "\n")
+            _metrics.count("subprocesses", pathlib.Path(arguments[0]).name)
+            (returncode, stderr) = _subprocesses.run(
+                [
+                    *(argument for argument in arguments if argument != "-fsyntax-only"),
+                    *("-MMD", "-MF", str(dependency_file)),
+                    *("-x", HEADER_LANGUAGES[language], str(header), "-o", str(output)),
+                ],
+                language=language,
+                cwd=cwd,
+            )
+            if returncode != 0:
+                logger.debug(
+                    "Could not build precompiled header: %s", stderr.decode(errors="replace")
+                )
+                self._failed.add(key)
+                return False
+
+            dependencies = {}
+            for path in parse_dependencies(dependency_file.read_text("utf-8"), cwd):
+                stat = path.stat()
+                dependencies[str(path)] = [stat.st_mtime_ns, stat.st_size]
+            os.replace(output, self.directory / f"{key}.h.gch")  # noqa: PTH105
+            _write_atomically(self.directory / f"{key}.json", json.dumps(dependencies))
+        except (OSError, _subprocesses.LimitExceededError) as exception:
+            logger.debug("Could not build precompiled header: %s", exception)
+            self._failed.add(key)
+            return False
+        finally:
+            output.unlink(missing_ok=True)
+            dependency_file.unlink(missing_ok=True)
+        return True
+
+
+def _write_atomically(path: pathlib.Path, content: str) -> None:
+    """Write a file, which may be read by other processes, atomically.
+
+    :param path: Path of the file
+    :param content: Content to write
+    """
+    with tempfile.NamedTemporaryFile(
+        "w", dir=path.parent, prefix=f".{path.name}-", delete=False, encoding="utf-8"
+    ) as temporary_file:
+        temporary_file.write(content)
+    os.replace(temporary_file.name, path)  # noqa: PTH105
+
+
+cache: PrecompiledHeaders | None = None
+"""Precompiled headers of the current process; created by :py:func:`get` if not configured."""
+
+_cache_lock = threading.Lock()
+
+
+def get() -> PrecompiledHeaders:
+    """Get the precompiled headers of the current process.
+
+    If none are configured, they are kept in a new temporary directory which is removed when the
+    process exits. Only its unguessable path is chosen here; the directory itself is created when
+    the first precompiled header is built.
+
+    :return: Precompiled headers
+    """
+    global cache  # noqa: PLW0603
+    with _cache_lock:
+        if cache is None:
+            directory = pathlib.Path(tempfile.gettempdir()) / (
+                f"rstcheck-headers-{secrets.token_hex(16)}"
+            )
+            atexit.register(shutil.rmtree, directory, ignore_errors=True)
+            cache = PrecompiledHeaders(directory)
+        return cache
+
+
+def configure(directory: pathlib.Path) -> None:
+    """Use the precompiled headers in the directory of another process, e.g. the main process.
+
+    :param directory: Directory of the precompiled headers; not removed by this process
+    """
+    global cache  # noqa: PLW0603
+    with _cache_lock:
+        cache = PrecompiledHeaders(directory)
@@ -0,0 +1,113 @@
+"""Logging of worker processes.
+
+Worker processes do not write log records themselves. They keep the records of each checked file
+in a :py:class:`RecordBuffer` and send them back with the results of the file through the result
+queue of the pool. The main process passes them to its own handlers via :py:func:`replay` when it
+takes the results of the file, so the records are grouped per file and in order of the file list.
+
+The workers log at the level of the main process, so records below it are never created.
+Messages are formatted by the handlers of the main process; only records with arguments which
+are not known to be picklable get their message formatted in the worker.
+"""
+
+from __future__ import annotations
+
+import copy
+import logging
+import pathlib
+import typing as t
+
+LAZY_ARGUMENT_TYPES = (str, int, float, bool, type(None), pathlib.PurePath)
+"""Types of message arguments which are sent to the main process unformatted."""
+
+
+def prepare_record(record: logging.LogRecord) -> logging.LogRecord:
+    """Make a log record picklable for sending it to the main process.
+
+    Like :py:meth:`logging.handlers.QueueHandler.prepare`, but the message is only formatted if
+    its arguments may not be picklable and exception information is formatted into
+    :py:attr:`logging.LogRecord.exc_text`.
+
+    :param record: Log record
+    :return: Picklable copy of the log record
+    """
+    prepared = copy.copy(record)
+    args = record.args
+    if args and not (
+        isinstance(args, tuple) and all(isinstance(arg, LAZY_ARGUMENT_TYPES) for arg in args)
+    ):
+        prepared.msg = record.getMessage()
+        prepared.args = None
+    elif not isinstance(record.msg, str):
+        prepared.msg = str(record.msg)
+    if record.exc_info:
+        prepared.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+        prepared.exc_info = None
+    return prepared
+
+
+class RecordBuffer(logging.Handler):
+    """Handler keeping the log records of a worker process until they are sent."""
+
+    def __init__(self) -> None:
+        """Initialize :py:class:`RecordBuffer`."""
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Keep a log record.
+
+        :param record: Log record
+        """
+        try:
+            self.records.append(prepare_record(record))
+        except Exception:  # noqa: BLE001
+            self.handleError(record)
+
+    def take(self) -> list[logging.LogRecord]:
+        """Take the kept log records.
+
+        :return: Log records in the order they were logged
+        """
+        (records, self.records) = (self.records, [])
+        return records
+
+
+buffer: RecordBuffer | None = None
+"""Buffer of the log records of the current worker process; :py:obj:`None` in other processes."""
+
+
+def configure_worker(level: int) -> None:
+    """Send the log records of the current worker process to the main process.
+
+    Handlers inherited from the main process, e.g. via ``fork``, are removed, so no record is
+    written by the worker itself.
+
+    :param level: Log level of the main process
+    """
+    global buffer  # noqa: PLW0603
+    buffer = RecordBuffer()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(buffer)
+    root.setLevel(level)
+
+
+def take_records() -> list[logging.LogRecord]:
+    """Take the log records kept by the current worker process.
+
+    :return: Log records; none outside worker processes
+    """
+    return buffer.take() if buffer is not None else []
+
+
+def replay(records: t.Iterable[logging.LogRecord]) -> None:
+    """Pass log records of a worker process to the handlers of the current process.
+
+    :param records: Log records
+    """
+    for record in records:
+        record_logger = logging.getLogger(record.name)
+        if record_logger.isEnabledFor(record.levelno):
+            record_logger.handle(record)
@@ -0,0 +1,227 @@
+"""Metrics of the checks for build telemetry and profilers.
+
+Metrics are only collected while a :py:class:`Metrics` instance is installed as
+:py:data:`current`, e.g. via :py:func:`collecting`. The instrumented code calls :py:func:`count`,
+which returns right away when no instance is installed, so the overhead is negligible when the
+collection is disabled.
+
+Worker processes collect into their own instance, which is sent back with the results via
+:py:meth:`Metrics.take` and merged into the instance of the main process via
+:py:meth:`Metrics.merge`.
+
+The collected metrics can be written as JSON or in the OpenMetrics text format.
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextlib
+import json
+import logging
+import math
+import typing as t
+
+if t.TYPE_CHECKING:
+    import pathlib
+
+logger = logging.getLogger(__name__)
+
+COUNTERS: dict[str, tuple[str | None, str]] = {
+    "files_checked": (None, "Files checked."),
+    "bytes_read": (None, "Bytes of the checked files."),
+    "code_blocks": ("language", "Code blocks checked by language."),
+    "subprocesses": ("command", "Subprocesses spawned to check code blocks by command."),
+    "cache_hits": ("cache", "Cache hits by cache."),
+    "cache_misses": ("cache", "Cache misses by cache."),
+}
+"""Known counters with the name of their label and their description."""
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""Upper bounds in seconds of the buckets of the file latency histogram."""
+
+OPENMETRICS_SUFFIXES = (".prom", ".om", ".txt")
+"""Suffixes of metrics files written in the OpenMetrics text format instead of JSON."""
+
+OPENMETRICS_PREFIX = "rstcheck_"
+"""Prefix of the metric names in the OpenMetrics text format."""
+
+
+class Metrics:
+    """Counters and the file latency histogram of checks."""
+
+    def __init__(self) -> None:
+        """Initialize :py:class:`Metrics`."""
+        self.counters: dict[str, dict[str, int]] = {}
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+
+    def count(self, name: str, label: str = "", amount: int = 1) -> None:
+        """Increase a counter.
+
+        :param name: Name of the counter; one of :py:data:`COUNTERS`
+        :param label: Label value for counters with a label; defaults to no label
+        :param amount: Amount to increase by; defaults to 1
+        """
+        counter = self.counters.setdefault(name, {})
+        counter[label] = counter.get(label, 0) + amount
+
+    def observe_latency(self, seconds: float) -> None:
+        """Add the check duration of a file to the latency histogram.
+
+        :param seconds: Check duration in seconds
+        """
+        self.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.latency_sum += seconds
+
+    def merge(self, other: Metrics) -> None:
+        """Add the metrics of another instance, e.g. of a worker process.
+
+        :param other: Metrics to add
+        """
+        for name, counter in other.counters.items():
+            for label, amount in counter.items():
+                self.count(name, label, amount)
+        for index, amount in enumerate(other.latency_buckets):
+            self.latency_buckets[index] += amount
+        self.latency_sum += other.latency_sum
+
+    def take(self) -> Metrics:
+        """Move the collected metrics into a new instance and reset this instance.
+
+        :return: Metrics collected since the last call
+        """
+        taken = Metrics()
+        (taken.counters, self.counters) = (self.counters, {})
+        (taken.latency_buckets, self.latency_buckets) = (
+            self.latency_buckets,
+            [0] * (len(LATENCY_BUCKETS) + 1),
+        )
+        (taken.latency_sum, self.latency_sum) = (self.latency_sum, 0.0)
+        return taken
+
+    def as_dict(self) -> dict[str, t.Any]:
+        """Get the metrics as JSON serializable dict.
+
+        Counters without label are plain numbers; counters with label map the label values to
+        numbers. Histogram buckets are cumulative like in OpenMetrics.
+
+        :return: Metrics
+        """
+        counters: dict[str, t.Any] = {}
+        for name, (label_name, _) in COUNTERS.items():
+            counter = self.counters.get(name, {})
+            counters[name] = (
+                sum(counter.values()) if label_name is None else dict(sorted(counter.items()))
+            )
+
+        cumulative = 0
+        buckets: dict[str, int] = {}
+        for bound, amount in zip((*LATENCY_BUCKETS, math.inf), self.latency_buckets, strict=True):
+            cumulative += amount
+            buckets[_format_bound(bound)] = cumulative
+
+        return {
+            "counters": counters,
+            "file_latency_seconds": {
+                "buckets": buckets,
+                "count": cumulative,
+                "sum": self.latency_sum,
+            },
+        }
+
+    def as_openmetrics(self) -> str:
+        """Get the metrics in the OpenMetrics text format.
+
+        :return: Metrics exposition
+        """
+        lines: list[str] = []
+        for name, (label_name, description) in COUNTERS.items():
+            metric = OPENMETRICS_PREFIX + name
+            lines += [f"# TYPE {metric} counter", f"# HELP {metric} {description}"]
+            counter = self.counters.get(name, {})
+            if label_name is None:
+                lines.append(f"{metric}_total {sum(counter.values())}")
+                continue
+            lines += [
+                f'{metric}_total{{{label_name}="{_escape(label)}"}} {amount}'
+                for label, amount in sorted(counter.items())
+            ]
+
+        metric = OPENMETRICS_PREFIX + "file_latency_seconds"
+        lines += [f"# TYPE {metric} histogram", f"# HELP {metric} Check duration per file."]
+        histogram = self.as_dict()["file_latency_seconds"]
+        lines += [
+            f'{metric}_bucket{{le="{bound}"}} {amount}'
+            for bound, amount in histogram["buckets"].items()
+        ]
+        lines += [
+            f"{metric}_count {histogram['count']}",
+            f"{metric}_sum {histogram['sum']}",
+            "# EOF",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write(self, metrics_file: pathlib.Path) -> None:
+        """Write the metrics into a file.
+
+        Files with one of the :py:data:`OPENMETRICS_SUFFIXES` are written in the OpenMetrics
+        text format, all others as JSON.
+
+        :param metrics_file: Path of the file; overwritten if it exists
+        """
+        if metrics_file.suffix in OPENMETRICS_SUFFIXES:
+            content = self.as_openmetrics()
+        else:
+            content = json.dumps(self.as_dict(), indent=2) + "\n"
+        metrics_file.write_text(content, "utf-8")
+        logger.debug("Wrote metrics to: '%s'.", metrics_file)
+
+
+def _format_bound(bound: float) -> str:
+    """Format the upper bound of a histogram bucket like OpenMetrics.
+
+    :param bound: Upper bound
+    :return: Formatted bound
+    """
+    return "+Inf" if math.isinf(bound) else repr(bound)
+
+
+def _escape(label: str) -> str:
+    """Escape a label value for the OpenMetrics text format.
+
+    :param label: Label value
+    :return: Escaped label value
+    """
+    return label.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+current: Metrics | None = None
+"""Metrics collected in the current process; :py:obj:`None` if collection is disabled."""
+
+
+def count(name: str, label: str = "", amount: int = 1) -> None:
+    """Increase a counter of the :py:data:`current` metrics, if metrics are collected.
+
+    :param name: Name of the counter; one of :py:data:`COUNTERS`
+    :param label: Label value for counters with a label; defaults to no label
+    :param amount: Amount to increase by; defaults to 1
+    """
+    if current is not None:
+        current.count(name, label, amount)
+
+
+@contextlib.contextmanager
+def collecting(metrics: Metrics | None) -> t.Generator[None, None, None]:
+    """Install metrics as :py:data:`current` metrics for the duration of the context.
+
+    :param metrics: Metrics to collect into; :py:obj:`None` to disable the collection
+    :return: :py:obj:`None`
+    :yield: :py:obj:`None`
+    """
+    global current  # noqa: PLW0603
+    previous = current
+    current = metrics
+    try:
+        yield
+    finally:
+        current = previous
@@ -0,0 +1,173 @@
+"""Registry of the docutils directives and roles to ignore.
+
+Docutils keeps its directives and roles in global dicts. ``rstcheck-core`` resets them for every
+file by reloading the docutils modules and then registers the directives and roles to ignore
+again. Instead this registry keeps a snapshot of the dicts for every distinct set of ignored
+directives and roles and restores it for each file. Directives and roles ignored via inline
+config are registered on top of the restored snapshot.
+
+Like the docutils dicts themselves the registry is not thread-safe.
+"""
+
+from __future__ import annotations
+
+import logging
+import typing as t
+
+import docutils.parsers.rst.directives
+import docutils.parsers.rst.roles
+from rstcheck_core import _docutils
+
+from . import _metrics
+
+logger = logging.getLogger(__name__)
+
+MAX_SNAPSHOTS = 64
+"""Maximum number of snapshots kept; the oldest one is dropped when exceeded."""
+
+_Snapshot = tuple[dict[str, t.Any], ...]
+
+
+def _docutils_dicts() -> _Snapshot:
+    """Get the docutils dicts of directives and roles.
+
+    :return: Dicts of directives, directive registry, roles and role registry
+    """
+    directives = docutils.parsers.rst.directives
+    roles = docutils.parsers.rst.roles
+    return (
+        directives._directives,  # type: ignore[attr-defined] # noqa: SLF001
+        directives._directive_registry,  # type: ignore[attr-defined] # noqa: SLF001
+        roles._roles,  # type: ignore[attr-defined] # noqa: SLF001
+        roles._role_registry,  # type: ignore[attr-defined] # noqa: SLF001
+    )
+
+
+def _capture() -> _Snapshot:
+    """Copy the docutils dicts of directives and roles.
+
+    :return: Snapshot
+    """
+    return tuple(dict(current) for current in _docutils_dicts())
+
+
+def _restore(snapshot: _Snapshot) -> None:
+    """Replace the content of the docutils dicts of directives and roles with a snapshot.
+
+    :param snapshot: Snapshot to restore
+    """
+    for current, saved in zip(_docutils_dicts(), snapshot, strict=True):
+        current.clear()
+        current.update(saved)
+
+
+def record_additions(function: t.Callable[[], object]) -> _Snapshot:
+    """Call a function and record the directives and roles it adds to docutils.
+
+    :param function: Function to call, e.g. one creating a Sphinx application
+    :return: Added or replaced entries of the docutils dicts; for :py:func:`apply_additions`
+    """
+    before = _capture()
+    function()
+    return tuple(
+        {name: value for name, value in current.items() if saved.get(name) is not value}
+        for current, saved in zip(_docutils_dicts(), before, strict=True)
+    )
+
+
+def apply_additions(additions: _Snapshot) -> None:
+    """Add recorded directives and roles to docutils again, e.g. after a restored snapshot.
+
+    :param additions: Entries recorded by :py:func:`record_additions`
+    """
+    for current, added in zip(_docutils_dicts(), additions, strict=True):
+        current.update(added)
+
+
+def _register(directives: list[str], roles: list[str]) -> None:
+    """Register the code directives and the directives and roles to ignore like ``rstcheck-core``.
+
+    :param directives: Directives to ignore
+    :param roles: Roles to ignore
+    """
+    _docutils.register_code_directive(
+        ignore_code_directive="code" in directives,
+        ignore_codeblock_directive="code-block" in directives,
+        ignore_sourcecode_directive="sourcecode" in directives,
+    )
+    _docutils.ignore_directives_and_roles(directives, roles)
+
+
+class Registry:
+    """Snapshots of the docutils directives and roles per set of ignored ones."""
+
+    def __init__(self) -> None:
+        """Initialize :py:class:`Registry`."""
+        self._pristine: _Snapshot | None = None
+        self._snapshots: dict[tuple[frozenset[str], frozenset[str]], _Snapshot] = {}
+        self._active: tuple[set[str], set[str]] | None = None
+
+    def activate(self, directives: t.Iterable[str], roles: t.Iterable[str]) -> None:
+        """Reset docutils to its pristine state with the given directives and roles ignored.
+
+        The state is built once per distinct set of directives and roles and restored afterwards.
+
+        :param directives: Directives to ignore
+        :param roles: Roles to ignore
+        """
+        key = (frozenset(directives), frozenset(roles))
+        snapshot = self._snapshots.get(key)
+
+        if snapshot is None:
+            if self._pristine is None:
+                _docutils.clean_docutils_directives_and_roles_cache()
+                self._pristine = _capture()
+            else:
+                _restore(self._pristine)
+
+            logger.debug("Build registry snapshot for ignored directives and roles.")
+            _register(sorted(key[0]), sorted(key[1]))
+            snapshot = _capture()
+
+            if len(self._snapshots) >= MAX_SNAPSHOTS:
+                del self._snapshots[next(iter(self._snapshots))]
+            self._snapshots[key] = snapshot
+            _metrics.count("cache_misses", "registry")
+        else:
+            _restore(snapshot)
+            _metrics.count("cache_hits", "registry")
+
+        self._active = (set(key[0]), set(key[1]))
+
+    def register(self, directives: t.Iterable[str], roles: t.Iterable[str]) -> None:
+        """Register the directives and roles to ignore on top of the active ones.
+
+        If the given directives and roles include the active ones, e.g. after
+        :py:meth:`Registry.activate` with the ignores from the config, only the additional ones
+        are registered. Otherwise everything is registered like by ``rstcheck-core``.
+
+        :param directives: Directives to ignore
+        :param roles: Roles to ignore
+        """
+        directives = list(dict.fromkeys(directives))
+        roles = list(dict.fromkeys(roles))
+
+        if self._active is None or not (
+            self._active[0].issubset(directives) and self._active[1].issubset(roles)
+        ):
+            _register(directives, roles)
+            self._active = None
+            return
+
+        (active_directives, active_roles) = self._active
+        new_directives = [
+            directive for directive in directives if directive not in active_directives
+        ]
+        new_roles = [role for role in roles if role not in active_roles]
+        _docutils.ignore_directives_and_roles(new_directives, new_roles)
+        active_directives.update(new_directives)
+        active_roles.update(new_roles)
+
+
+registry = Registry()
+"""Registry shared by all checks of the process."""
@@ -0,0 +1,834 @@
+"""Runner of rstcheck."""
+
+from __future__ import annotations
+
+import hashlib
+import importlib
+import itertools
+import json
+import logging
+import multiprocessing
+import platform
+import re
+import sys
+import threading
+import time
+import typing as t
+
+from rstcheck_core import _extras, _sphinx, checker, config, runner, types
+
+from . import (
+    _baseline,
+    _checker,
+    _discovery,
+    _headers,
+    _logging,
+    _metrics,
+    _registry,
+    _subprocesses,
+    _timings,
+)
+from .results import LintResults
+
+if t.TYPE_CHECKING:
+    import pathlib
+
+logger = logging.getLogger(__name__)
+
+ERROR_CODE_REGEX = re.compile(r"\([A-Z]+/[0-9]+\)")
+
+PRELOAD_MODULES = [
+    "rstcheck._runner",
+    "docutils.parsers.rst",
+    "docutils.parsers.rst.states",
+    "docutils.readers.standalone",
+]
+"""Modules imported once before worker processes are forked, so the workers start warm."""
+if _extras.SPHINX_INSTALLED:
+    PRELOAD_MODULES.append("sphinx.application")
+
+
+PATH_DEPENDENT_SOURCE_REGEX = re.compile(rb"include|:file:")
+"""Content which may reference other files relative to the file, e.g. ``.. include::``."""
+
+PRE_COMMIT_FILES_PER_WORKER = 8
+"""Minimum number of files per worker process in pre-commit mode; fewer files are checked in the
+current process, because starting worker processes would take longer than checking them."""
+PRE_COMMIT_SERIAL_SECONDS = 0.5
+"""Predicted check duration below which files are checked in the current process in pre-commit
+mode, if a timing history is available."""
+
+RESULTS_FORMAT = "rstcheck-results"
+"""Identifier of the results files written by :py:meth:`RstcheckMainRunner.write_results`."""
+RESULTS_VERSION = 2
+"""Version of the format of the results files."""
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """Parse a shard given as ``INDEX/TOTAL``.
+
+    :param value: Shard with 1-based index, e.g. ``2/3``
+    :raises ValueError: On invalid shards
+    :return: Index and total number of shards
+    """
+    (index, _, total) = value.partition("/")
+    try:
+        shard = (int(index), int(total))
+    except ValueError:
+        shard = (0, 0)
+    if not 1 <= shard[0] <= shard[1]:
+        msg = f"Invalid shard '{value}': expected INDEX/TOTAL with 1 <= INDEX <= TOTAL."
+        raise ValueError(msg)
+    return shard
+
+
+def write_report(
+    results: LintResults,
+    output_file: t.TextIO | None = None,
+    *,
+    duplicate_count: int = 0,
+    has_nonexisting_paths: bool = False,
+    baseline_count: int = 0,
+) -> int:
+    """Print issues with a summary and return the exit code.
+
+    :param results: Issues to print
+    :param output_file: file to print to; defaults to sys.stderr (if ``None``)
+    :param duplicate_count: Number of files not checked because they duplicate a checked file;
+        defaults to 0
+    :param has_nonexisting_paths: If paths to check did not exist; defaults to :py:obj:`False`
+    :param baseline_count: Number of issues not printed because they are accepted by a baseline;
+        defaults to 0
+    :return: exit code 0 if no error is printed; 1 if any error is printed
+    """
+    summary = (
+        f"Skipped {duplicate_count} check(s) of files identical to a checked file.\n"
+        if duplicate_count
+        else ""
+    )
+    if baseline_count:
+        summary += f"Suppressed {baseline_count} issue(s) accepted by the baseline.\n"
+
+    if len(results) == 0 and not has_nonexisting_paths:
+        (output_file or sys.stdout).write(f"{summary}Success! No issues detected.\n")
+        return 0
+
+    output_file = output_file or sys.stderr
+
+    for error in results:
+        err_msg = error["message"]
+        if not ERROR_CODE_REGEX.match(err_msg):
+            err_msg = "(ERROR/3) " + err_msg
+
+        message = f"{error['source_origin']}:{error['line_number']}: {err_msg}"
+
+        output_file.write(f"{message}\n")
+
+    output_file.write(f"{summary}Error! Issues detected.\n")
+    return 1
+
+
+def default_start_method() -> str | None:
+    """Get the start method for worker processes.
+
+    On Linux the workers are forked from a process which already imported all
+    :py:data:`PRELOAD_MODULES`:
+
+    - ``fork`` from the current process, if it runs no other threads.
+    - ``forkserver`` otherwise, because forking a multi-threaded process is unsafe.
+      The fork server imports the modules once and forks all workers from this warm state.
+
+    On other platforms the platform default is used.
+
+    :return: Name of the start method or :py:obj:`None` for the platform default
+    """
+    if platform.system() != "Linux":
+        return None
+    if threading.active_count() > 1:
+        return "forkserver"
+    return "fork"
+
+
+_worker_config: tuple[config.RstcheckConfig, bool] | None = None
+
+
+def _init_worker(  # noqa: PLR0913, PLR0917
+    rstcheck_config: config.RstcheckConfig,
+    overwrite_config: bool,  # noqa: FBT001
+    collect_metrics: bool,  # noqa: FBT001
+    subprocess_limits: _subprocesses.SubprocessLimits,
+    subprocess_limiter: t.ContextManager[t.Any] | None,
+    log_level: int,
+    header_directory: pathlib.Path,
+) -> None:
+    """Initialize a worker process.
+
+    The config is sent once per worker instead of once per file. Log records are sent back with
+    the results via :py:mod:`rstcheck._logging`.
+
+    :param rstcheck_config: Main configuration of the application
+    :param overwrite_config: If the file config overwrites the main config
+    :param collect_metrics: If metrics are collected and sent back with the results
+    :param subprocess_limits: Limits of external tools checking code blocks
+    :param subprocess_limiter: Semaphore shared by all workers capping the number of external
+        tools running at the same time
+    :param log_level: Log level of the main process
+    :param header_directory: Directory of the precompiled headers shared by all workers
+    """
+    global _worker_config  # noqa: PLW0603
+    _worker_config = (rstcheck_config, overwrite_config)
+    _metrics.current = _metrics.Metrics() if collect_metrics else None
+    _subprocesses.configure(subprocess_limits, subprocess_limiter)
+    _logging.configure_worker(log_level)
+    _headers.configure(header_directory)
+
+
+_FileResult = tuple[int, list[types.LintError], float, list[logging.LogRecord]]
+"""Index of the file in the file list, found issues, check duration in seconds and log records."""
+
+
+def _check_files_in_worker(
+    files: list[tuple[int, pathlib.Path]],
+) -> tuple[list[_FileResult], _metrics.Metrics | None]:
+    """Check the given files with the config of the worker process.
+
+    :param files: Files to check with their index in the file list
+    :return: Results per file and the metrics collected while checking them, if enabled
+    """
+    if _worker_config is None:  # pragma: no cover
+        msg = "Worker process is not initialized."
+        raise RuntimeError(msg)
+
+    results: list[_FileResult] = []
+    for index, source_file in files:
+        start = time.perf_counter()
+        errors = _checker.check_file(source_file, *_worker_config)
+        results.append((index, errors, time.perf_counter() - start, _logging.take_records()))
+    return (results, _metrics.current.take() if _metrics.current is not None else None)
+
+
+class RstcheckMainRunner(runner.RstcheckMainRunner):
+    """Main runner of rstcheck.
+
+    In contrast to :py:class:`rstcheck_core.runner.RstcheckMainRunner` the issues are collected
+    into a compact :py:class:`rstcheck.results.LintResults` store while the checks are running.
+
+    With a cache directory the check durations per file are stored and used on subsequent runs to
+    start the slowest files first and to give each worker chunks of files with equal predicted
+    duration.
+
+    In pre-commit mode small batches of files, like the files of a typical commit, are checked
+    in the current process and the number of worker processes is limited by the number of files.
+
+    Files are discovered by :py:class:`rstcheck._discovery.FileFinder` while they are checked.
+
+    Files with identical content and run config are checked only once and the issues are
+    reported for every file.
+
+    With a :py:class:`rstcheck._metrics.Metrics` instance metrics of the checks are collected
+    into it, including the metrics collected by worker processes.
+
+    External tools checking code blocks run with the given
+    :py:class:`rstcheck._subprocesses.SubprocessLimits`; the cap of concurrently running tools
+    applies across all worker processes.
+
+    With a shard only a part of the discovered files is checked. The files are partitioned by
+    their predicted check duration, so independent runs for all shards check every file once.
+    The results of the shards can be written via :py:meth:`RstcheckMainRunner.write_results` and
+    combined via :py:func:`merge_results`.
+
+    With a :py:class:`rstcheck._baseline.Baseline` the issues accepted by it are removed from the
+    results after the checks.
+    """
+
+    results: LintResults
+    start_method: str | None = None
+    """Start method for worker processes; :py:obj:`None` for :py:func:`default_start_method`."""
+    chunks_per_worker = 4
+    """Number of chunks per worker the files are packed into when a timing history is used."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        check_paths: list[pathlib.Path],
+        rstcheck_config: config.RstcheckConfig,
+        *,
+        overwrite_config: bool = True,
+        cache_dir: pathlib.Path | None = None,
+        pre_commit: bool = False,
+        exclude: list[str] | None = None,
+        include: list[str] | None = None,
+        metrics: _metrics.Metrics | None = None,
+        subprocess_limits: _subprocesses.SubprocessLimits | None = None,
+        shard: tuple[int, int] | None = None,
+        baseline: _baseline.Baseline | None = None,
+        use_gitignore: bool | None = None,
+    ) -> None:
+        """Initialize the :py:class:`RstcheckMainRunner` with a base config.
+
+        :param check_paths: Files to check.
+        :param rstcheck_config: Base configuration config from e.g. the CLI.
+        :param overwrite_config: If file config overwrites current config; defaults to True
+        :param cache_dir: Directory to keep the timing history in;
+            defaults to :py:obj:`None` for no timing history
+        :param pre_commit: If worker processes are only used for large batches of files;
+            defaults to :py:obj:`False`
+        :param exclude: Patterns of files and directories to skip in searched directories;
+            defaults to :py:obj:`None` for the patterns from the config file
+        :param include: Patterns of files to check in searched directories;
+            defaults to :py:obj:`None` for the patterns from the config file
+        :param metrics: Metrics to collect into;
+            defaults to :py:obj:`None` for no metrics collection
+        :param subprocess_limits: Limits of external tools checking code blocks;
+            defaults to :py:obj:`None` for the default limits
+        :param shard: 1-based index and total number of shards to check only the files of the
+            shard; the files are balanced by the timing history or else by size;
+            defaults to :py:obj:`None` to check all files
+        :param baseline: Accepted issues to remove from the results;
+            defaults to :py:obj:`None` for no baseline
+        :param use_gitignore: If ``.gitignore`` files are respected in searched directories;
+            defaults to :py:obj:`None` for the setting from the config file or else
+            :py:obj:`True`
+        """
+        path_patterns = _discovery.load_path_patterns(rstcheck_config.config_path)
+        if overwrite_config:
+            self.exclude = path_patterns.exclude if path_patterns.exclude is not None else exclude
+            self.include = path_patterns.include if path_patterns.include is not None else include
+            gitignore = (
+                path_patterns.gitignore if path_patterns.gitignore is not None else use_gitignore
+            )
+        else:
+            self.exclude = exclude if exclude is not None else path_patterns.exclude
+            self.include = include if include is not None else path_patterns.include
+            gitignore = use_gitignore if use_gitignore is not None else path_patterns.gitignore
+        self.use_gitignore = gitignore if gitignore is not None else True
+        self._file_stream: t.Iterator[pathlib.Path] = iter(())
+        self._run_config_keys: dict[pathlib.Path, str] = {}
+        self._reset_duplicates()
+        self.cache_dir = cache_dir
+        self.timing_history = _timings.TimingHistory.load(cache_dir) if cache_dir else None
+        self.shard = shard
+        self.shard_indices: list[int] | None = None
+        """Indices of the files to check among all discovered files; :py:obj:`None` without
+        shard."""
+        self.shard_partition: tuple[int, str] | None = None
+        """Number of all discovered files and digest of their paths and predicted costs, which
+        the shards were assigned by; :py:obj:`None` without shard."""
+
+        super().__init__(check_paths, rstcheck_config, overwrite_config=overwrite_config)
+        self.pre_commit = pre_commit
+        self.metrics = metrics
+        self.subprocess_limits = subprocess_limits or _subprocesses.SubprocessLimits()
+        self.baseline = baseline
+        self.baseline_count = 0
+        """Number of issues of the last run removed because they are accepted by the baseline."""
+
+    @property
+    def files_to_check(self) -> list[pathlib.Path]:
+        """List of files to check.
+
+        Accessing the list discovers all remaining files.
+        """
+        self._files_to_check.extend(self._file_stream)
+        return self._files_to_check
+
+    def update_file_list(self) -> None:
+        """Update file path list with paths specified on initialization.
+
+        Non-existing paths are saved in :py:attr:`RstcheckMainRunner.nonexisting_paths` right
+        away. The files in the existing paths are discovered lazily, when they are checked or
+        :py:attr:`RstcheckMainRunner.files_to_check` is accessed. With a shard all files are
+        discovered right away to select the files of the shard.
+        """
+        logger.debug("Updating list of files to check.")
+        paths = list(self.check_paths)
+        self._files_to_check = []
+        self._file_stream = iter(())
+        self.shard_indices = None
+        self.shard_partition = None
+
+        if len(paths) == 1 and paths[0].name == "-":
+            logger.info("'-' detected. Using stdin for input.'")
+            self._files_to_check.append(paths[0])
+            return
+
+        file_finder = _discovery.FileFinder(
+            recursive=self.config.recursive or False,
+            exclude=self.exclude,
+            include=self.include,
+            use_gitignore=self.use_gitignore,
+        )
+        self._file_stream = file_finder.find(self._filter_nonexisting_paths(paths))
+        if self.shard is not None:
+            self._select_shard(*self.shard)
+
+    def _select_shard(self, index: int, total: int) -> None:
+        """Discover all files and keep only the files of a shard.
+
+        :param index: 1-based index of the shard
+        :param total: Total number of shards
+        """
+        files = list(self._file_stream)
+        self._file_stream = iter(())
+        costs = (self.timing_history or _timings.TimingHistory()).predict(files)
+        assignments = _timings.partition(costs, total)
+        digest = hashlib.sha256(
+            json.dumps([[str(file) for file in files], costs]).encode("utf-8")
+        ).hexdigest()
+        self.shard_partition = (len(files), digest)
+        self.shard_indices = [
+            file_index for file_index, shard in enumerate(assignments) if shard == index - 1
+        ]
+        self._files_to_check = [files[file_index] for file_index in self.shard_indices]
+        logger.info(
+            "Check %s of %s file(s) in shard %s/%s.",
+            len(self._files_to_check),
+            len(files),
+            index,
+            total,
+        )
+
+    def _iter_files_to_check(self) -> t.Iterator[pathlib.Path]:
+        """Iterate over the files to check and discover remaining files on the way.
+
+        :return: :py:obj:`None`
+        :yield: Files to check
+        """
+        index = 0
+        while True:
+            if index == len(self._files_to_check):
+                file = next(self._file_stream, None)
+                if file is None:
+                    return
+                self._files_to_check.append(file)
+            yield self._files_to_check[index]
+            index += 1
+
+    def _discover_files(self, count: int) -> int:
+        """Discover files until the given number of files is known.
+
+        :param count: Number of files to know
+        :return: Number of known files; less than ``count`` if all files are discovered
+        """
+        for _ in itertools.islice(self._iter_files_to_check(), count):
+            pass
+        return len(self._files_to_check)
+
+    @property
+    def duplicate_count(self) -> int:
+        """Number of files not checked in the last run, because they duplicate a checked file."""
+        return len(self._duplicate_of)
+
+    def _reset_duplicates(self) -> None:
+        """Forget the files seen in the last run."""
+        self._original_by_key: dict[tuple[str, str, str], int] = {}
+        self._duplicate_of: dict[int, int] = {}
+        self._original_errors: dict[int, list[types.LintError]] = {}
+
+    def _duplicate_key(self, file: pathlib.Path) -> tuple[str, str, str] | None:
+        """Get the key under which files are duplicates.
+
+        The key consists of the hash of the content, the run config and for content referencing
+        other files the directory of the file.
+
+        :param file: File to check
+        :return: Key; :py:obj:`None` if the file cannot be deduplicated
+        """
+        if file.name == "-":
+            return None
+        try:
+            content = file.read_bytes()
+        except OSError:
+            return None
+
+        directory = file.parent.resolve()
+        run_config_key = self._run_config_keys.get(directory)
+        if run_config_key is None:
+            run_config = checker._load_run_config(  # noqa: SLF001
+                directory, self.config, overwrite_config=self.overwrite_config
+            )
+            run_config_key = self._run_config_keys[directory] = run_config.model_dump_json()
+
+        location = str(directory) if PATH_DEPENDENT_SOURCE_REGEX.search(content) else ""
+        return (hashlib.blake2b(content).hexdigest(), run_config_key, location)
+
+    def _is_duplicate(self, index: int, file: pathlib.Path) -> bool:
+        """Check if a file duplicates an earlier file and remember it if so.
+
+        :param index: Index of the file in the file list
+        :param file: File to check
+        :return: If the file is a duplicate and needs no check
+        """
+        key = self._duplicate_key(file)
+        if key is None:
+            return False
+        original = self._original_by_key.setdefault(key, index)
+        if original == index:
+            _metrics.count("cache_misses", "duplicate_files")
+            return False
+        _metrics.count("cache_hits", "duplicate_files")
+        logger.debug("Skip check of duplicate file: '%s'.", file)
+        self._duplicate_of[index] = original
+        return True
+
+    def _take_errors(
+        self, index: int, finished: dict[int, list[types.LintError]]
+    ) -> list[types.LintError] | None:
+        """Take the errors of a file, if they are available.
+
+        Duplicate files get the errors of their original file. Errors of all earlier files must
+        have been taken before.
+
+        :param index: Index of the file in the file list
+        :param finished: Errors of checked files by index; taken errors are removed
+        :return: Errors; :py:obj:`None` if the file is not checked yet
+        """
+        if index in finished:
+            errors = self._original_errors[index] = finished.pop(index)
+            return errors
+
+        original = self._duplicate_of.get(index)
+        if original is None:
+            return None
+        source_origin = self._files_to_check[index]
+        return [
+            types.LintError(
+                source_origin=source_origin,
+                line_number=error["line_number"],
+                message=error["message"],
+            )
+            for error in self._original_errors[original]
+        ]
+
+    @property  # type: ignore[override]
+    def errors(self) -> LintResults:
+        """Found issues; alias for :py:attr:`RstcheckMainRunner.results`."""
+        return self.results
+
+    @errors.setter
+    def errors(self, errors: t.Iterable[types.LintError]) -> None:
+        self.results = errors if isinstance(errors, LintResults) else LintResults(errors)
+
+    def _run_checks_sync(self) -> t.Iterator[list[types.LintError]]:  # type: ignore[override]
+        """Check all files from the file list synchronously and yield the errors.
+
+        :return: :py:obj:`None`
+        :yield: Errors found per file
+        """
+        logger.debug("Runnning checks synchronically.")
+        with _sphinx.load_sphinx_if_available():
+            for index, file in enumerate(self._iter_files_to_check()):
+                finished: dict[int, list[types.LintError]] = {}
+                if not self._is_duplicate(index, file):
+                    start = time.perf_counter()
+                    finished[index] = _checker.check_file(file, self.config, self.overwrite_config)
+                    self._record_duration(file, time.perf_counter() - start)
+                errors = self._take_errors(index, finished)
+                yield errors if errors is not None else []
+
+    def _schedule(self) -> t.Iterable[list[tuple[int, pathlib.Path]]]:
+        """Split the files to check into chunks to send to the workers.
+
+        Without a timing history every file is its own chunk and files are sent while they are
+        discovered. With a timing history all files are discovered first and packed into chunks of
+        equal predicted duration. Duplicate files are not sent.
+
+        :return: Chunks of files with their index in the file list in the order to start them
+        """
+        if self.timing_history is None:
+            return (
+                [(index, file)]
+                for index, file in enumerate(self._iter_files_to_check())
+                if not self._is_duplicate(index, file)
+            )
+
+        files = self.files_to_check
+        originals = [
+            index for index, file in enumerate(files) if not self._is_duplicate(index, file)
+        ]
+        chunks = _timings.pack_chunks(
+            self.timing_history.predict([files[index] for index in originals]),
+            self._pool_size * self.chunks_per_worker,
+        )
+        return [
+            [(originals[index], files[originals[index]]) for index in chunk] for chunk in chunks
+        ]
+
+    def _run_checks_parallel(self) -> t.Iterator[list[types.LintError]]:  # type: ignore[override]
+        """Check all files from the file list in parallel and yield the errors.
+
+        The errors are yielded in order of the file list as soon as they are available. The log
+        records of the workers are passed to the handlers of this process right before the errors
+        of their file are yielded.
+
+        :return: :py:obj:`None`
+        :yield: Errors found per file
+        """
+        context = multiprocessing.get_context(self.start_method or default_start_method())
+        logger.debug(
+            "Runnning checks in parallel with pool size of %s and start method '%s'.",
+            self._pool_size,
+            context.get_start_method(),
+        )
+        if context.get_start_method() == "forkserver":
+            context.set_forkserver_preload(PRELOAD_MODULES)
+        elif context.get_start_method() == "fork":
+            for module in PRELOAD_MODULES:
+                importlib.import_module(module)
+            ignores = checker._create_ignore_dict_from_config(self.config)  # noqa: SLF001
+            _registry.registry.activate(ignores["directives"], ignores["roles"])
+
+        finished: dict[int, list[types.LintError]] = {}
+        records: dict[int, list[logging.LogRecord]] = {}
+        next_index = 0
+        max_subprocesses = self.subprocess_limits.max_concurrent
+        subprocess_limiter = (
+            context.BoundedSemaphore(max_subprocesses)
+            if max_subprocesses is not None and max_subprocesses < self._pool_size
+            else None
+        )
+
+        with context.Pool(
+            self._pool_size,
+            initializer=_init_worker,
+            initargs=(
+                self.config,
+                self.overwrite_config,
+                self.metrics is not None,
+                self.subprocess_limits,
+                subprocess_limiter,
+                logging.getLogger().getEffectiveLevel(),
+                _headers.get().directory,
+            ),
+        ) as pool:
+            for chunk_results, worker_metrics in pool.imap_unordered(
+                _check_files_in_worker, self._schedule()
+            ):
+                if self.metrics is not None and worker_metrics is not None:
+                    self.metrics.merge(worker_metrics)
+                for index, errors, duration, file_records in chunk_results:
+                    self._record_duration(self._files_to_check[index], duration)
+                    finished[index] = errors
+                    if file_records:
+                        records[index] = file_records
+
+                while (file_errors := self._take_errors(next_index, finished)) is not None:
+                    _logging.replay(records.pop(next_index, []))
+                    yield file_errors
+                    next_index += 1
+
+        while (file_errors := self._take_errors(next_index, finished)) is not None:
+            yield file_errors
+            next_index += 1
+
+    def _record_duration(self, file: pathlib.Path, duration: float) -> None:
+        """Record the check duration of a file in the timing history and the metrics.
+
+        :param file: Checked file
+        :param duration: Check duration in seconds
+        """
+        if self.timing_history is not None:
+            self.timing_history.update(file, duration)
+        if self.metrics is not None:
+            self.metrics.observe_latency(duration)
+
+    def _use_worker_processes(self) -> bool:
+        """Decide if the files are checked in worker processes or in the current process.
+
+        :return: If worker processes are used
+        """
+        if not self.pre_commit:
+            return self._discover_files(2) > 1
+
+        file_count = len(self.files_to_check)
+        if file_count < 2 * PRE_COMMIT_FILES_PER_WORKER:
+            return False
+        if self.timing_history is not None:
+            predicted_duration = sum(self.timing_history.predict(self._files_to_check))
+            if predicted_duration < PRE_COMMIT_SERIAL_SECONDS:
+                return False
+
+        self._pool_size = max(1, min(self._pool_size, file_count // PRE_COMMIT_FILES_PER_WORKER))
+        return True
+
+    def _update_results(self, results: t.Iterable[list[types.LintError]]) -> None:
+        """Take results and update error cache.
+
+        :param results: Errors found per file
+        """
+        self.results = LintResults()
+        for errors in results:
+            self.results.extend(errors)
+
+    def check(self) -> None:
+        """Check all files in the file list and save the errors.
+
+        Multiple files are run in parallel; in pre-commit mode only large batches of files.
+
+        A new call overwrite the old cached errors.
+        """
+        logger.info("Run checks for all files.")
+        self._reset_duplicates()
+        with _metrics.collecting(self.metrics), _subprocesses.configured(self.subprocess_limits):
+            results = (
+                self._run_checks_parallel()
+                if self._use_worker_processes()
+                else self._run_checks_sync()
+            )
+            self._update_results(results)
+        self._original_errors = {}
+        self.baseline_count = 0
+        if self.baseline is not None:
+            self.apply_baseline(self.baseline)
+        if self.duplicate_count:
+            logger.info("Skipped checks of %s duplicate file(s).", self.duplicate_count)
+
+        if self.cache_dir is not None and self.timing_history is not None:
+            try:
+                self.timing_history.save(self.cache_dir)
+            except OSError:
+                logger.warning("Could not save timing history to: '%s'.", self.cache_dir)
+
+    def apply_baseline(self, baseline: _baseline.Baseline) -> None:
+        """Remove the issues accepted by a baseline from the results of the last run.
+
+        :param baseline: Accepted issues
+        """
+        (self.results, suppressed) = baseline.apply(self.results)
+        self.baseline_count += suppressed
+        logger.info("Suppressed %s issue(s) accepted by the baseline.", suppressed)
+
+    def print_result(self, output_file: t.TextIO | None = None) -> int:
+        """Print all cached error messages and return exit code.
+
+        :param output_file: file to print to; defaults to sys.stderr (if ``None``)
+        :return: exit code 0 if no error is printed; 1 if any error is printed
+        """
+        return write_report(
+            self.results,
+            output_file,
+            duplicate_count=self.duplicate_count,
+            has_nonexisting_paths=bool(self._nonexisting_paths),
+            baseline_count=self.baseline_count,
+        )
+
+    def write_results(self, results_file: pathlib.Path) -> None:
+        """Write the found issues of the last run as JSON to be merged via :py:func:`merge_results`.
+
+        :param results_file: Path of the file; overwritten if it exists
+        """
+        files = self._files_to_check
+        indices = self.shard_indices if self.shard_indices is not None else range(len(files))
+        content = {
+            "format": RESULTS_FORMAT,
+            "version": RESULTS_VERSION,
+            "shard": list(self.shard) if self.shard is not None else None,
+            "partition": (
+                {"file_count": self.shard_partition[0], "digest": self.shard_partition[1]}
+                if self.shard_partition is not None
+                else None
+            ),
+            "files": [[index, str(file)] for index, file in zip(indices, files, strict=True)],
+            "nonexisting_paths": [str(path) for path in self._nonexisting_paths],
+            "duplicate_count": self.duplicate_count,
+            "issues": [
+                {
+                    "source_origin": str(error["source_origin"]),
+                    "line_number": error["line_number"],
+                    "message": error["message"],
+                }
+                for error in self.results
+            ],
+        }
+        results_file.write_text(json.dumps(content, indent=1) + "\n", "utf-8")
+        logger.debug("Wrote results to: '%s'.", results_file)
+
+
+def _check_partition(contents: list[dict[str, t.Any]]) -> None:
+    """Check that the shards were partitioned alike and checked every file exactly once.
+
+    :param contents: Contents of the results files of all shards
+    :raises ValueError: If the shards discovered other files, predicted other costs or their
+        files do not cover every discovered file exactly once
+    """
+    partitions = {
+        (content["partition"]["file_count"], content["partition"]["digest"]) for content in contents
+    }
+    if len(partitions) != 1:
+        msg = (
+            "The shards were partitioned differently; run all shards with the same paths, "
+            "options and timing history."
+        )
+        raise ValueError(msg)
+    ((file_count, _),) = partitions
+    indices = sorted(index for content in contents for index, _ in content["files"])
+    if indices != list(range(file_count)):
+        msg = f"The files of the shards do not cover each of the {file_count} file(s) once."
+        raise ValueError(msg)
+
+
+class MergedResults(t.NamedTuple):
+    """Combined results of multiple runs."""
+
+    results: LintResults
+    """Issues in order of the files of an unsharded run."""
+    duplicate_count: int
+    """Number of files not checked because they duplicate a checked file."""
+    nonexisting_paths: list[str]
+    """Paths to check which did not exist."""
+
+
+def merge_results(results_files: t.Sequence[pathlib.Path]) -> MergedResults:
+    """Combine the results files of runs, e.g. of all shards of a sharded run.
+
+    :param results_files: Files written by :py:meth:`RstcheckMainRunner.write_results`
+    :raises ValueError: If a file is no results file, shards are missing or given twice or the
+        shards were not partitioned alike, so not every file was checked exactly once
+    :return: Combined results
+    """
+    contents: list[dict[str, t.Any]] = []
+    for results_file in results_files:
+        try:
+            content = json.loads(results_file.read_text("utf-8"))
+        except ValueError:
+            content = None
+        if not isinstance(content, dict) or content.get("format") != RESULTS_FORMAT:
+            msg = f"Not a rstcheck results file: '{results_file}'."
+            raise ValueError(msg)
+        if content.get("version") != RESULTS_VERSION:
+            msg = f"Unsupported results file version {content.get('version')}: '{results_file}'."
+            raise ValueError(msg)
+        contents.append(content)
+
+    shards = [tuple(content["shard"]) for content in contents if content["shard"] is not None]
+    if shards:
+        total = shards[0][1]
+        if sorted(shards) != [(index, total) for index in range(1, total + 1)]:
+            found = ", ".join(f"{index}/{shard_total}" for index, shard_total in sorted(shards))
+            msg = f"Expected the results of shards 1/{total} to {total}/{total}, got: {found}."
+            raise ValueError(msg)
+        _check_partition([content for content in contents if content["shard"] is not None])
+
+    file_order: dict[str, int] = {}
+    for content in contents:
+        for index, file in content["files"]:
+            file_order.setdefault(file, index)
+
+    issues = sorted(
+        (
+            (file_order.get(issue["source_origin"], len(file_order)), content_index, position),
+            issue,
+        )
+        for content_index, content in enumerate(contents)
+        for position, issue in enumerate(content["issues"])
+    )
+    results = LintResults()
+    for _, issue in issues:
+        results.add(issue["source_origin"], issue["line_number"], issue["message"])
+
+    return MergedResults(
+        results=results,
+        duplicate_count=sum(content["duplicate_count"] for content in contents),
+        nonexisting_paths=list(
+            dict.fromkeys(path for content in contents for path in content["nonexisting_paths"])
+        ),
+    )
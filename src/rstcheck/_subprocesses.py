@@ -0,0 +1,324 @@
+"""Limits for the external tools checking code blocks, e.g. ``bash`` or ``gcc``.
+
+Every external tool runs with a timeout and, except on Windows, in a new session with resource
+limits for its CPU time and, if configured, its address space, which are inherited by its child
+processes. On a
+timeout the whole session is killed. A tool exceeding a limit is reported as
+:py:class:`LimitExceededError` instead of crashing the check. The resource limits are set by a
+``sh`` wrapper started in place of the tool, see :py:meth:`SubprocessLimits.command`.
+
+The limits of the current process are kept in :py:data:`limits`. An optional semaphore in
+:py:data:`limiter`, shared with the worker processes, caps the number of tools running at the
+same time.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import math
+import os
+import re
+import signal
+import subprocess
+import sys
+import typing as t
+
+if sys.platform != "win32":
+    import resource
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 60.0
+"""Default timeout in seconds of an external tool."""
+CPU_LIMIT_GRACE = 1
+"""Seconds of CPU time on top of the timeout before a tool is stopped by its CPU time limit."""
+
+OUT_OF_MEMORY_REGEX = re.compile(
+    r"^(?:[^\s:]+: )*(?:out of memory|(?:virtual )?memory exhausted|cannot allocate memory"
+    r"|(?:xmalloc: )?cannot allocate \d+ bytes)"
+    r"|^MemoryError\b"
+    r"|^terminate called after throwing an instance of 'std::bad_alloc'",
+    re.IGNORECASE | re.MULTILINE,
+)
+"""Fatal message of a tool which failed to allocate memory, e.g. ``cc1plus: out of memory``.
+
+Only whole lines starting with the message or the names of the tool are matched, so diagnostics
+about the checked source, which start with its path or quote its lines, are not mistaken for one.
+"""
+
+_MEBIBYTE = 1024 * 1024
+
+
+class LimitExceededError(Exception):
+    """An external tool exceeded a limit and was stopped."""
+
+    def __init__(self, reason: str) -> None:
+        """Initialize :py:class:`LimitExceededError`.
+
+        :param reason: Description of the exceeded limit
+        """
+        super().__init__(f"Check aborted: {reason}")
+        self.reason = reason
+
+
+class SubprocessLimits:
+    """Limits for external tools."""
+
+    __slots__ = ("default_timeout", "max_concurrent", "memory_limit", "timeouts")
+
+    def __init__(
+        self,
+        timeouts: t.Mapping[str, float] | None = None,
+        *,
+        default_timeout: float | None = DEFAULT_TIMEOUT,
+        memory_limit: int | None = None,
+        max_concurrent: int | None = None,
+    ) -> None:
+        """Initialize :py:class:`SubprocessLimits`.
+
+        :param timeouts: Timeouts in seconds by language; defaults to none
+        :param default_timeout: Timeout in seconds for languages without own timeout;
+            :py:obj:`None` for no timeout; defaults to :py:data:`DEFAULT_TIMEOUT`
+        :param memory_limit: Address space limit in MiB; defaults to :py:obj:`None` for no limit,
+            as tools reserving large address ranges, e.g. with sanitizers, fail under it
+        :param max_concurrent: Maximum number of tools running at the same time;
+            defaults to :py:obj:`None` for no limit
+        """
+        self.timeouts = dict(timeouts or {})
+        self.default_timeout = default_timeout
+        self.memory_limit = memory_limit
+        self.max_concurrent = max_concurrent
+
+    @classmethod
+    def from_options(
+        cls,
+        timeouts: str | None = None,
+        memory_limit: int | None = None,
+        max_concurrent: int | None = None,
+    ) -> SubprocessLimits:
+        """Create limits from CLI options.
+
+        :param timeouts: Comma separated timeouts in seconds; entries like ``cpp=120`` set the
+            timeout of a language, a plain number the default timeout; 0 disables a timeout;
+            defaults to :py:obj:`None` for :py:data:`DEFAULT_TIMEOUT`
+        :param memory_limit: Address space limit in MiB; 0 disables the limit;
+            defaults to :py:obj:`None` for no limit
+        :param max_concurrent: Maximum number of tools running at the same time;
+            defaults to :py:obj:`None` for no limit
+        :raises ValueError: On invalid timeouts
+        :return: Limits
+        """
+        default_timeout: float | None = DEFAULT_TIMEOUT
+        language_timeouts: dict[str, float] = {}
+        for entry in (timeouts or "").split(","):
+            (language, _, value) = entry.strip().rpartition("=")
+            if not value:
+                continue
+            try:
+                timeout = float(value)
+            except ValueError:
+                msg = f"Invalid timeout: '{entry.strip()}'."
+                raise ValueError(msg) from None
+            if language:
+                language_timeouts[language.strip()] = timeout
+            else:
+                default_timeout = timeout or None
+
+        return cls(
+            language_timeouts,
+            default_timeout=default_timeout,
+            memory_limit=memory_limit or None,
+            max_concurrent=max_concurrent,
+        )
+
+    def timeout(self, language: str) -> float | None:
+        """Get the timeout for a tool checking the given language.
+
+        :param language: Language of the checked code block
+        :return: Timeout in seconds; :py:obj:`None` for no timeout
+        """
+        return self.timeouts.get(language, self.default_timeout) or None
+
+    def command(self, arguments: list[str], language: str) -> list[str]:
+        """Get the command line to start a tool with the resource limits.
+
+        The limits are set by a ``sh`` wrapper, which replaces itself with the tool via ``exec``,
+        because setting them in the child process via ``preexec_fn`` is unsafe while other
+        threads are running.
+
+        :param arguments: Command and arguments of the tool
+        :param language: Language of the checked code block
+        :return: Command and arguments to run
+        """
+        if sys.platform == "win32":
+            return arguments
+        timeout = self.timeout(language)
+        cpu_limit = math.ceil(timeout) + CPU_LIMIT_GRACE if timeout else None
+        memory_limit = self.memory_limit * _MEBIBYTE if self.memory_limit else None
+        ulimit_commands = _ulimit_commands(memory_limit, cpu_limit)
+        if not ulimit_commands:
+            return arguments
+        return ["sh", "-c", "; ".join([*ulimit_commands, 'exec "$@"']), arguments[0], *arguments]
+
+    def popen_kwargs(self, language: str) -> dict[str, t.Any]:  # noqa: ARG002
+        """Get the keyword arguments to start a tool returned by :py:meth:`command`.
+
+        :param language: Language of the checked code block
+        :return: Keyword arguments for :py:class:`subprocess.Popen` or
+            :py:func:`asyncio.create_subprocess_exec`
+        """
+        if sys.platform == "win32":
+            return {}
+        return {"start_new_session": True}
+
+    def check_result(self, language: str, returncode: int, output: str) -> None:
+        """Check if a finished tool exceeded a limit.
+
+        :param language: Language of the checked code block
+        :param returncode: Return code of the tool
+        :param output: Error output of the tool
+        :raises LimitExceededError: If the tool was stopped by a limit
+        """
+        if sys.platform != "win32" and returncode == -signal.SIGXCPU:
+            timeout = self.timeout(language) or 0
+            reason = f"CPU time limit of {math.ceil(timeout) + CPU_LIMIT_GRACE} seconds exceeded"
+            raise LimitExceededError(reason)
+        # The hard CPU time limit and the out of memory killer send SIGKILL. Other signals, like
+        # a crashing tool or an interrupt, are handled like any other failure of the tool.
+        limited = self.memory_limit or self.timeout(language)
+        if sys.platform != "win32" and returncode == -signal.SIGKILL and limited:
+            msg = "killed by signal SIGKILL"
+            raise LimitExceededError(msg)
+        if returncode != 0 and self.memory_limit and OUT_OF_MEMORY_REGEX.search(output):
+            msg = f"memory limit of {self.memory_limit} MiB exceeded"
+            raise LimitExceededError(msg)
+
+
+def _ulimit_commands(memory_limit: int | None, cpu_limit: int | None) -> list[str]:
+    """Get the ``ulimit`` shell commands lowering the resource limits for a tool.
+
+    The hard limits of the current process, which the tool inherits, are not exceeded. Limits
+    which cannot be set are ignored.
+
+    :param memory_limit: Address space limit in bytes; :py:obj:`None` for no limit
+    :param cpu_limit: CPU time limit in seconds; :py:obj:`None` for no limit
+    :return: Shell commands
+    """
+    if sys.platform == "win32":  # pragma: no cover
+        return []
+    commands: list[str] = []
+    # The hard CPU time limit is a second later, so SIGXCPU is sent before SIGKILL.
+    for kind, option, limit, unit, hard_offset in (
+        (resource.RLIMIT_AS, "-v", memory_limit, 1024, 0),
+        (resource.RLIMIT_CPU, "-t", cpu_limit, 1, 1),
+    ):
+        if limit is None:
+            continue
+        (_, hard) = resource.getrlimit(kind)
+        new_hard = limit + hard_offset
+        if hard != resource.RLIM_INFINITY:
+            new_hard = min(new_hard, hard)
+        # The soft limit is lowered first, as it must never be above the hard limit.
+        commands.extend(
+            f"ulimit {kind_option} {option} {value // unit} 2>/dev/null"
+            for kind_option, value in (("-S", min(limit, new_hard)), ("-H", new_hard))
+        )
+    return commands
+
+
+class _Process(t.Protocol):
+    """Started process of a tool."""
+
+    pid: int
+
+    def kill(self) -> None:
+        """Kill the process."""
+
+
+def kill(process: _Process) -> None:
+    """Kill a tool and, except on Windows, all processes it started.
+
+    :param process: Process started with :py:meth:`SubprocessLimits.command`
+    """
+    if sys.platform == "win32":
+        process.kill()
+        return
+    with contextlib.suppress(ProcessLookupError):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+limits = SubprocessLimits()
+"""Limits of the tools started in the current process."""
+
+limiter: t.ContextManager[t.Any] | None = None
+"""Semaphore capping the number of tools running at the same time; :py:obj:`None` for no cap."""
+
+
+def configure(
+    new_limits: SubprocessLimits, new_limiter: t.ContextManager[t.Any] | None = None
+) -> None:
+    """Set the limits of the tools started in the current process.
+
+    :param new_limits: Limits
+    :param new_limiter: Semaphore capping the number of tools running at the same time, e.g.
+        shared by all worker processes; defaults to :py:obj:`None` for no cap
+    """
+    global limits, limiter  # noqa: PLW0603
+    limits = new_limits
+    limiter = new_limiter
+
+
+@contextlib.contextmanager
+def configured(
+    new_limits: SubprocessLimits, new_limiter: t.ContextManager[t.Any] | None = None
+) -> t.Generator[None, None, None]:
+    """Set the limits of the tools started in the current process for the duration of the context.
+
+    :param new_limits: Limits
+    :param new_limiter: Semaphore capping the number of tools running at the same time;
+        defaults to :py:obj:`None` for no cap
+    :return: :py:obj:`None`
+    :yield: :py:obj:`None`
+    """
+    previous = (limits, limiter)
+    configure(new_limits, new_limiter)
+    try:
+        yield
+    finally:
+        configure(*previous)
+
+
+def run(arguments: list[str], *, language: str, cwd: os.PathLike[str]) -> tuple[int, bytes]:
+    """Run a tool with the :py:data:`limits` of the current process.
+
+    :param arguments: Command and arguments to run
+    :param language: Language of the checked code block
+    :param cwd: Working directory
+    :raises LimitExceededError: If the tool exceeded a limit
+    :return: Return code and error output of the tool
+    """
+    current_limits = limits
+    timeout = current_limits.timeout(language)
+
+    with (
+        limiter or contextlib.nullcontext(),
+        subprocess.Popen(  # noqa: S603
+            current_limits.command(arguments, language),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=cwd,
+            **current_limits.popen_kwargs(language),
+        ) as process,
+    ):
+        try:
+            (_, stderr) = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            logger.debug("Kill timed out subprocess: %s", arguments[0])
+            kill(process)
+            process.communicate()
+            msg = f"timed out after {timeout:g} seconds"
+            raise LimitExceededError(msg) from None
+
+    current_limits.check_result(language, process.returncode, stderr.decode(errors="replace"))
+    return (process.returncode, stderr)
@@ -0,0 +1,330 @@
+"""Syntax validation of JSON, XML and YAML code blocks without building the document.
+
+The validators report the same errors as the ``rstcheck-core`` checkers, which load the whole
+document into Python objects, but only parse the source:
+
+- JSON is parsed into events by the C backend of ``ijson`` if it is installed, which keeps the
+  memory needed independent of the size of arrays and strings, but is not faster. Otherwise
+  :py:func:`json.loads` is used, which still builds arrays and strings, but discards the objects
+  as soon as they are parsed. Only sources rejected by ``ijson`` are parsed again by
+  :py:func:`json.loads` for its error messages.
+- XML is fed to expat without content handlers instead of building an element tree.
+- YAML is parsed into events, which are checked for the errors of the composer and of
+  constructing mappings. With libyaml available its parser is used and only sources with errors
+  are parsed again by the Python parser for its error messages.
+"""
+
+from __future__ import annotations
+
+import collections
+import json
+import typing as t
+import xml.parsers.expat
+
+try:
+    import yaml
+
+    yaml_imported = True
+except ImportError:  # pragma: no cover
+    yaml_imported = False
+
+try:
+    import ijson  # type: ignore[import-untyped,import-not-found,unused-ignore]
+
+    ijson_backend = ijson.get_backend("yajl2_c")
+    ijson_imported = True
+except ImportError:
+    ijson_imported = False
+
+if t.TYPE_CHECKING:
+    from collections.abc import Iterable
+
+NAMESPACE_SEPARATOR = "}"
+"""Namespace separator of expat like used by :py:mod:`xml.etree.ElementTree`."""
+
+NON_SPECIFIC_YAML_TAG = "!"
+"""YAML tag resolved like an untagged node."""
+MERGE_YAML_TAG = "tag:yaml.org,2002:merge"
+"""YAML tag of merge keys, which untagged ``<<`` keys are resolved to."""
+
+
+def _discard(_pairs: list[tuple[str, t.Any]]) -> None:
+    """Discard a decoded JSON object.
+
+    :param _pairs: Keys and values of the object
+    """
+
+
+def validate_json(source_code: str) -> str | None:
+    """Validate the syntax of JSON source.
+
+    With the C backend of ``ijson`` the source is only parsed into events. Sources it rejects,
+    e.g. with ``NaN`` values accepted by :py:func:`json.loads`, are checked again by
+    :py:func:`json.loads` for the error message.
+
+    :param source_code: JSON source code to validate
+    :return: Message of the syntax error; :py:obj:`None` if the source is valid
+    """
+    if ijson_imported:
+        try:
+            collections.deque(ijson_backend.basic_parse(source_code.encode("utf-8")), maxlen=0)
+        except (ijson.JSONError, UnicodeEncodeError):
+            pass
+        else:
+            return None
+    try:
+        json.loads(source_code, object_pairs_hook=_discard)
+    except ValueError as exception:
+        return f"{exception}"
+    return None
+
+
+def validate_xml(source_code: str) -> str | None:
+    """Validate the syntax of XML source.
+
+    :param source_code: XML source code to validate
+    :return: Message of the syntax error; :py:obj:`None` if the source is valid
+    """
+    parser = xml.parsers.expat.ParserCreate(None, NAMESPACE_SEPARATOR)
+
+    def _undefined_entity(name: str, _is_parameter_entity: bool) -> None:  # noqa: FBT001
+        # Like xml.etree.ElementTree, which fails on entities undefined due to an external DTD.
+        msg = (
+            f"undefined entity &{name};: "
+            f"line {parser.CurrentLineNumber}, column {parser.CurrentColumnNumber}"
+        )
+        raise xml.parsers.expat.ExpatError(msg)
+
+    parser.SkippedEntityHandler = _undefined_entity
+    try:
+        parser.Parse(source_code, True)  # noqa: FBT003
+    except xml.parsers.expat.ExpatError as exception:
+        return f"{exception}"
+    return None
+
+
+def validate_yaml(source_code: str) -> str | None:
+    """Validate the syntax of YAML source.
+
+    Unlike :py:func:`yaml.safe_load` the values are not constructed. Besides unknown tags, the
+    errors of constructing mappings are detected from the events: merge keys whose value is no
+    mapping or list of mappings and keys which are collections, so unhashable. Errors of invalid
+    values for known tags, e.g. of an invalid ``!!binary``, are not reported. If a document has
+    several such errors, the first one in the source is reported, which may differ from the one
+    reported first by :py:func:`yaml.safe_load`.
+
+    :param source_code: YAML source code to validate
+    :return: Message of the syntax error; :py:obj:`None` if the source is valid
+    """
+    if yaml.__with_libyaml__:
+        try:
+            _validate_yaml_events(yaml.parse(source_code, Loader=yaml.CSafeLoader))
+        except yaml.YAMLError:
+            # The messages of libyaml differ from the Python parser used by rstcheck-core.
+            pass
+        else:
+            return None
+    try:
+        _validate_yaml_events(yaml.parse(source_code, Loader=yaml.SafeLoader))
+    except yaml.YAMLError as exception:
+        return f"{exception}"
+    return None
+
+
+class _YamlNode(t.NamedTuple):
+    """Node of a YAML document as far as needed to check mappings."""
+
+    id: str
+    """Kind of the node like :py:attr:`yaml.Node.id`: ``scalar``, ``sequence`` or ``mapping``."""
+    mark: t.Any
+    """Start mark of the node."""
+    no_mapping: _YamlNode | None = None
+    """First item of a sequence which is no mapping."""
+
+
+class _YamlCollection:
+    """State of a collection while the events of its items are checked."""
+
+    def __init__(
+        self, node: _YamlNode, anchor: str | None, merge_mapping: _YamlNode | None
+    ) -> None:
+        """Initialize :py:class:`_YamlCollection`.
+
+        :param node: Node of the collection
+        :param anchor: Anchor of the collection
+        :param merge_mapping: Mapping whose merge key has this sequence as value
+        """
+        self.node = node
+        self.anchor = anchor
+        self.merge_mapping = merge_mapping
+        self.is_key = node.id == "mapping"
+        """If the next node of a mapping is a key."""
+        self.is_merge = False
+        """If the next node of a mapping is the value of a merge key."""
+        self.no_mapping: _YamlNode | None = None
+
+    def add(self, node: _YamlNode, event: yaml.NodeEvent) -> yaml.YAMLError | None:
+        """Check an item for the errors of constructing a mapping.
+
+        :param node: Node of the item; the anchored node for aliases
+        :param event: Event of the item
+        :return: Error of the item
+        """
+        if self.node.id == "sequence":
+            if node.id != "mapping" and self.no_mapping is None:
+                self.no_mapping = node
+            if self.merge_mapping is not None and node.id != "mapping":
+                return _merge_error(
+                    self.merge_mapping, f"mapping for merging, but found {node.id}", node
+                )
+            return None
+
+        (is_key, self.is_key) = (self.is_key, not self.is_key)
+        if is_key:
+            self.is_merge = isinstance(event, yaml.ScalarEvent) and _is_merge_key(event)
+            if node.id == "scalar":
+                return None
+            return yaml.constructor.ConstructorError(
+                "while constructing a mapping", self.node.mark, "found unhashable key", node.mark
+            )
+        return self._check_merge_value(node)
+
+    def _check_merge_value(self, node: _YamlNode) -> yaml.YAMLError | None:
+        """Check a value of the mapping if it is the value of a merge key.
+
+        :param node: Node of the value; the anchored node for aliases
+        :return: Error of the value
+        """
+        (is_merge, self.is_merge) = (self.is_merge, False)
+        if is_merge and node.id == "scalar":
+            return _merge_error(
+                self.node, "mapping or list of mappings for merging, but found scalar", node
+            )
+        if is_merge and node.no_mapping is not None:
+            return _merge_error(
+                self.node, f"mapping for merging, but found {node.no_mapping.id}", node.no_mapping
+            )
+        return None
+
+
+def _merge_error(mapping: _YamlNode, expected: str, node: _YamlNode) -> yaml.YAMLError:
+    """Create the error of an invalid value of a merge key.
+
+    :param mapping: Mapping with the merge key
+    :param expected: Expected and found kind of node
+    :param node: Invalid node
+    :return: Error
+    """
+    return yaml.constructor.ConstructorError(
+        "while constructing a mapping", mapping.mark, f"expected a {expected}", node.mark
+    )
+
+
+def _is_merge_key(event: yaml.ScalarEvent) -> bool:
+    """Check if a scalar is resolved to a merge key.
+
+    :param event: Scalar event
+    :return: If the scalar is a merge key
+    """
+    if event.tag == MERGE_YAML_TAG:
+        return True
+    return event.tag is None and event.implicit[0] and event.value == "<<"
+
+
+def _yaml_node(event: yaml.NodeEvent) -> _YamlNode:
+    """Create the node of an event starting a node.
+
+    :param event: Scalar, sequence start or mapping start event
+    :return: Node
+    """
+    if isinstance(event, yaml.MappingStartEvent):
+        return _YamlNode("mapping", event.start_mark)
+    if isinstance(event, yaml.SequenceStartEvent):
+        return _YamlNode("sequence", event.start_mark)
+    return _YamlNode("scalar", event.start_mark)
+
+
+def _tag_error(event: yaml.NodeEvent) -> yaml.YAMLError | None:
+    """Check if the tag of a node is known.
+
+    :param event: Event starting a node
+    :return: Error of an unknown tag
+    """
+    tag = getattr(event, "tag", None)
+    if (
+        tag in {None, NON_SPECIFIC_YAML_TAG, MERGE_YAML_TAG}
+        or tag in yaml.SafeLoader.yaml_constructors
+    ):
+        return None
+    mark: t.Any = event.start_mark
+    msg = f"could not determine a constructor for the tag {tag!r}"
+    return yaml.constructor.ConstructorError(None, None, msg, mark)
+
+
+def _validate_yaml_events(events: Iterable[yaml.Event]) -> None:
+    """Check YAML events for the errors of :py:func:`yaml.safe_load`.
+
+    :param events: Parsed events
+    :raises yaml.YAMLError: On parser errors, undefined aliases, duplicate anchors, more than one
+        document, unknown tags, invalid merge keys or unhashable keys
+    """
+    # Marks of libyaml are no yaml.Mark, but its errors are raised again by the Python parser.
+    anchors: dict[str, _YamlNode] = {}
+    document_mark: t.Any = None
+    constructor_error: yaml.YAMLError | None = None
+    collections: list[_YamlCollection] = []
+
+    for event in events:
+        mark: t.Any = event.start_mark
+        if isinstance(event, yaml.CollectionEndEvent):
+            collection = collections.pop()
+            if collection.anchor is not None and collection.no_mapping is not None:
+                anchors[collection.anchor] = collection.node._replace(
+                    no_mapping=collection.no_mapping
+                )
+            continue
+
+        if isinstance(event, yaml.AliasEvent):
+            if event.anchor not in anchors:
+                msg = f"found undefined alias {event.anchor!r}"
+                raise yaml.composer.ComposerError(None, None, msg, mark)
+            parent = collections[-1] if collections else None
+            error = parent.add(anchors[event.anchor], event) if parent is not None else None
+            constructor_error = constructor_error or error
+            continue
+
+        if isinstance(event, yaml.DocumentStartEvent) and document_mark is not None:
+            msg = "expected a single document in the stream"
+            raise yaml.composer.ComposerError(
+                msg, document_mark, "but found another document", mark
+            )
+
+        if not isinstance(event, yaml.NodeEvent):
+            continue
+        if document_mark is None:
+            document_mark = mark
+
+        if event.anchor is not None and event.anchor in anchors:
+            msg = f"found duplicate anchor {event.anchor!r}; first occurrence"
+            raise yaml.composer.ComposerError(
+                msg, anchors[event.anchor].mark, "second occurrence", mark
+            )
+        node = _yaml_node(event)
+        if event.anchor is not None:
+            anchors[event.anchor] = node
+
+        parent = collections[-1] if collections else None
+        merge_mapping = parent.node if parent is not None and parent.is_merge else None
+        error = parent.add(node, event) if parent is not None else None
+        if isinstance(event, yaml.CollectionStartEvent):
+            collections.append(
+                _YamlCollection(
+                    node, event.anchor, merge_mapping if node.id == "sequence" else None
+                )
+            )
+
+        constructor_error = constructor_error or error or _tag_error(event)
+
+    # Values are constructed after the whole document was parsed.
+    if constructor_error is not None:
+        raise constructor_error
@@ -0,0 +1,194 @@
+"""Timing history of file checks to schedule the checks of the next run."""
+
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import os
+import tempfile
+import typing as t
+
+if t.TYPE_CHECKING:
+    import pathlib
+
+logger = logging.getLogger(__name__)
+
+TIMINGS_FILE_NAME = "timings.json"
+"""Name of the timing history file inside the cache directory."""
+DEFAULT_SECONDS_PER_BYTE = 1e-5
+"""Estimated check duration per byte of a file if there is no history to derive it from."""
+
+
+class TimingHistory:
+    """Check durations per file from previous runs."""
+
+    def __init__(self, durations: dict[str, float] | None = None) -> None:
+        """Initialize :py:class:`TimingHistory`.
+
+        :param durations: Check durations in seconds by absolute file path; defaults to none
+        """
+        self.durations = durations if durations is not None else {}
+
+    @classmethod
+    def load(cls, cache_dir: pathlib.Path) -> TimingHistory:
+        """Load the timing history from the cache directory.
+
+        A missing or corrupt history file results in an empty history.
+
+        :param cache_dir: Cache directory
+        :return: Loaded timing history
+        """
+        timings_file = cache_dir / TIMINGS_FILE_NAME
+        try:
+            durations = json.loads(timings_file.read_text("utf-8"))
+        except FileNotFoundError:
+            logger.debug("No timing history found in: '%s'.", cache_dir)
+            return cls()
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable timing history: '%s'.", timings_file)
+            return cls()
+
+        if not isinstance(durations, dict):
+            logger.warning("Ignoring invalid timing history: '%s'.", timings_file)
+            return cls()
+
+        return cls(
+            {
+                path: float(duration)
+                for path, duration in durations.items()
+                if isinstance(duration, int | float)
+            }
+        )
+
+    def save(self, cache_dir: pathlib.Path) -> None:
+        """Save the timing history into the cache directory.
+
+        The file is replaced atomically, so concurrent runs cannot corrupt it.
+
+        :param cache_dir: Cache directory; created if missing
+        """
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=cache_dir, prefix=".timings-", suffix=".json", delete=False, encoding="utf-8"
+        ) as temporary_file:
+            json.dump(self.durations, temporary_file, indent=0, sort_keys=True)
+        os.replace(temporary_file.name, cache_dir / TIMINGS_FILE_NAME)  # noqa: PTH105
+        logger.debug("Saved timing history to: '%s'.", cache_dir)
+
+    @staticmethod
+    def _key(path: pathlib.Path) -> str:
+        """Get the key of a file in the history.
+
+        :param path: Path to the file
+        :return: Absolute path as string
+        """
+        return str(path.resolve())
+
+    def update(self, path: pathlib.Path, duration: float) -> None:
+        """Set the check duration of a file.
+
+        :param path: Path to the checked file
+        :param duration: Check duration in seconds
+        """
+        if path.name == "-":
+            return
+        self.durations[self._key(path)] = round(duration, 6)
+
+    def predict(self, paths: t.Sequence[pathlib.Path]) -> list[float]:
+        """Predict the check durations of the given files.
+
+        Files without history are estimated by their size and the average duration per byte of
+        the files with history.
+
+        :param paths: Paths to the files to check
+        :return: Predicted check durations in seconds in order of the ``paths``
+        """
+        known = [self.durations.get(self._key(path)) for path in paths]
+        sizes = [_file_size(path) for path in paths]
+
+        known_bytes = sum(size for size, duration in zip(sizes, known, strict=True) if duration)
+        known_seconds = sum(duration for duration in known if duration)
+        seconds_per_byte = known_seconds / known_bytes if known_bytes else DEFAULT_SECONDS_PER_BYTE
+
+        return [
+            duration if duration is not None else size * seconds_per_byte
+            for size, duration in zip(sizes, known, strict=True)
+        ]
+
+
+def _file_size(path: pathlib.Path) -> int:
+    """Get the size of a file.
+
+    :param path: Path to the file
+    :return: Size in bytes; 0 if it cannot be determined
+    """
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def _assign_longest_first(
+    costs: t.Sequence[float], part_count: int
+) -> tuple[list[list[int]], list[float]]:
+    """Assign items to parts with the longest-processing-time-first rule.
+
+    The most costly items are assigned first, each to the part with the currently lowest total
+    cost; ties are broken by the item and part index, so equal costs give equal assignments.
+
+    :param costs: Predicted cost per item
+    :param part_count: Number of parts
+    :return: Item indices per part with the most costly items first and total cost per part
+    """
+    parts: list[list[int]] = [[] for _ in range(part_count)]
+    heap = [(0.0, part_index) for part_index in range(part_count)]
+
+    for index in sorted(range(len(costs)), key=lambda i: costs[i], reverse=True):
+        (total, part_index) = heapq.heappop(heap)
+        parts[part_index].append(index)
+        heapq.heappush(heap, (total + costs[index], part_index))
+
+    totals = [0.0] * part_count
+    for total, part_index in heap:
+        totals[part_index] = total
+    return (parts, totals)
+
+
+def pack_chunks(costs: t.Sequence[float], chunk_count: int) -> list[list[int]]:
+    """Pack items into chunks of about equal total cost.
+
+    Items are assigned with the longest-processing-time-first rule: the most costly items are
+    assigned first, each to the chunk with the currently lowest total cost. Chunks are returned
+    with the most costly first and contain the most costly items first, so they are started early.
+
+    :param costs: Predicted cost per item
+    :param chunk_count: Maximum number of chunks
+    :return: Chunks of item indices; empty chunks are dropped
+    """
+    chunk_count = max(1, min(chunk_count, len(costs)))
+    (chunks, totals) = _assign_longest_first(costs, chunk_count)
+    return [
+        chunks[chunk_index]
+        for chunk_index in sorted(range(chunk_count), key=lambda i: totals[i], reverse=True)
+        if chunks[chunk_index]
+    ]
+
+
+def partition(costs: t.Sequence[float], part_count: int) -> list[int]:
+    """Partition items deterministically into parts of about equal total cost.
+
+    Like :py:func:`pack_chunks` the longest-processing-time-first rule is used, but the number of
+    parts is fixed and every part keeps its index, so independent processes with the same costs
+    get the same partition.
+
+    :param costs: Predicted cost per item
+    :param part_count: Number of parts
+    :return: Index of the part per item
+    """
+    (parts, _) = _assign_longest_first(costs, part_count)
+    assignments = [0] * len(costs)
+    for part_index, part in enumerate(parts):
+        for index in part:
+            assignments[index] = part_index
+    return assignments
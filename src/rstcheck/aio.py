@@ -0,0 +1,391 @@
+"""Asyncio based API of rstcheck.
+
+The functions in this module do not block the running event loop:
+
+- Parsing rst sources with docutils is done in a dedicated worker thread, because docutils keeps
+  its directive and role registries as global state. The thread holds the lock shared with
+  :py:class:`rstcheck.Session` while using docutils.
+- External tools to check code blocks (e.g. ``bash`` or ``gcc``) are run as :py:mod:`asyncio`
+  subprocesses with the limits of :py:mod:`rstcheck._subprocesses`. They are killed when the
+  checking task is cancelled.
+
+Example usage:
+
+.. code-block:: python
+
+    import asyncio
+    import pathlib
+
+    from rstcheck import aio
+
+
+    async def main():
+        errors = await aio.check_paths([pathlib.Path("README.rst")])
+        for error in errors:
+            print(error["line_number"], error["message"])
+
+
+    asyncio.run(main())
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import functools
+import locale
+import logging
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+import typing as t
+
+from rstcheck_core import _sphinx, checker, config, types
+
+from . import _checker, _metrics, _registry, _runner, _subprocesses
+from .results import LintResults
+
+logger = logging.getLogger(__name__)
+
+_docutils_executor: concurrent.futures.ThreadPoolExecutor | None = None
+_docutils_executor_lock = threading.Lock()
+
+
+def _get_docutils_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Get the single threaded executor all docutils related work is run in.
+
+    :return: Executor with a single worker thread
+    """
+    global _docutils_executor  # noqa: PLW0603
+    with _docutils_executor_lock:
+        if _docutils_executor is None:
+            _docutils_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="rstcheck-docutils"
+            )
+        return _docutils_executor
+
+
+def _default_concurrency() -> int:
+    """Get the default concurrency limit.
+
+    :return: Number of CPUs
+    """
+    return os.cpu_count() or 1
+
+
+async def _run_in_docutils_thread(
+    func: t.Callable[..., t.Any],
+    *args: t.Any,  # noqa: ANN401
+) -> t.Any:  # noqa: ANN401
+    """Run the given function in the docutils worker thread.
+
+    :param func: Function to run
+    :param args: Arguments to pass to the function
+    :return: Return value of the function
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_docutils_executor(), functools.partial(_call_with_docutils_lock, func, *args)
+    )
+
+
+def _call_with_docutils_lock(
+    func: t.Callable[..., t.Any],
+    *args: t.Any,  # noqa: ANN401
+) -> t.Any:  # noqa: ANN401
+    """Call the given function while holding :py:data:`rstcheck._checker.docutils_lock`.
+
+    :param func: Function to call
+    :param args: Arguments to pass to the function
+    :return: Return value of the function
+    """
+    with _checker.docutils_lock:
+        return func(*args)
+
+
+async def _run_external_check(
+    prepared_source: _checker.PreparedSource,
+    code_block_check: _checker.CodeBlockCheck,
+    external_check: _checker.ExternalCheck,
+    subprocess_limiter: asyncio.Semaphore,
+) -> list[types.LintError]:
+    """Run a code block check with an external tool in an asyncio subprocess.
+
+    :param prepared_source: Prepared source the code block belongs to
+    :param code_block_check: Code block check to run
+    :param external_check: Command line of the external tool
+    :param subprocess_limiter: Semaphore limiting the number of concurrent subprocesses
+    :return: Found issues, not filtered by ignored messages
+    """
+    if code_block_check.first_line is None:
+        return []
+
+    code_block_checker = prepared_source.code_block_checker
+    encoding = locale.getpreferredencoding() or sys.getdefaultencoding()
+    language = code_block_check.language
+    limits = _subprocesses.limits
+    timeout = limits.timeout(language)
+
+    # Building a precompiled header runs the compiler, so it takes a slot of the limiter too.
+    async with subprocess_limiter:
+        external_check = await asyncio.to_thread(
+            code_block_checker.use_precompiled_header, external_check, language
+        )
+        temporary_file_path = await asyncio.to_thread(
+            _write_temporary_file, external_check.source_code, external_check.filename_suffix
+        )
+        try:
+            _metrics.count("subprocesses", pathlib.Path(external_check.arguments[0]).name)
+            process = await asyncio.create_subprocess_exec(
+                *limits.command([*external_check.arguments, str(temporary_file_path)], language),
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=code_block_checker.working_directory,
+                **limits.popen_kwargs(language),
+            )
+            # NOTE: `asyncio.TimeoutError` is an alias of `TimeoutError` only since python 3.11.
+            try:
+                (_, stderr) = await asyncio.wait_for(process.communicate(), timeout)
+            except asyncio.TimeoutError:  # noqa: UP041
+                logger.debug("Kill timed out subprocess: %s", external_check.arguments[0])
+                _subprocesses.kill(process)
+                await process.wait()
+                exception = _subprocesses.LimitExceededError(f"timed out after {timeout:g} seconds")
+                return _limit_exceeded_errors(prepared_source, code_block_check, exception)
+            except asyncio.CancelledError:
+                logger.debug("Kill cancelled subprocess: %s", external_check.arguments[0])
+                _subprocesses.kill(process)
+                await process.wait()
+                raise
+        finally:
+            await asyncio.to_thread(temporary_file_path.unlink, missing_ok=True)
+
+    returncode = process.returncode or 0
+    try:
+        limits.check_result(language, returncode, stderr.decode(encoding, errors="replace"))
+    except _subprocesses.LimitExceededError as exception:
+        return _limit_exceeded_errors(prepared_source, code_block_check, exception)
+
+    if returncode == 0:
+        return []
+
+    return list(
+        code_block_check.map_errors(
+            code_block_checker.parse_external_output(
+                code_block_check.language, stderr.decode(encoding), temporary_file_path
+            )
+        )
+    )
+
+
+def _write_temporary_file(source_code: str, suffix: str) -> pathlib.Path:
+    """Write source code into a temporary file to pass to an external tool.
+
+    :param source_code: Source code to write
+    :param suffix: Suffix of the file name
+    :return: Path of the file; to be removed by the caller
+    """
+    with tempfile.NamedTemporaryFile(mode="wb", suffix=suffix, delete=False) as temporary_file:
+        temporary_file.write(source_code.encode("utf-8"))
+    return pathlib.Path(temporary_file.name)
+
+
+def _limit_exceeded_errors(
+    prepared_source: _checker.PreparedSource,
+    code_block_check: _checker.CodeBlockCheck,
+    exception: _subprocesses.LimitExceededError,
+) -> list[types.LintError]:
+    """Create the issue for a code block whose external tool exceeded a limit.
+
+    :param prepared_source: Prepared source the code block belongs to
+    :param code_block_check: Code block check whose tool exceeded the limit
+    :param exception: Exceeded limit
+    :return: Issue with the line number relative to the document
+    """
+    source_origin = prepared_source.code_block_checker.source_origin
+    return list(
+        code_block_check.map_errors([_checker.limit_exceeded_error(source_origin, exception)])
+    )
+
+
+def _prepare_and_check_in_process(
+    prepare: t.Callable[[], _checker.PreparedSource],
+) -> tuple[_checker.PreparedSource, dict[int, list[types.LintError]], list[int]]:
+    """Prepare a source and run its code block checks which do not run an external tool.
+
+    Both run in one call in the docutils worker thread, so nested rst is parsed with the
+    directive and role registries of the source and not of another source prepared in between.
+
+    The dummy Sphinx application, if Sphinx is installed, is created once for both.
+
+    :param prepare: Function preparing the source
+    :return: Prepared source, issues of the checks run by index and indices of the checks to run
+        by an external tool
+    """
+    with _sphinx.load_sphinx_if_available():
+        prepared_source = prepare()
+        return (prepared_source, *_checker.run_in_process_checks(prepared_source))
+
+
+async def _run_checks(
+    prepare: t.Callable[[], _checker.PreparedSource], subprocess_limiter: asyncio.Semaphore
+) -> list[types.LintError]:
+    """Prepare a source, run its code block checks and collect all issues.
+
+    :param prepare: Function preparing the source; called in the docutils worker thread
+    :param subprocess_limiter: Semaphore limiting the number of concurrent subprocesses
+    :return: Found issues
+    """
+    (prepared_source, code_block_errors, external_indices) = await _run_in_docutils_thread(
+        _prepare_and_check_in_process, prepare
+    )
+
+    code_block_runs: dict[int, t.Awaitable[list[types.LintError]]] = {}
+    for index in external_indices:
+        code_block_check = prepared_source.checks[index]
+        external_check = prepared_source.code_block_checker.external_check(
+            code_block_check.source_code, code_block_check.language
+        )
+        if external_check is not None:
+            code_block_runs[index] = _run_external_check(
+                prepared_source, code_block_check, external_check, subprocess_limiter
+            )
+
+    code_block_results = await asyncio.gather(*code_block_runs.values())
+    code_block_errors.update(zip(code_block_runs, code_block_results, strict=True))
+
+    return [
+        *prepared_source.include_errors,
+        *_checker.filter_ignored_messages(
+            (error for _, errors in sorted(code_block_errors.items()) for error in errors),
+            prepared_source.ignores["messages"],
+        ),
+        *prepared_source.rst_errors,
+    ]
+
+
+def _prepare_source_from_config(
+    source: str,
+    rstcheck_config: config.RstcheckConfig,
+    source_file: pathlib.Path | None,
+) -> _checker.PreparedSource:
+    """Prepare a source with the settings from the given config.
+
+    :param source: Rst source to prepare
+    :param rstcheck_config: Config to use
+    :param source_file: Path to file the source comes from
+    :return: Prepared source
+    """
+    ignores = checker._create_ignore_dict_from_config(rstcheck_config)  # noqa: SLF001
+    _registry.registry.activate(ignores["directives"], ignores["roles"])
+    return _checker.prepare_source(
+        source,
+        source_file=source_file,
+        ignores=ignores,
+        report_level=rstcheck_config.report_level or config.DEFAULT_REPORT_LEVEL,
+        sphinx_source_dir=rstcheck_config.sphinx_source_dir,
+        warn_unknown_settings=rstcheck_config.warn_unknown_settings or False,
+    )
+
+
+async def check_source(
+    source: str,
+    rstcheck_config: config.RstcheckConfig | None = None,
+    *,
+    source_file: pathlib.Path | None = None,
+    max_subprocesses: int | None = None,
+) -> LintResults:
+    """Check the given rst source for issues.
+
+    Config files are not searched for; only the passed config is used.
+
+    :param source: Rst source to check
+    :param rstcheck_config: Config to use; defaults to :py:obj:`None` for the default config
+    :param source_file: Path to file the source comes from if it comes from a file;
+        defaults to :py:obj:`None`
+    :param max_subprocesses: Maximum number of concurrent subprocesses for code block checks;
+        defaults to :py:obj:`None` for the number of CPUs
+    :return: Found issues
+    """
+    rstcheck_config = rstcheck_config or config.RstcheckConfig()
+    subprocess_limiter = asyncio.Semaphore(max_subprocesses or _default_concurrency())
+
+    return LintResults(
+        await _run_checks(
+            functools.partial(_prepare_source_from_config, source, rstcheck_config, source_file),
+            subprocess_limiter,
+        )
+    )
+
+
+async def _check_file(
+    source_file: pathlib.Path,
+    rstcheck_config: config.RstcheckConfig,
+    file_limiter: asyncio.Semaphore,
+    subprocess_limiter: asyncio.Semaphore,
+) -> list[types.LintError]:
+    """Check the given file for issues.
+
+    :param source_file: Path to file to check
+    :param rstcheck_config: Main configuration
+    :param file_limiter: Semaphore limiting the number of files checked concurrently
+    :param subprocess_limiter: Semaphore limiting the number of concurrent subprocesses
+    :return: Found issues
+    """
+    async with file_limiter:
+        return await _run_checks(
+            functools.partial(
+                _checker.prepare_file,
+                source_file,
+                rstcheck_config,
+                overwrite_with_file_config=False,
+            ),
+            subprocess_limiter,
+        )
+
+
+async def check_paths(
+    paths: t.Sequence[pathlib.Path],
+    rstcheck_config: config.RstcheckConfig | None = None,
+    *,
+    max_concurrency: int | None = None,
+    max_subprocesses: int | None = None,
+) -> LintResults:
+    """Check the given files and directories for issues.
+
+    Files and config files are discovered like with the CLI.
+    Non-existing paths are logged as warnings and skipped.
+
+    :param paths: Files to check; directories are searched if ``recursive`` is set in the config
+    :param rstcheck_config: Config to use; defaults to :py:obj:`None` for the default config
+    :param max_concurrency: Maximum number of files to check concurrently;
+        defaults to :py:obj:`None` for the number of CPUs
+    :param max_subprocesses: Maximum number of concurrent subprocesses for code block checks;
+        defaults to :py:obj:`None` for the number of CPUs
+    :return: Found issues in order of the checked files
+    """
+    rstcheck_config = rstcheck_config or config.RstcheckConfig()
+    file_limiter = asyncio.Semaphore(max_concurrency or _default_concurrency())
+    subprocess_limiter = asyncio.Semaphore(max_subprocesses or _default_concurrency())
+
+    loop = asyncio.get_running_loop()
+    main_runner = await loop.run_in_executor(
+        None,
+        lambda: _runner.RstcheckMainRunner(
+            check_paths=list(paths), rstcheck_config=rstcheck_config, overwrite_config=False
+        ),
+    )
+    files_to_check = await loop.run_in_executor(None, lambda: main_runner.files_to_check)
+
+    results = await asyncio.gather(
+        *(
+            _check_file(file, main_runner.config, file_limiter, subprocess_limiter)
+            for file in files_to_check
+        )
+    )
+    lint_results = LintResults()
+    for errors in results:
+        lint_results.extend(errors)
+    return lint_results
@@ -0,0 +1,217 @@
+"""Checker plugins for code block languages.
+
+Code blocks of languages not checked by ``rstcheck-core`` are checked by plugins. Third-party
+plugins are registered in the ``rstcheck.checkers`` entry point group with the language as name,
+e.g. in the ``pyproject.toml`` of the plugin package:
+
+.. code-block:: toml
+
+    [project.entry-points."rstcheck.checkers"]
+    sql = "rstcheck_sql:SqlChecker"
+
+An entry point refers to a subclass of :py:class:`CodeBlockPlugin`. The plugin is imported and
+created only when a code block of its language is found for the first time, so documents without
+such code blocks do not pay for importing it. Its :py:attr:`CodeBlockPlugin.kind` tells how its
+checks are run:
+
+- ``cpu``: :py:meth:`CodeBlockPlugin.check` is called for every code block.
+- ``subprocess``: the command from :py:meth:`CodeBlockPlugin.external_command` is run like the
+  compilers checking C code blocks: with the subprocess limits, outside of the docutils lock of
+  :py:class:`rstcheck.Session` and as asyncio subprocess by :py:mod:`rstcheck.aio`. Its output is
+  parsed by :py:meth:`CodeBlockPlugin.parse_output`.
+- ``batch``: :py:meth:`CodeBlockPlugin.check_batch` is called once per document with the distinct
+  sources of all code blocks of the language, like doctest code blocks are checked.
+
+Languages checked by ``rstcheck-core`` cannot be replaced by plugins.
+"""
+
+from __future__ import annotations
+
+import importlib.metadata
+import logging
+import threading
+import typing as t
+
+if t.TYPE_CHECKING:
+    import pathlib
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "rstcheck.checkers"
+"""Entry point group of checker plugins."""
+
+BUILTIN_PLUGINS = {
+    "ini": "rstcheck._checkers:IniChecker",
+    "markdown": "rstcheck._checkers:MarkdownChecker",
+    "md": "rstcheck._checkers:MarkdownChecker",
+    "toml": "rstcheck._checkers:TomlChecker",
+}
+"""Plugins shipped with rstcheck by language; they take precedence over entry points."""
+
+CheckerKind = t.Literal["cpu", "subprocess", "batch"]
+"""How the checks of a plugin are run."""
+
+Issue = tuple[int, str]
+"""Line number in the code block, starting at 1, and message of an issue."""
+
+
+class ExternalCommand(t.NamedTuple):
+    """Command line of an external tool to check a code block with."""
+
+    arguments: list[str]
+    """Command and arguments to run; the path of the temporary source file is appended."""
+    filename_suffix: str
+    """File suffix for the temporary source file."""
+
+
+class CodeBlockPlugin:
+    """Base class of checker plugins.
+
+    Subclasses set :py:attr:`kind` and override the methods for it. Plugins are created once per
+    process and must not keep state of single checks.
+    """
+
+    kind: t.ClassVar[CheckerKind] = "cpu"
+    """How the checks of the plugin are run."""
+
+    def check(self, source_code: str) -> t.Iterable[Issue]:
+        """Check the source of a code block; used by ``cpu`` plugins.
+
+        :param source_code: Source code of the code block
+        :return: Found issues
+        """
+        raise NotImplementedError
+
+    def check_batch(self, sources: t.Sequence[str]) -> list[list[Issue]]:
+        """Check the distinct sources of all code blocks of a document; used by ``batch`` plugins.
+
+        :param sources: Source code of the code blocks
+        :return: Found issues per source, in order of the sources
+        """
+        return [list(self.check(source_code)) for source_code in sources]
+
+    def external_command(self, source_code: str) -> ExternalCommand | None:  # noqa: ARG002
+        """Get the command to check a code block with; used by ``subprocess`` plugins.
+
+        :param source_code: Source code of the code block
+        :return: Command; :py:obj:`None` to not check the code block
+        """
+        return None
+
+    def parse_output(
+        self,
+        output: str,  # noqa: ARG002
+        temporary_file_path: pathlib.Path,  # noqa: ARG002
+    ) -> t.Iterable[Issue]:
+        """Parse the error output of the command; used by ``subprocess`` plugins.
+
+        Only called if the command exited with an error.
+
+        :param output: Error output of the command
+        :param temporary_file_path: Path of the temporary source file passed to the command
+        :return: Found issues
+        """
+        return []
+
+
+class PluginRegistry:
+    """Plugins by language, loaded when they are needed first."""
+
+    def __init__(
+        self,
+        group: str = ENTRY_POINT_GROUP,
+        builtin_plugins: t.Mapping[str, str] = BUILTIN_PLUGINS,
+    ) -> None:
+        """Initialize :py:class:`PluginRegistry`.
+
+        :param group: Entry point group to discover plugins in;
+            defaults to :py:data:`ENTRY_POINT_GROUP`
+        :param builtin_plugins: Import paths of plugins by language, like entry point values;
+            defaults to :py:data:`BUILTIN_PLUGINS`
+        """
+        self.group = group
+        self._builtin_plugins = dict(builtin_plugins)
+        self._entry_points: dict[str, importlib.metadata.EntryPoint] | None = None
+        self._plugins: dict[str, CodeBlockPlugin | None] = {}
+        self._lock = threading.Lock()
+
+    def register(self, language: str, plugin: CodeBlockPlugin) -> None:
+        """Register a plugin for a language, replacing any other plugin for it.
+
+        :param language: Language of the code blocks to check
+        :param plugin: Plugin to check them with
+        """
+        with self._lock:
+            self._plugins[language] = plugin
+
+    def get(self, language: str) -> CodeBlockPlugin | None:
+        """Get the plugin for a language and load it on first use.
+
+        :param language: Language of a code block
+        :return: Plugin; :py:obj:`None` if there is none or it could not be loaded
+        """
+        try:
+            return self._plugins[language]
+        except KeyError:
+            pass
+        with self._lock:
+            if language not in self._plugins:
+                self._plugins[language] = self._load(language)
+            return self._plugins[language]
+
+    def _load(self, language: str) -> CodeBlockPlugin | None:
+        """Import and create the plugin for a language.
+
+        :param language: Language of a code block
+        :return: Plugin; :py:obj:`None` if there is none or it could not be loaded
+        """
+        entry_point = (
+            importlib.metadata.EntryPoint(
+                name=language, value=self._builtin_plugins[language], group=self.group
+            )
+            if language in self._builtin_plugins
+            else self._discover().get(language)
+        )
+        if entry_point is None:
+            return None
+
+        try:
+            plugin = entry_point.load()()
+        except Exception:
+            logger.exception(
+                "Could not load checker plugin for language '%s': '%s'.",
+                language,
+                entry_point.value,
+            )
+            return None
+        if not isinstance(plugin, CodeBlockPlugin):
+            logger.warning(
+                "Checker plugin for language '%s' is no CodeBlockPlugin: '%s'.",
+                language,
+                entry_point.value,
+            )
+            return None
+
+        logger.debug("Loaded %s checker plugin for language '%s'.", plugin.kind, language)
+        return plugin
+
+    def _discover(self) -> dict[str, importlib.metadata.EntryPoint]:
+        """Find the entry points of the plugin group once.
+
+        :return: Entry points by language
+        """
+        if self._entry_points is None:
+            self._entry_points = {
+                entry_point.name: entry_point
+                for entry_point in importlib.metadata.entry_points(group=self.group)
+            }
+            logger.debug(
+                "Found %s checker plugin entry point(s): %s.",
+                len(self._entry_points),
+                sorted(self._entry_points),
+            )
+        return self._entry_points
+
+
+registry = PluginRegistry()
+"""Registry of the plugins used by all checks."""
@@ -0,0 +1,119 @@
+"""Storage for linting issues."""
+
+from __future__ import annotations
+
+import array
+import typing as t
+
+from rstcheck_core import types
+
+
+class LintResults:
+    """Compact in-memory store of linting issues.
+
+    Instead of keeping a :py:class:`dict` per issue the issues are stored column wise:
+
+    - Line numbers are stored in an :py:class:`array.array`.
+    - Source origins and messages are interned and only their indices are stored in an
+      :py:class:`array.array`.
+
+    Iterating over the store creates the :py:class:`rstcheck_core.types.LintError` dicts lazily.
+    """
+
+    __slots__ = (
+        "_line_numbers",
+        "_message_ids",
+        "_message_index",
+        "_messages",
+        "_origin_ids",
+        "_origin_index",
+        "_origins",
+    )
+
+    def __init__(self, errors: t.Iterable[types.LintError] = ()) -> None:
+        """Initialize :py:class:`LintResults`.
+
+        :param errors: Issues to store initially; defaults to none
+        """
+        self._origins: list[types.SourceFileOrString] = []
+        self._origin_index: dict[types.SourceFileOrString, int] = {}
+        self._messages: list[str] = []
+        self._message_index: dict[str, int] = {}
+        self._origin_ids = array.array("I")
+        self._line_numbers = array.array("i")
+        self._message_ids = array.array("I")
+        self.extend(errors)
+
+    def add(self, source_origin: types.SourceFileOrString, line_number: int, message: str) -> None:
+        """Add an issue to the store.
+
+        :param source_origin: Origin of the source with the issue
+        :param line_number: Line number of the issue
+        :param message: Message of the issue
+        """
+        origin_id = self._origin_index.get(source_origin)
+        if origin_id is None:
+            origin_id = self._origin_index[source_origin] = len(self._origins)
+            self._origins.append(source_origin)
+
+        message_id = self._message_index.get(message)
+        if message_id is None:
+            message_id = self._message_index[message] = len(self._messages)
+            self._messages.append(message)
+
+        self._origin_ids.append(origin_id)
+        self._line_numbers.append(line_number)
+        self._message_ids.append(message_id)
+
+    def append(self, error: types.LintError) -> None:
+        """Add an issue to the store.
+
+        :param error: Issue to add
+        """
+        self.add(error["source_origin"], error["line_number"], error["message"])
+
+    def extend(self, errors: t.Iterable[types.LintError]) -> None:
+        """Add multiple issues to the store.
+
+        :param errors: Issues to add
+        """
+        for error in errors:
+            self.add(error["source_origin"], error["line_number"], error["message"])
+
+    @property
+    def source_origins(self) -> list[types.SourceFileOrString]:
+        """Distinct source origins with issues in order of their first issue."""
+        return list(self._origins)
+
+    def __len__(self) -> int:
+        """Get the number of stored issues."""
+        return len(self._line_numbers)
+
+    def __getitem__(self, index: int) -> types.LintError:
+        """Get the issue at the given index.
+
+        :param index: Index of the issue
+        :return: Issue
+        """
+        return types.LintError(
+            source_origin=self._origins[self._origin_ids[index]],
+            line_number=self._line_numbers[index],
+            message=self._messages[self._message_ids[index]],
+        )
+
+    def __iter__(self) -> t.Iterator[types.LintError]:
+        """Iterate over the stored issues in order of insertion."""
+        origins = self._origins
+        messages = self._messages
+        for origin_id, line_number, message_id in zip(
+            self._origin_ids, self._line_numbers, self._message_ids, strict=True
+        ):
+            yield types.LintError(
+                source_origin=origins[origin_id],
+                line_number=line_number,
+                message=messages[message_id],
+            )
+
+    def __repr__(self) -> str:
+        """Represent the store with its number of issues."""
+        return f"<{type(self).__name__} with {len(self)} issue(s)>"
@@ -0,0 +1,242 @@
+"""Reusable in-process API of rstcheck.
+
+A :py:class:`Session` is created once with the options of the CLI and then checks any number of
+rst sources and files. The config, including a passed config file, and the ignore lists are
+resolved once per session and the configs found for the directories of checked files are kept.
+
+A session can be used from multiple threads. Parsing with docutils, whose directive and role
+registries are global state, is serialized by a lock shared by all sessions; external tools
+checking code blocks (e.g. ``bash`` or ``gcc``) run without holding it. If Sphinx is installed,
+its dummy application is created once per session with the first check; the directives and
+roles it registers are restored for later checks.
+
+Example usage:
+
+.. code-block:: python
+
+    import pathlib
+
+    import rstcheck
+
+    session = rstcheck.Session(report_level="WARNING", ignore_languages="cpp")
+    for path in pathlib.Path("docs").glob("*.rst"):
+        for error in session.check_file(path):
+            print(error["source_origin"], error["line_number"], error["message"])
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import typing as t
+
+from rstcheck_core import _sphinx, checker, config, types
+
+from . import _checker, _registry
+from .results import LintResults
+
+if t.TYPE_CHECKING:
+    import pathlib
+
+logger = logging.getLogger(__name__)
+
+
+class _RunConfig(t.NamedTuple):
+    """Resolved config for checks."""
+
+    rstcheck_config: config.RstcheckConfig
+    """Config to check with."""
+    ignores: types.IgnoreDict
+    """Ignores of the config; copied for every check."""
+
+
+class Session:
+    """Checker for rst sources and files with the setup shared by all checks."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        config_path: pathlib.Path | None = None,
+        *,
+        warn_unknown_settings: bool | None = None,
+        report_level: str | int | None = None,
+        ignore_directives: str | list[str] | None = None,
+        ignore_roles: str | list[str] | None = None,
+        ignore_substitutions: str | list[str] | None = None,
+        ignore_languages: str | list[str] | None = None,
+        ignore_messages: str | list[str] | None = None,
+        sphinx_source_dir: pathlib.Path | None = None,
+    ) -> None:
+        """Initialize :py:class:`Session` with the options of the CLI.
+
+        Like with the CLI the passed options take precedence over config files.
+
+        :param config_path: Config file or directory to search for a config file in;
+            ``NONE`` to not search config files; defaults to :py:obj:`None` for the config files
+            found in the directories of the checked files
+        :param warn_unknown_settings: If a warning should be logged for unknown settings in config
+            files; defaults to :py:obj:`None`
+        :param report_level: Level of rst issues to report;
+            defaults to :py:obj:`None` for the config files or ``INFO``
+        :param ignore_directives: Comma-separated-list or list of directives to ignore;
+            defaults to :py:obj:`None`
+        :param ignore_roles: Comma-separated-list or list of roles to ignore;
+            defaults to :py:obj:`None`
+        :param ignore_substitutions: Comma-separated-list or list of substitutions to ignore;
+            defaults to :py:obj:`None`
+        :param ignore_languages: Comma-separated-list or list of code block languages to ignore;
+            defaults to :py:obj:`None`
+        :param ignore_messages: Regular expression or list of them for messages to ignore;
+            defaults to :py:obj:`None`
+        :param sphinx_source_dir: Path to the sphinx ``source`` directory;
+            defaults to :py:obj:`None`
+        :raises pydantic.ValidationError: On invalid options
+        :raises FileNotFoundError: If the config path does not exist
+        """
+        rstcheck_config = config.RstcheckConfig(
+            config_path=config_path,
+            warn_unknown_settings=warn_unknown_settings,
+            report_level=report_level,
+            ignore_directives=ignore_directives,
+            ignore_roles=ignore_roles,
+            ignore_substitutions=ignore_substitutions,
+            ignore_languages=ignore_languages,
+            ignore_messages=ignore_messages,
+            sphinx_source_dir=(
+                sphinx_source_dir.absolute() if sphinx_source_dir is not None else None
+            ),
+        )
+        if rstcheck_config.config_path is not None:
+            logger.info("Load config file for session: '%s'.", rstcheck_config.config_path)
+            file_config = config.load_config_file_from_path(
+                rstcheck_config.config_path,
+                warn_unknown_settings=rstcheck_config.warn_unknown_settings or False,
+            )
+            if file_config is None:
+                logger.warning("Config file was empty or not found.")
+            else:
+                rstcheck_config = config.merge_configs(
+                    rstcheck_config, file_config, config_add_is_dominant=False
+                )
+
+        self.config = rstcheck_config
+        """Config of the session without the config files of the checked files."""
+        self._run_config = self._resolve(rstcheck_config)
+        self._run_configs: dict[pathlib.Path, _RunConfig] = {}
+        self._lock = threading.Lock()
+        self._sphinx_additions: tuple[dict[str, t.Any], ...] | None = None
+
+    @staticmethod
+    def _resolve(rstcheck_config: config.RstcheckConfig) -> _RunConfig:
+        """Resolve a config for checks.
+
+        :param rstcheck_config: Config to check with
+        :return: Resolved config
+        """
+        ignores = checker._create_ignore_dict_from_config(rstcheck_config)  # noqa: SLF001
+        return _RunConfig(rstcheck_config, ignores)
+
+    def _run_config_for(self, directory: pathlib.Path) -> _RunConfig:
+        """Get the resolved config for the files of a directory.
+
+        Without config path in the session config the directory tree is searched for a config
+        file once per directory.
+
+        :param directory: Directory of the checked file
+        :return: Resolved config
+        """
+        if self.config.config_path is not None:
+            return self._run_config
+
+        with self._lock:
+            run_config = self._run_configs.get(directory)
+        if run_config is None:
+            rstcheck_config = checker._load_run_config(  # noqa: SLF001
+                directory, self.config, overwrite_config=False
+            )
+            run_config = (
+                self._run_config
+                if rstcheck_config is self.config
+                else self._resolve(rstcheck_config)
+            )
+            with self._lock:
+                run_config = self._run_configs.setdefault(directory, run_config)
+        return run_config
+
+    def check_text(self, source: str, *, source_file: pathlib.Path | None = None) -> LintResults:
+        """Check the given rst source for issues.
+
+        Config files are not searched for; only the config of the session is used.
+
+        :param source: Rst source to check
+        :param source_file: Path to file the source comes from, e.g. to resolve includes;
+            defaults to :py:obj:`None`
+        :return: Found issues
+        """
+        return self._check(source, source_file, self._run_config)
+
+    def check_file(self, source_file: pathlib.Path) -> LintResults:
+        """Check the given file for issues.
+
+        Without config path in the session config the config file found for the directory of
+        the file is used, like with the CLI.
+
+        :param source_file: Path to file to check
+        :return: Found issues
+        """
+        logger.info("Check file '%s'", source_file)
+        run_config = self._run_config_for(source_file.parent)
+        source = checker._get_source(source_file)  # noqa: SLF001
+        return self._check(source, source_file, run_config)
+
+    def _check(
+        self, source: str, source_file: pathlib.Path | None, run_config: _RunConfig
+    ) -> LintResults:
+        """Check a source with a resolved config.
+
+        Code blocks checked by external tools are checked after the docutils lock is released.
+
+        :param source: Rst source to check
+        :param source_file: Path to file the source comes from; :py:obj:`None` for none
+        :param run_config: Resolved config to check with
+        :return: Found issues
+        """
+        rstcheck_config = run_config.rstcheck_config
+        with _checker.docutils_lock:
+            _registry.registry.activate(
+                run_config.ignores["directives"], run_config.ignores["roles"]
+            )
+            if self._sphinx_additions is None:
+                self._sphinx_additions = _registry.record_additions(_load_sphinx)
+            else:
+                _registry.apply_additions(self._sphinx_additions)
+            prepared_source = _checker.prepare_source(
+                source,
+                source_file=source_file,
+                ignores=_checker.copy_ignore_dict(run_config.ignores),
+                report_level=rstcheck_config.report_level or config.DEFAULT_REPORT_LEVEL,
+                sphinx_source_dir=rstcheck_config.sphinx_source_dir,
+                warn_unknown_settings=rstcheck_config.warn_unknown_settings or False,
+            )
+            (code_block_errors, external_indices) = _checker.run_in_process_checks(prepared_source)
+
+        for index in external_indices:
+            code_block_errors[index] = list(
+                _checker.run_code_block_check(prepared_source, prepared_source.checks[index])
+            )
+
+        return LintResults(
+            [
+                *prepared_source.include_errors,
+                *_checker.filter_ignored_messages(
+                    (error for _, errors in sorted(code_block_errors.items()) for error in errors),
+                    prepared_source.ignores["messages"],
+                ),
+                *prepared_source.rst_errors,
+            ]
+        )
+
+
+def _load_sphinx() -> None:
+    """Create the dummy Sphinx application, which registers its directives and roles."""
+    with _sphinx.load_sphinx_if_available():
+        pass
@@ -0,0 +1,140 @@
+"""Tests for ``_baseline`` module."""
+
+from __future__ import annotations
+
+import json
+import typing as t
+
+import pytest
+
+from rstcheck import _baseline
+from rstcheck.results import LintResults
+
+if t.TYPE_CHECKING:
+    import pathlib
+
+    from rstcheck_core import types
+
+SOURCE = "Title\n=====\n\n.. foo::\n\nText\n"
+"""Source with an issue in line 4."""
+
+
+def _error(
+    source_origin: types.SourceFileOrString, line_number: int, message: str = "Unknown foo"
+) -> types.LintError:
+    return {"source_origin": source_origin, "line_number": line_number, "message": message}
+
+
+@pytest.mark.parametrize(
+    ("message", "expected"),
+    [
+        ("(ERROR/3) Unknown directive type", "(ERROR/0) Unknown directive type"),
+        ("Line 12 too   long\n(see 7)", "Line 0 too long (see 0)"),
+    ],
+)
+def test_normalize_message(message: str, expected: str) -> None:
+    """Test numbers and whitespace are normalized."""
+    result = _baseline.normalize_message(message)
+
+    assert result == expected
+
+
+def test_issue_still_matches_after_lines_were_inserted(tmp_path: pathlib.Path) -> None:
+    """Test issues are suppressed when their line number changed."""
+    test_file = tmp_path / "doc.rst"
+    test_file.write_text(SOURCE)
+    baseline = _baseline.Baseline.from_results(
+        [_error(test_file, 4, "line 4: Unknown foo")], tmp_path
+    )
+    test_file.write_text("Intro\n\n" + SOURCE)
+
+    (result, suppressed) = baseline.apply([_error(test_file, 6, "line 6: Unknown foo")])
+
+    assert list(result) == []
+    assert suppressed == 1
+
+
+def test_issue_with_changed_line_is_reported(tmp_path: pathlib.Path) -> None:
+    """Test issues are reported when the content of their line changed."""
+    test_file = tmp_path / "doc.rst"
+    test_file.write_text(SOURCE)
+    baseline = _baseline.Baseline.from_results([_error(test_file, 4)], tmp_path)
+    test_file.write_text(SOURCE.replace(".. foo::", ".. foo:: bar"))
+
+    (result, suppressed) = baseline.apply([_error(test_file, 4)])
+
+    assert list(result) == [_error(test_file, 4)]
+    assert suppressed == 0
+
+
+def test_new_copies_of_accepted_issue_are_reported(tmp_path: pathlib.Path) -> None:
+    """Test at most the accepted number of issues with the same fingerprint is suppressed."""
+    test_file = tmp_path / "doc.rst"
+    test_file.write_text(SOURCE)
+    baseline = _baseline.Baseline.from_results([_error(test_file, 4)], tmp_path)
+
+    (result, suppressed) = baseline.apply([_error(test_file, 4), _error(test_file, 4)])
+
+    assert isinstance(result, LintResults)
+    assert list(result) == [_error(test_file, 4)]
+    assert suppressed == 1
+    assert len(baseline) == 1
+
+
+def test_write_and_load(tmp_path: pathlib.Path) -> None:
+    """Test a written baseline is loaded with paths relative to the baseline file."""
+    (tmp_path / "docs").mkdir()
+    test_file = tmp_path / "docs" / "doc.rst"
+    test_file.write_text(SOURCE)
+    errors = [_error(test_file, 4), _error(test_file, 4), _error("<stdin>", 1)]
+    baseline_file = tmp_path / "baseline.json"
+    _baseline.Baseline.from_results(errors, tmp_path).write(baseline_file)
+
+    baseline = _baseline.Baseline.load(baseline_file)
+
+    content = json.loads(baseline_file.read_text())
+    assert [issue["path"] for issue in content["issues"]] == ["<stdin>", "docs/doc.rst"]
+    assert [issue["count"] for issue in content["issues"]] == [1, 2]
+    assert len(baseline) == 3
+    assert baseline.apply(errors)[1] == 3
+
+
+def test_string_origins_match_path_origins(tmp_path: pathlib.Path) -> None:
+    """Test origins from results files match the paths of checked files."""
+    test_file = tmp_path / "doc.rst"
+    test_file.write_text(SOURCE)
+    baseline = _baseline.Baseline.from_results([_error(test_file, 4)], tmp_path)
+
+    # Results files store the origins as strings.
+    origin = t.cast("types.SourceFileOrString", str(test_file))
+
+    (result, suppressed) = baseline.apply([_error(origin, 4)])
+
+    assert list(result) == []
+    assert suppressed == 1
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "no json",
+        "[]",
+        '{"format": "other", "version": 1, "issues": []}',
+        '{"format": "rstcheck-baseline", "version": 2, "issues": []}',
+        '{"format": "rstcheck-baseline", "version": 1}',
+        '{"format": "rstcheck-baseline", "version": 1, "issues": [{"path": "a.rst"}]}',
+        '{"format": "rstcheck-baseline", "version": 1, "issues": ["a.rst"]}',
+        '{"format": "rstcheck-baseline", "version": 1, "issues": 1}',
+        (
+            '{"format": "rstcheck-baseline", "version": 1, '
+            '"issues": [{"path": "a.rst", "message": "a", "context": []}]}'
+        ),
+    ],
+)
+def test_load_invalid_file(tmp_path: pathlib.Path, content: str) -> None:
+    """Test files which are no baseline files of this version are rejected."""
+    baseline_file = tmp_path / "baseline.json"
+    baseline_file.write_text(content)
+
+    with pytest.raises(ValueError, match="baseline file"):
+        _baseline.Baseline.load(baseline_file)
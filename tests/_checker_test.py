@@ -0,0 +1,382 @@
+"""Tests for ``_checker`` module."""
+
+from __future__ import annotations
+
+import contextlib
+import shutil
+import sys
+import threading
+import time
+import typing as t
+
+import docutils.core
+import pytest
+from rstcheck_core import _sphinx, checker, config
+
+from rstcheck import _checker, _subprocesses
+from tests.conftest import EXAMPLES_DIR
+
+if t.TYPE_CHECKING:
+    import pathlib
+
+
+@pytest.mark.parametrize(
+    "test_file", sorted(EXAMPLES_DIR.glob("*/*.rst")), ids=lambda p: f"{p.parent.name}/{p.name}"
+)
+@pytest.mark.parametrize("report_level", list(config.ReportLevel))
+def test_check_file_matches_rstcheck_core(
+    test_file: pathlib.Path, report_level: config.ReportLevel
+) -> None:
+    """Test issues are the same as found by ``rstcheck_core.checker.check_file`` at all levels."""
+    rstcheck_config = config.RstcheckConfig(report_level=report_level)
+    expected = checker.check_file(test_file, rstcheck_config, overwrite_with_file_config=False)
+
+    result = _checker.check_file(test_file, rstcheck_config, overwrite_with_file_config=False)
+
+    assert result == expected
+
+
+def test_prepare_source_collects_code_blocks() -> None:
+    """Test code blocks are collected but not run."""
+    source = """
+Example
+=======
+
+.. code-block:: python
+
+    print(
+
+.. code-block:: bash
+
+    echo "Hello"
+"""
+
+    result = _checker.prepare_source(source)
+
+    assert [check.language for check in result.checks] == ["python", "bash"]
+    assert result.checks[0].first_line == 7
+    assert not result.rst_errors
+
+
+@pytest.mark.parametrize("language", ["bash", "c", "cpp"])
+def test_external_check_for_external_languages(language: str) -> None:
+    """Test external tools are used for some languages."""
+    code_block_checker = _checker.CodeBlockChecker("<string>")
+
+    result = code_block_checker.external_check("foo", language)
+
+    assert result is not None
+    assert result.source_code.startswith("foo")
+
+
+def test_external_check_for_internal_languages() -> None:
+    """Test no external tool is used for python."""
+    code_block_checker = _checker.CodeBlockChecker("<string>")
+
+    result = code_block_checker.external_check("foo", "python")
+
+    assert result is None
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Depends on POSIX shell scripts.")
+def test_external_check_exceeding_limit_is_reported(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test a timed out external tool is reported at the first line of the code block."""
+    compiler = tmp_path / "cc"
+    compiler.write_text("#!/bin/sh\nsleep 30\n")
+    compiler.chmod(0o755)
+    monkeypatch.setenv("CC", str(compiler))
+    source = "Example\n=======\n\n.. code-block:: c\n\n    int x;\n"
+
+    with _subprocesses.configured(_subprocesses.SubprocessLimits({"c": 0.5})):
+        result = list(_checker.check_source(source))
+
+    assert result == [
+        {
+            "source_origin": "<string>",
+            "line_number": 6,
+            "message": "(c) Check aborted: timed out after 0.5 seconds",
+        }
+    ]
+
+
+def test_code_block_check_maps_errors_to_document() -> None:
+    """Test line numbers and messages are mapped to the document."""
+    code_block_check = _checker.CodeBlockCheck("python", "print(", 7)
+    error = {"source_origin": "<string>", "line_number": 2, "message": "Boom"}
+
+    result = list(code_block_check.map_errors([error]))  # type: ignore[list-item]
+
+    assert result == [{"source_origin": "<string>", "line_number": 8, "message": "(python) Boom"}]
+
+
+def test_doctest_checks_are_batched_and_mapped_per_block() -> None:
+    """Test identical doctest blocks are parsed once and issues are reported per block."""
+    source = """
+Example
+=======
+
+>>> x = 1
+>>>y
+
+Text.
+
+>>> x = 1
+>>>y
+
+.. code-block:: python
+
+    >>> print("fine")
+"""
+    expected = list(checker.check_source(source))
+    _checker._check_doctest_source.cache_clear()
+
+    result = list(_checker.check_source(source))
+
+    assert result == expected
+    assert [error["line_number"] for error in result] == [5, 10]
+    cache_info = _checker._check_doctest_source.cache_info()
+    assert (cache_info.misses, cache_info.currsize) == (2, 2)
+
+
+def _nest_rst(source: str, depth: int) -> str:
+    """Nest rst source into the given number of rst code blocks."""
+    for _ in range(depth):
+        indented = "\n".join(f"    {line}" if line else "" for line in source.splitlines())
+        source = f"Level\n=====\n\n.. code-block:: rst\n\n{indented}\n"
+    return source
+
+
+def test_nested_rst_checks_are_memoized(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test identical nested rst blocks are parsed once and reported per block."""
+    block = ".. code-block:: rst\n\n    Testing\n    ===\n"
+    source = f"Test\n====\n\n{block}\nText.\n\n{block}"
+    expected = list(checker.check_source(source))
+    monkeypatch.setattr(_checker, "_nested_rst_cache", {})
+    publish_calls = []
+    publish_string = docutils.core.publish_string
+
+    def _publish_string(*args: t.Any, **kwargs: t.Any) -> t.Any:  # noqa: ANN401
+        publish_calls.append(args)
+        return publish_string(*args, **kwargs)
+
+    monkeypatch.setattr(docutils.core, "publish_string", _publish_string)
+
+    result = list(_checker.check_source(source))
+
+    assert result == expected
+    assert [error["line_number"] for error in result] == [7, 14]
+    assert len(publish_calls) == 2
+
+
+def test_docutils_settings_are_built_once_per_report_level(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test every parse gets its own copy of the settings built once per report level."""
+    monkeypatch.setattr(_checker, "_docutils_settings", {})
+    publish_settings = []
+    publish_string = docutils.core.publish_string
+
+    def _publish_string(*args: t.Any, **kwargs: t.Any) -> t.Any:  # noqa: ANN401
+        publish_settings.append(kwargs["settings"])
+        return publish_string(*args, **kwargs)
+
+    monkeypatch.setattr(docutils.core, "publish_string", _publish_string)
+    source = "Title\n===\n"
+
+    results = [
+        _checker.prepare_source(source, report_level=report_level).rst_errors
+        for report_level in (
+            config.ReportLevel.INFO,
+            config.ReportLevel.INFO,
+            config.ReportLevel.ERROR,
+        )
+    ]
+
+    assert [len(errors) for errors in results] == [1, 1, 0]
+    assert len(_checker._docutils_settings) == 2
+    assert len({id(settings) for settings in publish_settings}) == 3
+    assert len({id(settings.warning_stream) for settings in publish_settings}) == 3
+    assert all(
+        settings not in _checker._docutils_settings.values() for settings in publish_settings
+    )
+
+
+def test_docutils_settings_are_built_per_working_directory(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test the docutils config file of the working directory is used."""
+    monkeypatch.setattr(_checker, "_docutils_settings", {})
+    source = "Title\n===\n"
+    expected = _checker.prepare_source(source).rst_errors
+    (tmp_path / "docutils.conf").write_text("[general]\nreport_level: 3\n")
+    monkeypatch.chdir(tmp_path)
+
+    result = _checker.prepare_source(source).rst_errors
+
+    assert len(expected) == 1
+    assert result == []
+
+
+def test_docutils_readers_are_reused(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the reader and parser of a finished parse are used for the next one."""
+    monkeypatch.setattr(_checker, "_idle_readers", [])
+    source = "Test\n====\n\n.. code-block:: rst\n\n    Testing\n    ===\n"
+
+    errors = list(_checker.check_source(source))
+    readers = list(_checker._idle_readers)
+    _checker.prepare_source(source)
+
+    assert len(errors) == 1
+    assert len(readers) == 1
+    assert _checker._idle_readers == readers
+
+
+def test_nested_rst_deeper_than_limit_is_skipped(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test rst nested deeper than the limit is not checked."""
+    monkeypatch.setattr(_checker, "MAX_NESTING_DEPTH", 2)
+    monkeypatch.setattr(_checker, "_nested_rst_cache", {})
+
+    within_limit = list(_checker.check_source(_nest_rst("Testing\n===\n", 2)))
+    beyond_limit = list(_checker.check_source(_nest_rst("Testing\n===\n", 3)))
+
+    assert len(within_limit) == 1
+    assert beyond_limit == []
+
+
+def test_data_languages_match_rstcheck_core() -> None:
+    """Test issues of JSON, XML and YAML code blocks are the same as found by ``rstcheck-core``."""
+    source = """
+Example
+=======
+
+.. code-block:: json
+
+    {"a": [1, 2}
+
+.. code-block:: xml
+
+    <a>
+    </b>
+
+.. code-block:: yaml
+
+    a: b: c
+"""
+    expected = list(checker.check_source(source))
+
+    result = list(_checker.check_source(source))
+
+    assert result == expected
+    assert [error["line_number"] for error in result] == [7, 12, 15]
+
+
+PRUNING_SOURCES = [
+    "Title\n===\n\nSee [link](https://example.com).\n",
+    "Title\n=====\n\n.. CODE-BLOCK:: python\n\n    print(\n",
+    "Title\n=====\n\n.. code:: python\n\n    print(\n",
+    "Title\n=====\n\n>>> print(\n",
+    "Title\n=====\n\n.. code-block:: rst\n\n    Title\n    ===\n\n    .. unknown::\n",
+    "Title\n=====\n\n.. unknown::\n\n:unknown:`role`\n",
+]
+
+
+@pytest.mark.parametrize("report_level", list(config.ReportLevel))
+@pytest.mark.parametrize("source", PRUNING_SOURCES)
+def test_pruned_checks_match_rstcheck_core(source: str, report_level: config.ReportLevel) -> None:
+    """Test skipping work which cannot produce reported issues does not change the issues."""
+    expected = list(checker.check_source(source, report_level=report_level))
+
+    result = list(_checker.check_source(source, report_level=report_level))
+
+    assert result == expected
+
+
+def test_source_without_code_blocks_is_not_parsed_without_report(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test sources without code blocks are not parsed at report level ``NONE``."""
+    publish_calls = []
+    publish_string = docutils.core.publish_string
+
+    def _publish_string(*args: t.Any, **kwargs: t.Any) -> t.Any:  # noqa: ANN401
+        publish_calls.append(args)
+        return publish_string(*args, **kwargs)
+
+    monkeypatch.setattr(docutils.core, "publish_string", _publish_string)
+
+    for source in PRUNING_SOURCES:
+        list(_checker.check_source(source, report_level=config.ReportLevel.NONE))
+
+    assert len(publish_calls) == len(PRUNING_SOURCES) - 2
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Depends on POSIX shell scripts.")
+def test_check_file_runs_external_checks_without_docutils_lock(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test other threads can use docutils while an external tool of a file check is running."""
+    compiler = tmp_path / "cc"
+    started = tmp_path / "started"
+    compiler.write_text(f"#!/bin/sh\ntouch {started}\nsleep 2\n")
+    compiler.chmod(0o755)
+    monkeypatch.setenv("CC", str(compiler))
+    test_file = tmp_path / "test.rst"
+    test_file.write_text("Example\n=======\n\n.. code-block:: c\n\n    int x;\n")
+    thread = threading.Thread(
+        target=_checker.check_file, args=(test_file, config.RstcheckConfig(), False)
+    )
+    thread.start()
+    while not started.exists():
+        time.sleep(0.01)
+
+    acquired = _checker.docutils_lock.acquire(timeout=1)
+    if acquired:
+        _checker.docutils_lock.release()
+    thread.join()
+
+    assert acquired
+
+
+def test_check_file_loads_sphinx_once(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test parsing a file and checking its code blocks share one dummy Sphinx application."""
+    entered = []
+
+    @contextlib.contextmanager
+    def load_sphinx_if_available() -> t.Iterator[None]:
+        entered.append(True)
+        yield
+
+    monkeypatch.setattr(_sphinx, "load_sphinx_if_available", load_sphinx_if_available)
+    test_file = tmp_path / "test.rst"
+    test_file.write_text("Example\n=======\n\n.. code-block:: rst\n\n    Nested\n")
+
+    _checker.check_file(test_file, config.RstcheckConfig(), overwrite_with_file_config=False)
+
+    assert entered == [True]
+
+
+@pytest.mark.skipif(shutil.which("g++") is None, reason="Depends on g++.")
+def test_compiler_errors_quoting_bad_alloc_are_no_memory_limit() -> None:
+    """Test compiler errors quoting source about allocations are reported as they are."""
+    source = """Example
+=======
+
+.. code-block:: cpp
+
+    #include <new>
+
+    int main()
+    {
+        try { return 0; }
+        catch (std::bad_alloc& e) { return 1 }
+    }
+"""
+
+    result = list(_checker.check_source(source))
+
+    assert [error["line_number"] for error in result] == [11]
+    assert result[0]["message"].startswith("(cpp) error: expected")
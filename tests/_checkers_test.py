@@ -0,0 +1,105 @@
+"""Tests for ``_checkers`` module."""
+
+from __future__ import annotations
+
+import markdown_it.main
+import markdown_it.parser_core
+import markdown_it.presets
+import pytest
+
+from rstcheck import _checkers
+
+
+@pytest.mark.parametrize(
+    ("source_code", "expected"),
+    [
+        ("[tool]\nname = 'rstcheck'\n", []),
+        ("a = 1\nb = \n", [(2, "Invalid value (at line 2, column 5)")]),
+        ("a = 1\na = 2\n", [(2, "Cannot overwrite a value (at line 2, column 6)")]),
+    ],
+)
+def test_toml_checker(source_code: str, expected: list[tuple[int, str]]) -> None:
+    """Test TOML syntax errors are reported with their line."""
+    result = list(_checkers.TomlChecker().check(source_code))
+
+    assert result == expected
+
+
+@pytest.mark.parametrize(
+    ("source_code", "expected"),
+    [
+        ("[section]\nkey = value\n  continued\n", []),
+        ("key = value\n", [(1, "File contains no section headers.")]),
+        ("[s]\n[s]\n", [(2, "section 's' already exists")]),
+        ("[s]\na = 1\na = 2\n", [(3, "option 'a' in section 's' already exists")]),
+        ("[s]\na = 1\ngarbage\nmore\n", [(3, "Invalid line: 'garbage\\n'")]),
+    ],
+)
+def test_ini_checker(source_code: str, expected: list[tuple[int, str]]) -> None:
+    """Test INI syntax errors are reported with their line."""
+    result = list(_checkers.IniChecker().check(source_code))
+
+    assert result == expected
+
+
+@pytest.mark.parametrize(
+    ("source_code", "expected"),
+    [
+        ("# Title\n\n```python\nprint()\n```\n\n[link](https://example.com)\n", []),
+        ("[a][b] and [c][]\n\n[b]: /b\n[c]: /c\n", []),
+        ("Text with `[a][b]` and \\[a\\][b]\n", []),
+        ("> ```\n> quoted\n", []),
+        ("# Title\n\n```python\nprint()\n", []),
+        ("Text\n[a][Missing]\n", [(2, "Link reference 'Missing' is not defined.")]),
+        ("(see [a][Missing])\n", [(1, "Link reference 'Missing' is not defined.")]),
+        ("Use matrix[0][1] to index.\n", []),
+        ("Call f(x)[i][j] and data[key][]\n", []),
+        ("The lists [0][1] and [1, 2][-1]\n", []),
+    ],
+    ids=[
+        "valid",
+        "references",
+        "no-references",
+        "blockquote",
+        "open-fence",
+        "reference",
+        "reference-in-parentheses",
+        "index",
+        "expression-index",
+        "numeric-brackets",
+    ],
+)
+def test_markdown_checker(source_code: str, expected: list[tuple[int, str]]) -> None:
+    """Test Markdown syntax problems are reported with their line."""
+    result = list(_checkers.MarkdownChecker().check(source_code))
+
+    assert result == expected
+
+
+def test_markdown_checker_checks_batches() -> None:
+    """Test the issues of a batch are returned per source."""
+    sources = ["[a][b]\n", "Text\n", "[c][]\n\n[c]: /c\n[d][e]\n"]
+
+    result = _checkers.MarkdownChecker().check_batch(sources)
+
+    assert result == [
+        [(1, "Link reference 'b' is not defined.")],
+        [],
+        [(4, "Link reference 'e' is not defined.")],
+    ]
+
+
+def test_markdown_checker_without_text_join_rule(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the checker works with markdown-it-py before 3.0, which has no ``text_join`` rule."""
+    preset = markdown_it.presets.commonmark.make()
+    preset["components"]["core"]["rules"].remove("text_join")
+    monkeypatch.setitem(markdown_it.main._PRESETS, "commonmark", preset)
+    monkeypatch.setattr(
+        markdown_it.parser_core,
+        "_rules",
+        [rule for rule in markdown_it.parser_core._rules if rule[0] != "text_join"],
+    )
+
+    result = list(_checkers.MarkdownChecker().check("[a][b]\n"))
+
+    assert result == [(1, "Link reference 'b' is not defined.")]
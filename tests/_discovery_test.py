@@ -0,0 +1,182 @@
+"""Tests for ``_discovery`` module."""
+
+from __future__ import annotations
+
+import typing as t
+
+import pytest
+
+from rstcheck import _discovery
+
+if t.TYPE_CHECKING:
+    import pathlib
+
+
+def _create_files(root: pathlib.Path, *files: str) -> None:
+    """Create the files with their parent directories."""
+    for file in files:
+        (root / file).parent.mkdir(parents=True, exist_ok=True)
+        (root / file).write_text("")
+
+
+def _find(root: pathlib.Path, **kwargs: t.Any) -> list[str]:  # noqa: ANN401
+    """Search the root directory and get the found files relative to it."""
+    file_finder = _discovery.FileFinder(recursive=True, **kwargs)
+    return [path.relative_to(root).as_posix() for path in file_finder.find([root])]
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [(None, None), ("a, b/,", ["a", "b/"]), (["a ", "b"], ["a", "b"])],
+)
+def test_split_patterns(value: str | list[str] | None, expected: list[str] | None) -> None:
+    """Test patterns are split and stripped."""
+    result = _discovery.split_patterns(value)
+
+    assert result == expected
+
+
+def test_load_path_patterns_from_ini_file(tmp_path: pathlib.Path) -> None:
+    """Test patterns are loaded from the rstcheck section."""
+    config_file = tmp_path / ".rstcheck.cfg"
+    config_file.write_text("[rstcheck]\nexclude = _build/, drafts\nreport_level = INFO\n")
+
+    result = _discovery.load_path_patterns(config_file)
+
+    assert result == _discovery.PathPatterns(exclude=["_build/", "drafts"], include=None)
+
+
+def test_load_path_patterns_with_gitignore_setting(tmp_path: pathlib.Path) -> None:
+    """Test the gitignore setting is loaded as boolean."""
+    config_file = tmp_path / ".rstcheck.cfg"
+    config_file.write_text("[rstcheck]\ngitignore = no\n")
+
+    result = _discovery.load_path_patterns(config_file)
+
+    assert result == _discovery.PathPatterns(exclude=None, include=None, gitignore=False)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [(None, None), (False, False), ("true", True), (" Off ", False), ("1", True)],
+)
+def test_parse_bool(value: str | bool | None, expected: bool | None) -> None:
+    """Test booleans of config files are parsed."""
+    result = _discovery.parse_bool(value)
+
+    assert result is expected
+
+
+def test_parse_bool_with_invalid_value() -> None:
+    """Test invalid booleans raise an error."""
+    with pytest.raises(ValueError, match="Invalid boolean value: 'maybe'"):
+        _discovery.parse_bool("maybe")
+
+
+def test_load_path_patterns_searches_working_directory(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test the current working directory and its parents are searched without config path."""
+    (tmp_path / "setup.cfg").write_text("[rstcheck]\ninclude = *.rst, *.txt\n")
+    (tmp_path / "docs").mkdir()
+    monkeypatch.chdir(tmp_path / "docs")
+
+    result = _discovery.load_path_patterns(None)
+
+    assert result == _discovery.PathPatterns(exclude=None, include=["*.rst", "*.txt"])
+
+
+def test_load_path_patterns_with_none(tmp_path: pathlib.Path) -> None:
+    """Test no patterns are loaded for ``NONE``."""
+    result = _discovery.load_path_patterns(tmp_path / "NONE")
+
+    assert result == _discovery.PathPatterns(exclude=None, include=None)
+
+
+class TestFileFinder:
+    """Test ``FileFinder`` class."""
+
+    @staticmethod
+    def test_finds_rst_files_in_order(tmp_path: pathlib.Path) -> None:
+        """Test rst files are found depth first in name order."""
+        _create_files(tmp_path, "b.rst", "a.RST", "c.txt", "sub/c.rst", "sub/sub/d.rst", "z.rst")
+
+        result = _find(tmp_path)
+
+        assert result == ["a.RST", "b.rst", "z.rst", "sub/c.rst", "sub/sub/d.rst"]
+
+    @staticmethod
+    def test_skips_hidden_paths_and_virtualenvs(tmp_path: pathlib.Path) -> None:
+        """Test hidden files and directories and virtual environments are skipped."""
+        _create_files(tmp_path, ".a.rst", ".tox/b.rst", "venv/pyvenv.cfg", "venv/c.rst", "d.rst")
+
+        result = _find(tmp_path)
+
+        assert result == ["d.rst"]
+
+    @staticmethod
+    def test_respects_gitignore(tmp_path: pathlib.Path) -> None:
+        """Test gitignore patterns with anchors, directory markers and negations."""
+        _create_files(
+            tmp_path,
+            "_build/a.rst",
+            "docs/_build/b.rst",
+            "docs/build.rst/c.rst",
+            "docs/notes.rst",
+            "docs/keep.rst",
+            "node_modules/pkg/d.rst",
+            "top.rst",
+            "sub/top.rst",
+        )
+        (tmp_path / ".gitignore").write_text(
+            "# comment\n_build/\nnode_modules\n/top.rst\nbuild.rst/\n"
+        )
+        (tmp_path / "docs" / ".gitignore").write_text("*.rst\n!keep.rst\n")
+
+        result = _find(tmp_path)
+
+        assert result == ["docs/keep.rst", "sub/top.rst"]
+
+    @staticmethod
+    def test_respects_gitignore_of_parents_in_repository(tmp_path: pathlib.Path) -> None:
+        """Test ``.gitignore`` files up to the repository root are used."""
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".gitignore").write_text("docs/generated/\n")
+        _create_files(tmp_path, "docs/generated/a.rst", "docs/b.rst")
+
+        result = _find(tmp_path / "docs")
+
+        assert result == ["b.rst"]
+
+    @staticmethod
+    def test_gitignore_can_be_disabled(tmp_path: pathlib.Path) -> None:
+        """Test ``.gitignore`` files are not used when disabled."""
+        _create_files(tmp_path, "a.rst")
+        (tmp_path / ".gitignore").write_text("*.rst\n")
+
+        result = _find(tmp_path, use_gitignore=False)
+
+        assert result == ["a.rst"]
+
+    @staticmethod
+    def test_exclude_and_include_patterns(
+        tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test exclude patterns prune and include patterns select files."""
+        monkeypatch.chdir(tmp_path)
+        _create_files(tmp_path, "a.rst", "b.txt", "drafts/c.rst", "docs/api/d.txt", "api/e.txt")
+
+        result = _find(tmp_path, exclude=["drafts", "/docs/api/"], include=["*.txt"])
+
+        assert result == ["b.txt", "api/e.txt"]
+
+    @staticmethod
+    def test_passed_files_are_not_excluded(tmp_path: pathlib.Path) -> None:
+        """Test passed files are only filtered by include patterns."""
+        _create_files(tmp_path, "a.rst", "b.txt")
+        (tmp_path / ".gitignore").write_text("*.rst\n")
+        file_finder = _discovery.FileFinder(recursive=False, exclude=["a.rst"])
+
+        result = list(file_finder.find([tmp_path / "a.rst", tmp_path / "b.txt", tmp_path]))
+
+        assert result == [tmp_path / "a.rst"]
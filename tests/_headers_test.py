@@ -0,0 +1,134 @@
+"""Tests for ``_headers`` module."""
+
+from __future__ import annotations
+
+import pathlib
+import shutil
+
+import pytest
+from rstcheck_core import config
+
+from rstcheck import _checker, _headers
+
+requires_gcc = pytest.mark.skipif(shutil.which("g++") is None, reason="Depends on g++.")
+
+ARGUMENTS = ["g++", "-I.", "-I..", "-pedantic", "-fsyntax-only"]
+
+
+def test_split_includes_keeps_line_numbers() -> None:
+    """Test leading include lines and comments are split off and replaced by blank lines."""
+    source_code = '// Example\n#include "foo.h"\n\n#  include <vector> // vectors\nint a;\n'
+
+    result = _headers.split_includes(source_code)
+
+    assert result == (
+        ['#include "foo.h"', "#  include <vector> // vectors"],
+        "// Example\n\n\n\nint a;\n",
+    )
+
+
+@pytest.mark.parametrize(
+    "source_code",
+    ["int a;\n#include <vector>\n", '#define FOO 1\n#include "foo.h"\n', ""],
+    ids=["code", "define", "empty"],
+)
+def test_split_includes_stops_at_other_lines(source_code: str) -> None:
+    """Test include lines after other lines are kept in the source."""
+    result = _headers.split_includes(source_code)
+
+    assert result == ([], source_code)
+
+
+def test_parse_dependencies() -> None:
+    """Test the prerequisites of make rules are resolved against the working directory."""
+    make_rule = "/build/a.h.gch: /build/a.h foo.h \\\n include/my\\ bar.h\n"
+
+    result = _headers.parse_dependencies(make_rule, pathlib.Path("/docs"))
+
+    assert result == [
+        pathlib.Path("/build/a.h"),
+        pathlib.Path("/docs/foo.h"),
+        pathlib.Path("/docs/include/my bar.h"),
+    ]
+
+
+@pytest.fixture
+def docs_dir(tmp_path: pathlib.Path) -> pathlib.Path:
+    """Directory with a local header."""
+    docs_dir = tmp_path / "docs"
+    docs_dir.mkdir()
+    (docs_dir / "foo.h").write_text("inline int foo() { return 1; }\n")
+    return docs_dir
+
+
+@requires_gcc
+def test_headers_are_precompiled_when_shared(
+    tmp_path: pathlib.Path, docs_dir: pathlib.Path
+) -> None:
+    """Test include lines are precompiled from the second use on."""
+    headers = _headers.PrecompiledHeaders(tmp_path / "headers")
+    source_code = '#include "foo.h"\nint main() { return foo(); }\n'
+
+    results = [headers.apply("cpp", ARGUMENTS, source_code, docs_dir) for _ in range(3)]
+
+    assert results[0] is None
+    assert results[1] == results[2]
+    assert results[1] is not None
+    (arguments, stripped_source_code) = results[1]
+    assert arguments[1] == "-include"
+    assert pathlib.Path(arguments[2] + ".gch").is_file()
+    assert stripped_source_code == "\nint main() { return foo(); }\n"
+
+
+@requires_gcc
+def test_changed_headers_are_precompiled_again(
+    tmp_path: pathlib.Path, docs_dir: pathlib.Path
+) -> None:
+    """Test precompiled headers are rebuilt when a local header they depend on changed."""
+    headers = _headers.PrecompiledHeaders(tmp_path, min_uses=1)
+    source_code = '#include "foo.h"\nint main() { return foo(); }\n'
+    result = headers.apply("cpp", ARGUMENTS, source_code, docs_dir)
+    assert result is not None
+    precompiled_header = pathlib.Path(result[0][2] + ".gch")
+    precompiled_header.write_bytes(b"outdated")
+
+    (docs_dir / "foo.h").write_text("inline int foo() { return 2; }\n")
+    result = headers.apply("cpp", ARGUMENTS, source_code, docs_dir)
+
+    assert result is not None
+    assert precompiled_header.read_bytes() != b"outdated"
+
+
+@requires_gcc
+def test_headers_with_errors_are_not_precompiled(
+    tmp_path: pathlib.Path, docs_dir: pathlib.Path
+) -> None:
+    """Test include lines are checked with the code block if they cannot be precompiled."""
+    (docs_dir / "foo.h").write_text("inline int foo() { return 1 }\n")
+    headers = _headers.PrecompiledHeaders(tmp_path, min_uses=1)
+    source_code = '#include "foo.h"\nint main() { return foo(); }\n'
+
+    results = [headers.apply("cpp", ARGUMENTS, source_code, docs_dir) for _ in range(2)]
+
+    assert results == [None, None]
+    assert list(tmp_path.glob("*.gch*")) == []
+
+
+@requires_gcc
+def test_check_file_with_precompiled_header(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path, docs_dir: pathlib.Path
+) -> None:
+    """Test issues of code blocks checked with precompiled headers keep their line numbers."""
+    monkeypatch.setattr(_headers, "cache", _headers.PrecompiledHeaders(tmp_path, min_uses=1))
+    test_file = docs_dir / "test.rst"
+    test_file.write_text(
+        '.. code-block:: cpp\n\n    #include "foo.h"\n\n    int main() { return foo() }\n\n'
+        '.. code-block:: cpp\n\n    #include "foo.h"\n\n    int main() { return foo(); }\n'
+    )
+
+    result = _checker.check_file(
+        test_file, config.RstcheckConfig(), overwrite_with_file_config=False
+    )
+
+    assert list(tmp_path.glob("*.gch"))
+    assert [error["line_number"] for error in result] == [5]
@@ -0,0 +1,76 @@
+"""Tests for ``_logging`` module."""
+
+from __future__ import annotations
+
+import logging
+import pathlib
+import pickle
+import sys
+import typing as t
+
+from rstcheck import _logging
+
+if t.TYPE_CHECKING:
+    import pytest
+
+
+def _record(msg: object, *args: object) -> logging.LogRecord:
+    return logging.LogRecord("rstcheck.test", logging.INFO, __file__, 1, msg, args, None)
+
+
+def test_prepare_record_keeps_simple_arguments() -> None:
+    """Test messages with simple arguments are formatted by the main process."""
+    record = _record("Check '%s' with %s blocks", pathlib.Path("a.rst"), 3)
+
+    result = pickle.loads(pickle.dumps(_logging.prepare_record(record)))  # noqa: S301
+
+    assert result.msg == "Check '%s' with %s blocks"
+    assert result.getMessage() == "Check 'a.rst' with 3 blocks"
+
+
+def test_prepare_record_formats_other_arguments() -> None:
+    """Test messages with arguments which may not be picklable are formatted in the worker."""
+    record = _record("Run %s", lambda: None)
+
+    result = pickle.loads(pickle.dumps(_logging.prepare_record(record)))  # noqa: S301
+
+    assert result.args is None
+    assert result.getMessage().startswith("Run <function")
+
+
+def test_prepare_record_formats_exception() -> None:
+    """Test exception information is sent as text."""
+    record = _record("Failed")
+    try:
+        msg = "broken"
+        raise ValueError(msg)  # noqa: TRY301
+    except ValueError:
+        record.exc_info = sys.exc_info()
+
+    result = pickle.loads(pickle.dumps(_logging.prepare_record(record)))  # noqa: S301
+
+    assert result.exc_info is None
+    assert "ValueError: broken" in result.exc_text
+
+
+def test_record_buffer_takes_records_in_order() -> None:
+    """Test the buffer returns the kept records once."""
+    buffer = _logging.RecordBuffer()
+    for index in range(3):
+        buffer.handle(_record("Record %s", index))
+
+    result = buffer.take()
+
+    assert [record.getMessage() for record in result] == ["Record 0", "Record 1", "Record 2"]
+    assert buffer.take() == []
+
+
+def test_replay_respects_levels(caplog: pytest.LogCaptureFixture) -> None:
+    """Test replayed records are only handled at enabled levels."""
+    caplog.set_level(logging.INFO, logger="rstcheck.test")
+    debug_record = _record("Debug")
+    debug_record.levelno = logging.DEBUG
+
+    _logging.replay([debug_record, _record("Info %s", 1)])
+
+    assert [record.getMessage() for record in caplog.records] == ["Info 1"]
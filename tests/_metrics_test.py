@@ -0,0 +1,92 @@
+"""Tests for ``_metrics`` module."""
+
+from __future__ import annotations
+
+import json
+import typing as t
+
+from rstcheck import _metrics
+
+if t.TYPE_CHECKING:
+    import pathlib
+
+
+def test_count_without_collection_does_nothing() -> None:
+    """Test counting is a no-op if no metrics are installed."""
+    _metrics.count("files_checked")  # act
+
+    assert _metrics.current is None
+
+
+def test_collecting_installs_and_restores_metrics() -> None:
+    """Test metrics are installed only inside the context."""
+    metrics = _metrics.Metrics()
+
+    with _metrics.collecting(metrics):
+        _metrics.count("code_blocks", "python", 2)
+
+    assert _metrics.current is None
+    assert metrics.counters == {"code_blocks": {"python": 2}}
+
+
+def test_take_and_merge() -> None:
+    """Test taken metrics are reset and can be merged into other metrics."""
+    worker_metrics = _metrics.Metrics()
+    worker_metrics.count("files_checked")
+    worker_metrics.observe_latency(0.003)
+    metrics = _metrics.Metrics()
+    metrics.count("files_checked")
+
+    metrics.merge(worker_metrics.take())
+
+    assert worker_metrics.as_dict() == _metrics.Metrics().as_dict()
+    assert metrics.counters == {"files_checked": {"": 2}}
+    assert metrics.latency_sum == 0.003
+
+
+def test_as_dict_has_all_counters_and_cumulative_buckets() -> None:
+    """Test the dict contains every known counter and cumulative histogram buckets."""
+    metrics = _metrics.Metrics()
+    metrics.count("bytes_read", amount=10)
+    metrics.count("cache_hits", "doctest")
+    metrics.observe_latency(0.001)
+    metrics.observe_latency(0.02)
+    metrics.observe_latency(60.0)
+
+    result = metrics.as_dict()
+
+    assert set(result["counters"]) == set(_metrics.COUNTERS)
+    assert result["counters"]["bytes_read"] == 10
+    assert result["counters"]["cache_hits"] == {"doctest": 1}
+    assert result["counters"]["subprocesses"] == {}
+    buckets = result["file_latency_seconds"]["buckets"]
+    assert (buckets["0.001"], buckets["0.025"], buckets["10.0"], buckets["+Inf"]) == (1, 2, 2, 3)
+    assert result["file_latency_seconds"]["count"] == 3
+
+
+def test_as_openmetrics() -> None:
+    """Test the OpenMetrics exposition with labels, histogram and EOF marker."""
+    metrics = _metrics.Metrics()
+    metrics.count("subprocesses", 'g"cc')
+    metrics.observe_latency(0.2)
+
+    result = metrics.as_openmetrics().splitlines()
+
+    assert "rstcheck_files_checked_total 0" in result
+    assert 'rstcheck_subprocesses_total{command="g\\"cc"} 1' in result
+    assert 'rstcheck_file_latency_seconds_bucket{le="0.1"} 0' in result
+    assert 'rstcheck_file_latency_seconds_bucket{le="+Inf"} 1' in result
+    assert "rstcheck_file_latency_seconds_count 1" in result
+    assert result[-1] == "# EOF"
+
+
+def test_write_chooses_format_by_suffix(tmp_path: pathlib.Path) -> None:
+    """Test files are written as JSON or OpenMetrics depending on their suffix."""
+    metrics = _metrics.Metrics()
+    metrics.count("files_checked")
+
+    metrics.write(tmp_path / "metrics.json")
+    metrics.write(tmp_path / "metrics.prom")
+
+    assert json.loads((tmp_path / "metrics.json").read_text())["counters"]["files_checked"] == 1
+    assert (tmp_path / "metrics.prom").read_text().endswith("# EOF\n")
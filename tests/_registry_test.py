@@ -0,0 +1,113 @@
+"""Tests for ``_registry`` module."""
+
+from __future__ import annotations
+
+import docutils.parsers.rst.directives
+import docutils.parsers.rst.roles
+import pytest
+from rstcheck_core import _docutils
+
+from rstcheck import _registry
+
+
+def _directive(name: str) -> object:
+    """Get the registered directive."""
+    return docutils.parsers.rst.directives._directives.get(name)  # type: ignore[attr-defined]
+
+
+def _role(name: str) -> object:
+    """Get the registered role."""
+    return docutils.parsers.rst.roles._roles.get(name)  # type: ignore[attr-defined]
+
+
+@pytest.fixture
+def registry(monkeypatch: pytest.MonkeyPatch) -> _registry.Registry:
+    """Fresh registry counting the reloads of the docutils modules."""
+    registry = _registry.Registry()
+    registry.reload_count = 0  # type: ignore[attr-defined]
+    clean_cache = _docutils.clean_docutils_directives_and_roles_cache
+
+    def counting_clean_cache() -> None:
+        registry.reload_count += 1  # type: ignore[attr-defined]
+        clean_cache()
+
+    monkeypatch.setattr(
+        _docutils, "clean_docutils_directives_and_roles_cache", counting_clean_cache
+    )
+    return registry
+
+
+def test_activate_registers_ignores(registry: _registry.Registry) -> None:
+    """Test the directives and roles are ignored after activation."""
+    registry.activate(["custom-directive"], ["custom-role"])
+
+    assert _directive("custom-directive") is _docutils.IgnoredDirective
+    assert _role("custom-role") is _docutils.ignore_role
+    assert _directive("code-block") is _docutils.CodeBlockDirective
+
+
+def test_activate_resets_previous_ignores(registry: _registry.Registry) -> None:
+    """Test ignores of an earlier activation and inline additions are reset."""
+    registry.activate(["custom-directive"], [])
+    registry.register(["custom-directive", "inline-directive"], ["inline-role"])
+
+    registry.activate([], [])
+
+    assert _directive("custom-directive") is None
+    assert _directive("inline-directive") is None
+    assert _role("inline-role") is None
+
+
+def test_activate_reloads_docutils_only_once(registry: _registry.Registry) -> None:
+    """Test docutils is reloaded only for the first activation."""
+    registry.activate(["a"], [])
+    registry.activate(["b"], [])
+    registry.activate(["a"], [])
+
+    assert registry.reload_count == 1  # type: ignore[attr-defined]
+    assert _directive("a") is _docutils.IgnoredDirective
+    assert _directive("b") is None
+
+
+def test_register_only_adds_to_active_ignores(
+    registry: _registry.Registry, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test only additional directives and roles are registered on top of the active ones."""
+    registry.activate(["custom-directive"], ["custom-role"])
+    registered: list[tuple[list[str], list[str]]] = []
+    monkeypatch.setattr(
+        _docutils,
+        "ignore_directives_and_roles",
+        lambda directives, roles: registered.append((directives, roles)),
+    )
+
+    registry.register(["custom-directive", "inline-directive"], ["custom-role"])
+
+    assert registered == [(["inline-directive"], [])]
+
+
+def test_register_without_active_superset_registers_all(registry: _registry.Registry) -> None:
+    """Test everything is registered if the active ignores are not included."""
+    registry.activate(["code-block"], [])
+    assert _directive("code-block") is _docutils.IgnoredDirective
+
+    registry.register(["other"], [])
+
+    assert _directive("code-block") is _docutils.CodeBlockDirective
+    assert _directive("other") is _docutils.IgnoredDirective
+
+
+def test_recorded_additions_are_applied_again(registry: _registry.Registry) -> None:
+    """Test directives and roles added by a function are restored after an activation."""
+    registry.activate([], [])
+
+    additions = _registry.record_additions(
+        lambda: _docutils.ignore_directives_and_roles(["added-directive"], ["added-role"])
+    )
+    registry.activate([], [])
+    assert _directive("added-directive") is None
+    _registry.apply_additions(additions)
+
+    assert _directive("added-directive") is _docutils.IgnoredDirective
+    assert _role("added-role") is _docutils.ignore_role
+    assert additions[0] == {"added-directive": _docutils.IgnoredDirective}
@@ -0,0 +1,489 @@
+"""Tests for ``_runner`` module."""
+
+from __future__ import annotations
+
+import io
+import json
+import logging
+import multiprocessing
+import platform
+import tempfile
+import threading
+import typing as t
+
+import pytest
+from rstcheck_core import config
+
+from rstcheck import _baseline, _headers, _metrics, _runner, _subprocesses, _timings
+from rstcheck.results import LintResults
+from tests.conftest import EXAMPLES_DIR
+
+if t.TYPE_CHECKING:
+    import pathlib
+
+
+def test_check_collects_results_of_all_files() -> None:
+    """Test issues of all files are stored in the result store."""
+    test_files = [EXAMPLES_DIR / "bad" / "rst.rst", EXAMPLES_DIR / "bad" / "python.rst"]
+    main_runner = _runner.RstcheckMainRunner(test_files, config.RstcheckConfig())
+
+    main_runner.check()
+
+    assert isinstance(main_runner.errors, LintResults)
+    assert main_runner.results.source_origins == test_files
+
+
+def test_check_with_cache_dir_keeps_order_and_saves_timings(tmp_path: pathlib.Path) -> None:
+    """Test issues stay in file order with history based scheduling and durations are saved."""
+    test_files = [EXAMPLES_DIR / "bad" / "rst.rst", EXAMPLES_DIR / "bad" / "python.rst"]
+    history = _timings.TimingHistory()
+    history.update(test_files[1], 10.0)
+    history.save(tmp_path)
+    main_runner = _runner.RstcheckMainRunner(
+        test_files, config.RstcheckConfig(), cache_dir=tmp_path
+    )
+
+    main_runner.check()
+
+    assert main_runner.results.source_origins == test_files
+    assert set(_timings.TimingHistory.load(tmp_path).durations) == {
+        str(file.resolve()) for file in test_files
+    }
+
+
+@pytest.mark.parametrize(
+    ("pre_commit", "file_count", "expected"),
+    [(False, 1, False), (False, 2, True), (True, 15, False), (True, 16, True)],
+)
+def test_use_worker_processes(
+    pre_commit: bool,
+    file_count: int,
+    expected: bool,
+    tmp_path: pathlib.Path,
+) -> None:
+    """Test small batches are checked in the current process in pre-commit mode."""
+    test_files = []
+    for index in range(file_count):
+        test_file = tmp_path / f"test_{index}.rst"
+        test_file.write_text("Title\n=====\n")
+        test_files.append(test_file)
+    main_runner = _runner.RstcheckMainRunner(
+        test_files, config.RstcheckConfig(), pre_commit=pre_commit
+    )
+
+    result = main_runner._use_worker_processes()
+
+    assert result is expected
+
+
+def test_use_worker_processes_in_pre_commit_mode_with_fast_history(
+    tmp_path: pathlib.Path,
+) -> None:
+    """Test large batches which are predicted to be fast are checked in the current process."""
+    cache_dir = tmp_path / "cache"
+    history = _timings.TimingHistory()
+    test_files = []
+    for index in range(32):
+        test_file = tmp_path / f"test_{index}.rst"
+        test_file.write_text("Title\n=====\n")
+        history.update(test_file, 0.001)
+        test_files.append(test_file)
+    history.save(cache_dir)
+    main_runner = _runner.RstcheckMainRunner(
+        test_files, config.RstcheckConfig(), cache_dir=cache_dir, pre_commit=True
+    )
+
+    result = main_runner._use_worker_processes()
+
+    assert result is False
+
+
+def test_files_are_discovered_lazily(tmp_path: pathlib.Path) -> None:
+    """Test files in directories are only discovered when needed."""
+    for index in range(3):
+        (tmp_path / f"test_{index}.rst").write_text("Title\n=====\n")
+    main_runner = _runner.RstcheckMainRunner(
+        [tmp_path], config.RstcheckConfig(recursive=True, config_path=tmp_path / "NONE")
+    )
+
+    assert main_runner._files_to_check == []
+    assert main_runner._discover_files(2) == 2
+    assert main_runner.files_to_check == [tmp_path / f"test_{index}.rst" for index in range(3)]
+
+
+def test_exclude_patterns_override_config_file(tmp_path: pathlib.Path) -> None:
+    """Test passed exclude patterns override the ones from the config file."""
+    (tmp_path / ".rstcheck.cfg").write_text("[rstcheck]\nexclude = a.rst\n")
+    for name in ("a.rst", "b.rst"):
+        (tmp_path / name).write_text("Title\n=====\n")
+    rstcheck_config = config.RstcheckConfig(recursive=True, config_path=tmp_path)
+
+    from_config = _runner.RstcheckMainRunner([tmp_path], rstcheck_config, overwrite_config=False)
+    overridden = _runner.RstcheckMainRunner(
+        [tmp_path], rstcheck_config, overwrite_config=False, exclude=["b.rst"]
+    )
+
+    assert from_config.files_to_check == [tmp_path / "b.rst"]
+    assert overridden.files_to_check == [tmp_path / "a.rst"]
+
+
+def test_gitignore_setting_override_config_file(tmp_path: pathlib.Path) -> None:
+    """Test passing whether ``.gitignore`` files are used overrides the config file."""
+    (tmp_path / ".rstcheck.cfg").write_text("[rstcheck]\ngitignore = false\n")
+    (tmp_path / ".gitignore").write_text("a.rst\n")
+    for name in ("a.rst", "b.rst"):
+        (tmp_path / name).write_text("Title\n=====\n")
+    rstcheck_config = config.RstcheckConfig(recursive=True, config_path=tmp_path)
+
+    from_config = _runner.RstcheckMainRunner([tmp_path], rstcheck_config, overwrite_config=False)
+    overridden = _runner.RstcheckMainRunner(
+        [tmp_path], rstcheck_config, overwrite_config=False, use_gitignore=True
+    )
+
+    assert from_config.files_to_check == [tmp_path / "a.rst", tmp_path / "b.rst"]
+    assert overridden.files_to_check == [tmp_path / "b.rst"]
+
+
+@pytest.mark.parametrize("parallel", [True, False])
+def test_duplicate_files_are_checked_once(tmp_path: pathlib.Path, parallel: bool) -> None:
+    """Test issues of identical files are reported for every file but checked once."""
+    source = "Title\n===\n"
+    test_files = [tmp_path / "a.rst", tmp_path / "b.rst", tmp_path / "v2" / "a.rst"]
+    (tmp_path / "v2").mkdir()
+    for test_file in test_files:
+        test_file.write_text(source)
+    main_runner = _runner.RstcheckMainRunner(
+        test_files, config.RstcheckConfig(config_path=tmp_path / "NONE")
+    )
+    if not parallel:
+        main_runner._use_worker_processes = lambda: False  # type: ignore[method-assign]
+    output = io.StringIO()
+
+    main_runner.check()
+    main_runner.print_result(output)
+
+    assert main_runner.duplicate_count == 2
+    assert output.getvalue().splitlines() == [
+        f"{test_file}:2: (INFO/1) Possible title underline, too short for the title."
+        for test_file in test_files
+    ] + ["Skipped 2 check(s) of files identical to a checked file.", "Error! Issues detected."]
+
+
+@pytest.mark.parametrize("parallel", [True, False])
+def test_check_collects_metrics(tmp_path: pathlib.Path, parallel: bool) -> None:
+    """Test metrics of the current and the worker processes are collected."""
+    source = "Title\n=====\n\n.. code-block:: python\n\n    print()\n"
+    test_files = [tmp_path / "a.rst", tmp_path / "b.rst", tmp_path / "c.rst"]
+    for test_file in test_files[:2]:
+        test_file.write_text(source)
+    test_files[2].write_text("Text\n")
+    metrics = _metrics.Metrics()
+    main_runner = _runner.RstcheckMainRunner(
+        test_files, config.RstcheckConfig(config_path=tmp_path / "NONE"), metrics=metrics
+    )
+    if not parallel:
+        main_runner._use_worker_processes = lambda: False  # type: ignore[method-assign]
+
+    main_runner.check()
+
+    counters = metrics.as_dict()["counters"]
+    assert counters["files_checked"] == 2
+    assert counters["bytes_read"] == len(source) + len("Text\n")
+    assert counters["code_blocks"] == {"python": 1}
+    assert counters["cache_hits"]["duplicate_files"] == 1
+    assert counters["cache_misses"]["duplicate_files"] == 2
+    assert metrics.as_dict()["file_latency_seconds"]["count"] == 2
+    assert _metrics.current is None
+
+
+def test_parallel_check_without_c_code_blocks_creates_no_header_directory(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test the directory of precompiled headers is only created once a header is built."""
+    temporary_dir = tmp_path / "tmp"
+    temporary_dir.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(temporary_dir))
+    monkeypatch.setattr(_headers, "cache", None)
+    test_files = [tmp_path / "a.rst", tmp_path / "b.rst"]
+    for test_file in test_files:
+        test_file.write_text(f"{test_file.stem}\n=\n\n.. code-block:: python\n\n    print()\n")
+    main_runner = _runner.RstcheckMainRunner(
+        test_files, config.RstcheckConfig(config_path=tmp_path / "NONE")
+    )
+    main_runner._pool_size = 2
+
+    main_runner.check()
+
+    assert list(main_runner.results) == []
+    assert list(temporary_dir.glob("rstcheck-headers-*")) == []
+
+
+@pytest.mark.skipif(platform.system() != "Linux", reason="Depends on POSIX shell scripts.")
+def test_max_subprocesses_applies_across_workers(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test external tools of different worker processes do not run at the same time."""
+    compiler = tmp_path / "cc"
+    compiler.write_text(
+        "#!/bin/sh\n"
+        "for source; do :; done\n"
+        f'mkdir "{tmp_path}/running" || {{ echo "$source:1:1: error: overlap" >&2; exit 1; }}\n'
+        "sleep 0.3\n"
+        f'rmdir "{tmp_path}/running"\n'
+    )
+    compiler.chmod(0o755)
+    monkeypatch.setenv("CC", str(compiler))
+    test_files = [tmp_path / f"{name}.rst" for name in "abcd"]
+    for index, test_file in enumerate(test_files):
+        test_file.write_text(f"Example\n=======\n\n.. code-block:: c\n\n    int x{index};\n")
+    main_runner = _runner.RstcheckMainRunner(
+        test_files,
+        config.RstcheckConfig(config_path=tmp_path / "NONE"),
+        subprocess_limits=_subprocesses.SubprocessLimits(max_concurrent=1),
+    )
+    main_runner._pool_size = 2
+
+    main_runner.check()
+
+    assert list(main_runner.results) == []
+
+
+def test_files_with_includes_are_only_duplicates_in_same_directory(tmp_path: pathlib.Path) -> None:
+    """Test files including other files are not deduplicated across directories."""
+    source = ".. include:: part.rst\n"
+    test_files = [tmp_path / "a.rst", tmp_path / "b.rst", tmp_path / "v2" / "a.rst"]
+    (tmp_path / "v2").mkdir()
+    for test_file in test_files:
+        test_file.write_text(source)
+        (test_file.parent / "part.rst").write_text("Text\n")
+    main_runner = _runner.RstcheckMainRunner(
+        test_files, config.RstcheckConfig(config_path=tmp_path / "NONE")
+    )
+
+    main_runner.check()
+
+    assert main_runner.duplicate_count == 1
+
+
+def test_print_result_prints_issues() -> None:
+    """Test issues are printed with location and error code."""
+    test_file = EXAMPLES_DIR / "bad" / "python.rst"
+    main_runner = _runner.RstcheckMainRunner([test_file], config.RstcheckConfig())
+    main_runner.check()
+    output = io.StringIO()
+
+    result = main_runner.print_result(output)
+
+    assert result == 1
+    assert output.getvalue().splitlines() == [
+        f"{test_file}:7: (ERROR/3) (python) '(' was never closed",
+        "Error! Issues detected.",
+    ]
+
+
+def test_print_result_on_success() -> None:
+    """Test success message is printed without issues."""
+    test_file = EXAMPLES_DIR / "good" / "rst.rst"
+    main_runner = _runner.RstcheckMainRunner([test_file], config.RstcheckConfig())
+    main_runner.check()
+    output = io.StringIO()
+
+    result = main_runner.print_result(output)
+
+    assert result == 0
+    assert output.getvalue() == "Success! No issues detected.\n"
+
+
+@pytest.mark.parametrize(("value", "expected"), [("1/1", (1, 1)), ("2/3", (2, 3))])
+def test_parse_shard(value: str, expected: tuple[int, int]) -> None:
+    """Test shards are parsed as index and total."""
+    result = _runner.parse_shard(value)
+
+    assert result == expected
+
+
+@pytest.mark.parametrize("value", ["0/3", "4/3", "1", "a/b", "1/0"])
+def test_parse_shard_with_invalid_value(value: str) -> None:
+    """Test invalid shards raise an error."""
+    with pytest.raises(ValueError, match="Invalid shard"):
+        _runner.parse_shard(value)
+
+
+def test_shards_check_every_file_once() -> None:
+    """Test the shards partition the files deterministically by size."""
+    rstcheck_config = config.RstcheckConfig(recursive=True)
+    all_files = _runner.RstcheckMainRunner([EXAMPLES_DIR], rstcheck_config).files_to_check
+
+    shards = [
+        _runner.RstcheckMainRunner([EXAMPLES_DIR], rstcheck_config, shard=(index, 3))
+        for index in (1, 2, 3)
+    ]
+
+    assert sorted(file for shard in shards for file in shard.files_to_check) == sorted(all_files)
+    for shard in shards:
+        assert shard.shard_indices is not None
+        assert shard.files_to_check == [all_files[index] for index in shard.shard_indices]
+    sizes = [sum(file.stat().st_size for file in shard.files_to_check) for shard in shards]
+    assert max(sizes) - min(sizes) <= max(file.stat().st_size for file in all_files)
+
+
+def test_merge_results_of_shards_equals_unsharded_run(tmp_path: pathlib.Path) -> None:
+    """Test merged shard results are in the order of an unsharded run."""
+    test_files = sorted((EXAMPLES_DIR / "bad").glob("*.rst"))
+    rstcheck_config = config.RstcheckConfig(config_path=tmp_path / "NONE")
+    main_runner = _runner.RstcheckMainRunner(test_files, rstcheck_config)
+    main_runner.check()
+    results_files = []
+    for index in (2, 1):
+        shard_runner = _runner.RstcheckMainRunner(test_files, rstcheck_config, shard=(index, 2))
+        shard_runner.check()
+        results_files.append(tmp_path / f"shard{index}.json")
+        shard_runner.write_results(results_files[-1])
+
+    result = _runner.merge_results(results_files)
+
+    assert [
+        (str(error["source_origin"]), error["line_number"], error["message"])
+        for error in main_runner.results
+    ] == [
+        (error["source_origin"], error["line_number"], error["message"]) for error in result.results
+    ]
+    assert result.nonexisting_paths == []
+
+
+def test_merge_results_with_missing_shard(tmp_path: pathlib.Path) -> None:
+    """Test merging fails if not all shards are given."""
+    test_file = EXAMPLES_DIR / "good" / "rst.rst"
+    main_runner = _runner.RstcheckMainRunner([test_file], config.RstcheckConfig(), shard=(2, 3))
+    main_runner.check()
+    main_runner.write_results(tmp_path / "shard2.json")
+
+    with pytest.raises(ValueError, match="Expected the results of shards 1/3 to 3/3, got: 2/3"):
+        _runner.merge_results([tmp_path / "shard2.json"])
+
+
+def _write_shard_results(tmp_path: pathlib.Path) -> list[pathlib.Path]:
+    """Check the bad example files in two shards and write their results files."""
+    test_files = sorted((EXAMPLES_DIR / "bad").glob("*.rst"))
+    rstcheck_config = config.RstcheckConfig(config_path=tmp_path / "NONE")
+    results_files = []
+    for index in (1, 2):
+        shard_runner = _runner.RstcheckMainRunner(test_files, rstcheck_config, shard=(index, 2))
+        shard_runner.check()
+        results_files.append(tmp_path / f"shard{index}.json")
+        shard_runner.write_results(results_files[-1])
+    return results_files
+
+
+def test_merge_results_with_differently_partitioned_shards(tmp_path: pathlib.Path) -> None:
+    """Test merging fails if the shards discovered other files or predicted other costs."""
+    results_files = _write_shard_results(tmp_path)
+    content = json.loads(results_files[1].read_text())
+    content["partition"]["digest"] = "0" * 64
+    results_files[1].write_text(json.dumps(content))
+
+    with pytest.raises(ValueError, match="partitioned differently"):
+        _runner.merge_results(results_files)
+
+
+@pytest.mark.parametrize("change", ["overlap", "missing"])
+def test_merge_results_with_files_not_covered_once(tmp_path: pathlib.Path, change: str) -> None:
+    """Test merging fails if the files of the shards overlap or miss a file."""
+    results_files = _write_shard_results(tmp_path)
+    contents = [json.loads(results_file.read_text()) for results_file in results_files]
+    if change == "overlap":
+        contents[1]["files"].append(contents[0]["files"][0])
+    else:
+        del contents[1]["files"][0]
+    results_files[1].write_text(json.dumps(contents[1]))
+
+    with pytest.raises(ValueError, match="do not cover each of the"):
+        _runner.merge_results(results_files)
+
+
+def test_merge_results_with_invalid_file(tmp_path: pathlib.Path) -> None:
+    """Test merging fails for files which are no results files."""
+    (tmp_path / "results.json").write_text("[]")
+
+    with pytest.raises(ValueError, match="Not a rstcheck results file"):
+        _runner.merge_results([tmp_path / "results.json"])
+
+
+@pytest.mark.parametrize(
+    ("system", "thread_count", "expected"),
+    [("Linux", 1, "fork"), ("Linux", 2, "forkserver"), ("Windows", 1, None)],
+)
+def test_default_start_method(
+    system: str, thread_count: int, expected: str | None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test workers are only forked from the current process if it is single-threaded."""
+    monkeypatch.setattr(platform, "system", lambda: system)
+    monkeypatch.setattr(threading, "active_count", lambda: thread_count)
+
+    result = _runner.default_start_method()
+
+    assert result == expected
+
+
+@pytest.mark.skipif(
+    "forkserver" not in multiprocessing.get_all_start_methods(), reason="Needs forkserver."
+)
+def test_check_with_forkserver() -> None:
+    """Test workers started by a preloaded fork server check with the passed config."""
+    test_files = [EXAMPLES_DIR / "bad" / "rst.rst", EXAMPLES_DIR / "bad" / "python.rst"]
+    main_runner = _runner.RstcheckMainRunner(
+        test_files, config.RstcheckConfig(ignore_languages=["python"])
+    )
+    main_runner.start_method = "forkserver"
+    main_runner._pool_size = 2
+
+    main_runner.check()
+
+    assert main_runner.results.source_origins == [test_files[0]]
+
+
+def test_print_result_with_baseline(tmp_path: pathlib.Path) -> None:
+    """Test issues accepted by a baseline are not printed but counted."""
+    test_file = EXAMPLES_DIR / "bad" / "python.rst"
+    main_runner = _runner.RstcheckMainRunner([test_file], config.RstcheckConfig())
+    main_runner.check()
+    baseline = _baseline.Baseline.from_results(main_runner.results, tmp_path)
+    main_runner = _runner.RstcheckMainRunner(
+        [test_file], config.RstcheckConfig(), baseline=baseline
+    )
+    main_runner.check()
+    output = io.StringIO()
+
+    result = main_runner.print_result(output)
+
+    assert result == 0
+    assert main_runner.baseline_count == 1
+    assert output.getvalue().splitlines() == [
+        "Suppressed 1 issue(s) accepted by the baseline.",
+        "Success! No issues detected.",
+    ]
+
+
+def test_log_records_of_workers_are_grouped_per_file(
+    tmp_path: pathlib.Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test the log records of worker processes are handled in order of the file list."""
+    caplog.set_level(logging.INFO)
+    test_files = [tmp_path / f"test_{index}.rst" for index in range(4)]
+    for index, test_file in enumerate(test_files):
+        test_file.write_text(f"Title {index}\n=======\n")
+    main_runner = _runner.RstcheckMainRunner(
+        test_files, config.RstcheckConfig(config_path=tmp_path / "NONE")
+    )
+    main_runner.start_method = "forkserver"
+
+    main_runner.check()
+
+    result = [
+        record.getMessage() for record in caplog.records if record.name == "rstcheck._checker"
+    ]
+    assert result == [
+        message
+        for test_file in test_files
+        for message in (f"Check file '{test_file}'", f"Check source from '{test_file}'")
+    ]
@@ -0,0 +1,159 @@
+"""Tests for ``_subprocesses`` module."""
+
+from __future__ import annotations
+
+import signal
+import sys
+import time
+import typing as t
+
+import pytest
+
+from rstcheck import _subprocesses
+
+if t.TYPE_CHECKING:
+    import pathlib
+
+posix_only = pytest.mark.skipif(sys.platform == "win32", reason="Depends on POSIX processes.")
+
+
+def test_from_options_defaults() -> None:
+    """Test the default limits are used without options."""
+    result = _subprocesses.SubprocessLimits.from_options()
+
+    assert result.timeout("cpp") == _subprocesses.DEFAULT_TIMEOUT
+    assert result.memory_limit is None
+    assert result.max_concurrent is None
+
+
+def test_from_options_with_language_timeouts() -> None:
+    """Test timeouts are set per language and 0 disables a timeout or the memory limit."""
+    result = _subprocesses.SubprocessLimits.from_options("10, cpp=120,bash=0", 0, 2)
+
+    assert (result.timeout("c"), result.timeout("cpp"), result.timeout("bash")) == (10, 120, None)
+    assert result.memory_limit is None
+    assert result.max_concurrent == 2
+
+
+def test_from_options_with_invalid_timeout() -> None:
+    """Test invalid timeouts raise an error."""
+    with pytest.raises(ValueError, match="Invalid timeout: 'cpp=long'"):
+        _subprocesses.SubprocessLimits.from_options("cpp=long")
+
+
+@posix_only
+@pytest.mark.parametrize(
+    ("returncode", "output", "expected"),
+    [
+        (-signal.SIGXCPU, "", "Check aborted: CPU time limit of 3 seconds exceeded"),
+        (-signal.SIGKILL, "", "Check aborted: killed by signal SIGKILL"),
+        (1, "cc1plus: out of memory allocating 8 bytes", "Check aborted: memory limit of 64 MiB"),
+    ],
+)
+def test_check_result_raises_for_exceeded_limits(
+    returncode: int, output: str, expected: str
+) -> None:
+    """Test tools stopped by a signal or out of memory are reported."""
+    limits = _subprocesses.SubprocessLimits(default_timeout=2, memory_limit=64)
+
+    with pytest.raises(_subprocesses.LimitExceededError, match=expected):
+        limits.check_result("c", returncode, output)
+
+
+@posix_only
+@pytest.mark.parametrize(
+    ("returncode", "limits"),
+    [
+        (-signal.SIGSEGV, _subprocesses.SubprocessLimits(default_timeout=2, memory_limit=64)),
+        (-signal.SIGINT, _subprocesses.SubprocessLimits(default_timeout=2, memory_limit=64)),
+        (-signal.SIGKILL, _subprocesses.SubprocessLimits(default_timeout=None)),
+    ],
+    ids=["crash", "interrupt", "kill-without-limits"],
+)
+def test_check_result_accepts_other_signals(
+    returncode: int, limits: _subprocesses.SubprocessLimits
+) -> None:
+    """Test tools stopped by a signal not sent by a limit are handled like other failures."""
+    limits.check_result("c", returncode, "")  # act
+
+
+@pytest.mark.parametrize(
+    "output",
+    [
+        "file.c:1:1: error: expected ';'",
+        (
+            "file.cpp:8:41: error: expected ';' before '}' token\n"
+            "    8 |     catch (std::bad_alloc& e) { return 1 }\n"
+        ),
+        "file.cpp:3:5: error: cannot allocate an object of abstract type 'Shape'",
+    ],
+    ids=["error", "quoted-source", "abstract-type"],
+)
+def test_check_result_accepts_failed_checks(output: str) -> None:
+    """Test tools reporting issues in the code do not exceed a limit."""
+    limits = _subprocesses.SubprocessLimits()
+
+    limits.check_result("cpp", 1, output)  # act
+
+
+@posix_only
+def test_run_kills_timed_out_tool_with_its_children(tmp_path: pathlib.Path) -> None:
+    """Test a timed out tool and the processes it started are killed."""
+    script = tmp_path / "tool.sh"
+    script.write_text("sleep 30 & sleep 30\n")
+    start = time.perf_counter()
+
+    with (
+        _subprocesses.configured(_subprocesses.SubprocessLimits({"bash": 0.5})),
+        pytest.raises(_subprocesses.LimitExceededError, match=r"timed out after 0\.5 seconds"),
+    ):
+        _subprocesses.run(["sh", str(script)], language="bash", cwd=tmp_path)
+
+    assert time.perf_counter() - start < 10
+
+
+@posix_only
+def test_run_limits_memory(tmp_path: pathlib.Path) -> None:
+    """Test a tool exceeding the memory limit is reported."""
+    arguments = [sys.executable, "-c", "bytearray(1024 * 1024 * 1024)"]
+
+    with (
+        _subprocesses.configured(_subprocesses.SubprocessLimits(memory_limit=512)),
+        pytest.raises(_subprocesses.LimitExceededError, match="memory limit of 512 MiB exceeded"),
+    ):
+        _subprocesses.run(arguments, language="python", cwd=tmp_path)
+
+
+def test_run_returns_output_of_failed_tool(tmp_path: pathlib.Path) -> None:
+    """Test the return code and error output of a tool are returned."""
+    arguments = [sys.executable, "-c", "import sys; sys.exit('error')"]
+
+    result = _subprocesses.run(arguments, language="python", cwd=tmp_path)
+
+    assert result[0] == 1
+    assert result[1].strip() == b"error"
+
+
+@posix_only
+def test_run_sets_resource_limits_of_tool(tmp_path: pathlib.Path) -> None:
+    """Test the tool itself runs with the soft and hard limits."""
+    script = (
+        "import resource, sys; "
+        "sys.exit(repr([resource.getrlimit(resource.RLIMIT_AS), "
+        "resource.getrlimit(resource.RLIMIT_CPU)]))"
+    )
+    limits = _subprocesses.SubprocessLimits(default_timeout=2, memory_limit=512)
+
+    with _subprocesses.configured(limits):
+        result = _subprocesses.run([sys.executable, "-c", script], language="c", cwd=tmp_path)
+
+    assert result[1].decode().strip() == repr([(512 * 1024 * 1024,) * 2, (3, 4)])
+
+
+def test_command_without_limits_is_unchanged() -> None:
+    """Test tools are started directly without limits to set."""
+    limits = _subprocesses.SubprocessLimits(default_timeout=None, memory_limit=None)
+
+    result = limits.command(["gcc", "file.c"], "c")
+
+    assert result == ["gcc", "file.c"]
@@ -0,0 +1,134 @@
+"""Tests for ``_syntax`` module."""
+
+from __future__ import annotations
+
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+import yaml
+
+from rstcheck import _syntax
+
+JSON_SOURCES = [
+    '{"a": [1, 2.5, null]}',
+    '{"a": 1,}',
+    "[1, 2",
+    '{"a": NaN}',
+    "",
+    '"\\ud800"',
+    '"\ud800"',
+    '{"a": 1} 2',
+    '"\x01"',
+    '{"a": [{"b": "\\u00e9"}, -1e5, true]}',
+]
+XML_SOURCES = [
+    "<a><b/></a>",
+    "",
+    "<a>\n<b>\n</a>",
+    "<a/><b/>",
+    "<x:a/>",
+    "<a>&foo;</a>",
+    '<!DOCTYPE a SYSTEM "a.dtd">\n<a>\n  &foo;</a>',
+    "<a b='1' b='2'/>",
+]
+YAML_SOURCES = [
+    "a: [1, 2]\nb: &x {c: d}\ne: *x\n",
+    "",
+    "a: 1\nb: [1, 2\n",
+    "a: *x\n",
+    "a: &x 1\nb: &x 2\n",
+    "a: 1\n---\nb: 2\n",
+    "a: !foo bar\nb: [\n",
+    "a: !foo bar\nb: !!str 1\nc: ! 2\n",
+    "a: b: c\n",
+    "key: value\n\tbad: tab\n",
+    "a: &x 1\nb:\n  <<: *x\n",
+    "<<: 1\n",
+    "a: &x {k: 1}\n<<: [*x, 2]\n",
+    "a: &x [1]\n<<: *x\n",
+    "a: &x {k: 1}\nb: &y [*x, {l: 2}]\nc:\n  <<: *y\n  <<: *x\n",
+    "a: &x {k: 1}\nb:\n  <<: *x\n  !!merge <<: [{l: 2}]\n  '<<': 1\n",
+    "? [a, b]\n: 1\n",
+    "a:\n  {c: d}: 1\n",
+    "a: &x [1]\nb: {*x : 1}\n",
+    "? !!set {a}\n: 1\n",
+    "[{a: b}, {c: [d, e]}]\n",
+]
+
+
+def _json_error(source_code: str) -> str | None:
+    """Get the error of the JSON checker of ``rstcheck-core``."""
+    try:
+        json.loads(source_code)
+    except ValueError as exception:
+        return f"{exception}"
+    return None
+
+
+def _xml_error(source_code: str) -> str | None:
+    """Get the error of the XML checker of ``rstcheck-core``."""
+    try:
+        ET.fromstring(source_code)  # noqa: S314
+    except ET.ParseError as exception:
+        return f"{exception}"
+    return None
+
+
+def _yaml_error(source_code: str) -> str | None:
+    """Get the error of the YAML checker of ``rstcheck-core``."""
+    try:
+        yaml.safe_load(source_code)
+    except yaml.YAMLError as exception:
+        return f"{exception}"
+    return None
+
+
+@pytest.mark.parametrize("with_ijson", [True, False])
+@pytest.mark.parametrize("source_code", JSON_SOURCES)
+def test_validate_json_matches_loading(
+    source_code: str, with_ijson: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test the error is the same as when loading the JSON source with and without ijson."""
+    if with_ijson and not _syntax.ijson_imported:
+        pytest.skip("Depends on the C backend of ijson.")
+    monkeypatch.setattr(_syntax, "ijson_imported", with_ijson)
+
+    result = _syntax.validate_json(source_code)
+
+    assert result == _json_error(source_code)
+
+
+@pytest.mark.parametrize("source_code", XML_SOURCES)
+def test_validate_xml_matches_element_tree(source_code: str) -> None:
+    """Test the error is the same as when building an element tree."""
+    result = _syntax.validate_xml(source_code)
+
+    assert result == _xml_error(source_code)
+
+
+@pytest.mark.parametrize("with_libyaml", [True, False])
+@pytest.mark.parametrize("source_code", YAML_SOURCES)
+def test_validate_yaml_matches_safe_load(
+    source_code: str,
+    with_libyaml: bool,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test the error is the same as when loading the YAML source with and without libyaml."""
+    if with_libyaml and not yaml.__with_libyaml__:
+        pytest.skip("Depends on libyaml.")
+    monkeypatch.setattr(yaml, "__with_libyaml__", with_libyaml)
+
+    result = _syntax.validate_yaml(source_code)
+
+    assert result == _yaml_error(source_code)
+
+
+def test_validate_yaml_does_not_construct_values() -> None:
+    """Test invalid values of known tags are not reported."""
+    source_code = 'a: !!binary "\u00e9"\n'
+
+    result = _syntax.validate_yaml(source_code)
+
+    assert result is None
+    assert _yaml_error(source_code) is not None
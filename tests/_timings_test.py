@@ -0,0 +1,130 @@
+"""Tests for ``_timings`` module."""
+
+from __future__ import annotations
+
+import pathlib
+
+from rstcheck import _timings
+
+
+class TestTimingHistory:
+    """Test ``TimingHistory`` class."""
+
+    @staticmethod
+    def test_load_without_history_file(tmp_path: pathlib.Path) -> None:
+        """Test missing history file results in empty history."""
+        result = _timings.TimingHistory.load(tmp_path)
+
+        assert result.durations == {}
+
+    @staticmethod
+    def test_load_corrupt_history_file(tmp_path: pathlib.Path) -> None:
+        """Test corrupt history file results in empty history."""
+        (tmp_path / _timings.TIMINGS_FILE_NAME).write_text("{not json")
+
+        result = _timings.TimingHistory.load(tmp_path)
+
+        assert result.durations == {}
+
+    @staticmethod
+    def test_save_and_load_roundtrip(tmp_path: pathlib.Path) -> None:
+        """Test saved durations are loaded again."""
+        cache_dir = tmp_path / "cache"
+        test_file = tmp_path / "test.rst"
+        history = _timings.TimingHistory()
+        history.update(test_file, 0.5)
+
+        history.save(cache_dir)
+        result = _timings.TimingHistory.load(cache_dir)
+
+        assert result.durations == {str(test_file.resolve()): 0.5}
+        assert [path.name for path in cache_dir.iterdir()] == [_timings.TIMINGS_FILE_NAME]
+
+    @staticmethod
+    def test_update_ignores_stdin() -> None:
+        """Test no duration is stored for stdin."""
+        history = _timings.TimingHistory()
+
+        history.update(pathlib.Path("-"), 1.0)
+
+        assert history.durations == {}
+
+    @staticmethod
+    def test_predict_unknown_files_by_size(tmp_path: pathlib.Path) -> None:
+        """Test files without history are estimated by the duration per byte of known files."""
+        known_file = tmp_path / "known.rst"
+        known_file.write_text("a" * 100)
+        unknown_file = tmp_path / "unknown.rst"
+        unknown_file.write_text("a" * 300)
+        history = _timings.TimingHistory()
+        history.update(known_file, 1.0)
+
+        result = history.predict([known_file, unknown_file])
+
+        assert result == [1.0, 3.0]
+
+
+class TestPackChunks:
+    """Test ``pack_chunks`` function."""
+
+    @staticmethod
+    def test_costly_items_start_first() -> None:
+        """Test the chunk with the most costly item is first."""
+        result = _timings.pack_chunks([1.0, 5.0, 2.0], 3)
+
+        assert result == [[1], [2], [0]]
+
+    @staticmethod
+    def test_chunks_are_balanced() -> None:
+        """Test items are packed into chunks of equal cost."""
+        costs = [4.0, 3.0, 3.0, 2.0, 2.0, 2.0]
+
+        result = _timings.pack_chunks(costs, 2)
+
+        assert sorted(sum(costs[index] for index in chunk) for chunk in result) == [8.0, 8.0]
+
+    @staticmethod
+    def test_empty_chunks_are_dropped() -> None:
+        """Test no empty chunks are returned with fewer items than chunks."""
+        result = _timings.pack_chunks([1.0, 2.0], 8)
+
+        assert result == [[1], [0]]
+
+    @staticmethod
+    def test_no_items() -> None:
+        """Test no chunks without items."""
+        result = _timings.pack_chunks([], 4)
+
+        assert result == []
+
+
+class TestPartition:
+    """Test ``partition`` function."""
+
+    @staticmethod
+    def test_parts_are_balanced() -> None:
+        """Test items are assigned to parts of equal cost."""
+        costs = [4.0, 3.0, 3.0, 2.0, 2.0, 2.0]
+
+        result = _timings.partition(costs, 2)
+
+        assert [
+            sum(cost for cost, part in zip(costs, result, strict=True) if part == p) for p in (0, 1)
+        ] == [
+            8.0,
+            8.0,
+        ]
+
+    @staticmethod
+    def test_equal_costs_are_assigned_round_robin() -> None:
+        """Test ties are broken by index, so the assignment is deterministic."""
+        result = _timings.partition([1.0] * 5, 3)
+
+        assert result == [0, 1, 2, 0, 1]
+
+    @staticmethod
+    def test_more_parts_than_items() -> None:
+        """Test parts may stay empty."""
+        result = _timings.partition([1.0, 2.0], 4)
+
+        assert result == [1, 0]
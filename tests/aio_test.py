@@ -0,0 +1,141 @@
+"""Tests for ``aio`` module."""
+
+from __future__ import annotations
+
+import asyncio
+import shutil
+import sys
+import typing as t
+
+import pytest
+from rstcheck_core import config
+
+from rstcheck import _headers, _subprocesses, aio
+from tests.conftest import EXAMPLES_DIR
+
+if t.TYPE_CHECKING:
+    import pathlib
+
+
+def test_check_source_without_issues() -> None:
+    """Test good source has no issues."""
+    source = (EXAMPLES_DIR / "good" / "rst.rst").read_text("utf-8")
+
+    result = asyncio.run(aio.check_source(source))
+
+    assert len(result) == 0
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="Depends on bash.")
+def test_check_source_runs_external_checks() -> None:
+    """Test external code block checks are run."""
+    source = """
+Example
+=======
+
+.. code-block:: bash
+
+    if [
+"""
+
+    result = asyncio.run(aio.check_source(source, max_subprocesses=1))
+
+    assert len(result) == 1
+    assert result[0]["message"].startswith("(bash)")
+    assert result[0]["line_number"] == 7
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Depends on POSIX shell scripts.")
+def test_check_source_reports_timed_out_external_checks(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test timed out external tools are killed and reported."""
+    compiler = tmp_path / "cc"
+    compiler.write_text("#!/bin/sh\nsleep 30\n")
+    compiler.chmod(0o755)
+    monkeypatch.setenv("CC", str(compiler))
+    source = "Example\n=======\n\n.. code-block:: c\n\n    int x;\n"
+
+    with _subprocesses.configured(_subprocesses.SubprocessLimits({"c": 0.5})):
+        result = asyncio.run(aio.check_source(source))
+
+    assert [error["message"] for error in result] == [
+        "(c) Check aborted: timed out after 0.5 seconds"
+    ]
+    assert result[0]["line_number"] == 6
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Depends on POSIX shell scripts.")
+def test_check_source_builds_precompiled_headers_within_subprocess_cap(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test compiler runs building precompiled headers count against ``max_subprocesses``."""
+    compiler = tmp_path / "cc"
+    compiler.write_text(
+        f"#!/bin/sh\nif mkdir {tmp_path}/running 2>/dev/null; then\n"
+        f"  sleep 0.2\n  rmdir {tmp_path}/running\nelse\n  touch {tmp_path}/overlap\nfi\n"
+    )
+    compiler.chmod(0o755)
+    monkeypatch.setenv("CC", str(compiler))
+    headers_dir = tmp_path / "headers"
+    headers_dir.mkdir()
+    monkeypatch.setattr(_headers, "cache", _headers.PrecompiledHeaders(headers_dir, min_uses=1))
+    source = "Example\n=======\n" + "".join(
+        f"\n.. code-block:: c\n\n    #include <{header}>\n\n    int x;\n"
+        for header in ("stdio.h", "stdlib.h", "string.h")
+    )
+
+    result = asyncio.run(aio.check_source(source, max_subprocesses=1))
+
+    assert list(result) == []
+    assert not (tmp_path / "overlap").exists()
+
+
+def test_check_source_filters_ignored_messages() -> None:
+    """Test ignored messages are filtered from code block issues."""
+    source = (EXAMPLES_DIR / "bad" / "python.rst").read_text("utf-8")
+    rstcheck_config = config.RstcheckConfig(ignore_messages="never closed")
+
+    result = asyncio.run(aio.check_source(source, rstcheck_config))
+
+    assert len(result) == 0
+
+
+def test_check_paths_recursively() -> None:
+    """Test all bad examples have issues."""
+    rstcheck_config = config.RstcheckConfig(recursive=True)
+
+    result = asyncio.run(
+        aio.check_paths([EXAMPLES_DIR / "bad"], rstcheck_config, max_concurrency=2)
+    )
+
+    assert {error["source_origin"].name for error in result} == {  # type: ignore[union-attr]
+        path.name for path in (EXAMPLES_DIR / "bad").glob("*.rst")
+    }
+
+
+def test_check_paths_can_be_cancelled() -> None:
+    """Test cancelling a check raises ``CancelledError``."""
+
+    async def run() -> None:
+        task = asyncio.create_task(aio.check_paths([EXAMPLES_DIR / "bad" / "cpp.rst"]))
+        await asyncio.sleep(0)
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(run())
+
+
+def test_check_paths_checks_nested_rst_with_registry_of_its_file(tmp_path: pathlib.Path) -> None:
+    """Test nested rst is not parsed with the ignored directives of a concurrently checked file."""
+    nested = tmp_path / "a.rst"
+    nested.write_text("Title\n=====\n\n.. code-block:: rst\n\n    .. foo::\n")
+    ignoring = tmp_path / "b.rst"
+    ignoring.write_text(".. rstcheck: ignore-directives=foo\n\n.. foo::\n")
+    rstcheck_config = config.RstcheckConfig(config_path=tmp_path / "NONE")
+
+    result = asyncio.run(aio.check_paths([nested, ignoring], rstcheck_config, max_concurrency=4))
+
+    assert {(error["source_origin"], error["line_number"]) for error in result} == {(nested, 6)}
+    assert any('Unknown directive type "foo"' in error["message"] for error in result)
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import inspect
+import json
 import pathlib
 import re
 import sys
@@ -12,6 +13,7 @@ import typer
 import typer.testing
 from rstcheck_core import _extras
 
+from rstcheck import _cli
 from tests.conftest import EXAMPLES_DIR, TESTING_DIR
 from tests.integration_tests.conftest import ERROR_CODE_REGEX
 
@@ -624,3 +626,84 @@ class TestInlineFlowControlComments:
 
         assert result.exit_code != 0
         assert len(re.findall(r"'\(' was never closed", result.output)) == 1
+
+
+def test_metrics_file(
+    cli_app: typer.Typer, cli_runner: typer.testing.CliRunner, tmp_path: pathlib.Path
+) -> None:
+    """Test metrics are written into the metrics file."""
+    test_file = EXAMPLES_DIR / "good" / "rst.rst"
+    metrics_file = tmp_path / "metrics.json"
+
+    result = cli_runner.invoke(cli_app, [str(test_file), "--metrics-file", str(metrics_file)])
+
+    assert result.exit_code == 0
+    metrics = json.loads(metrics_file.read_text())
+    assert metrics["counters"]["files_checked"] == 1
+    assert metrics["file_latency_seconds"]["count"] == 1
+
+
+def test_shards_are_merged(
+    cli_app: typer.Typer, cli_runner: typer.testing.CliRunner, tmp_path: pathlib.Path
+) -> None:
+    """Test the merged results of shards are reported like an unsharded run."""
+    test_dir = EXAMPLES_DIR / "bad"
+    full_result = cli_runner.invoke(cli_app, [str(test_dir), "--recursive"])
+    for index in (1, 2):
+        results_file = tmp_path / f"shard{index}.json"
+        cli_runner.invoke(
+            cli_app,
+            [str(test_dir), "-r", "--shard", f"{index}/2", "--results-file", str(results_file)],
+        )
+
+    result = cli_runner.invoke(
+        _cli.merge_app, [str(tmp_path / "shard1.json"), str(tmp_path / "shard2.json")]
+    )
+
+    assert result.exit_code == 1
+    assert result.output == full_result.output
+
+
+def test_baseline(
+    cli_app: typer.Typer, cli_runner: typer.testing.CliRunner, tmp_path: pathlib.Path
+) -> None:
+    """Test issues written to a baseline are suppressed but new issues are reported."""
+    test_file = tmp_path / "doc.rst"
+    test_file.write_text("Title\n=====\n\n.. foo::\n")
+    baseline_file = tmp_path / "baseline.json"
+    write_result = cli_runner.invoke(
+        cli_app, [str(test_file), "--baseline", str(baseline_file), "--write-baseline"]
+    )
+    test_file.write_text("Intro\n\nTitle\n=====\n\n.. foo::\n\n.. bar::\n")
+
+    result = cli_runner.invoke(cli_app, [str(test_file), "--baseline", str(baseline_file)])
+
+    assert write_result.exit_code == 0
+    assert "issue(s) accepted by the baseline." in write_result.output
+    assert result.exit_code == 1
+    assert '"bar"' in result.output
+    assert '"foo"' not in result.output
+
+
+def test_write_baseline_requires_baseline(
+    cli_app: typer.Typer, cli_runner: typer.testing.CliRunner
+) -> None:
+    """Test the file to write the baseline to is required."""
+    test_file = EXAMPLES_DIR / "good" / "rst.rst"
+
+    result = cli_runner.invoke(cli_app, [str(test_file), "--write-baseline"])
+
+    assert result.exit_code == 2
+
+
+def test_invalid_baseline(
+    cli_app: typer.Typer, cli_runner: typer.testing.CliRunner, tmp_path: pathlib.Path
+) -> None:
+    """Test invalid baseline files are rejected."""
+    test_file = EXAMPLES_DIR / "good" / "rst.rst"
+    baseline_file = tmp_path / "baseline.json"
+    baseline_file.write_text("[]")
+
+    result = cli_runner.invoke(cli_app, [str(test_file), "--baseline", str(baseline_file)])
+
+    assert result.exit_code == 2
@@ -0,0 +1,221 @@
+"""Tests for ``plugins`` module."""
+
+from __future__ import annotations
+
+import importlib.metadata
+import subprocess
+import sys
+import typing as t
+
+import pytest
+
+import rstcheck
+from rstcheck import _checker, plugins
+
+if t.TYPE_CHECKING:
+    import pathlib
+
+
+class SqlChecker(plugins.CodeBlockPlugin):
+    """Reports every line starting with ``DROP``."""
+
+    def check(self, source_code: str) -> t.Iterator[plugins.Issue]:
+        """Check SQL source."""
+        for line_number, line in enumerate(source_code.splitlines(), start=1):
+            if line.startswith("DROP"):
+                yield (line_number, "Do not drop.")
+
+
+class BatchChecker(SqlChecker):
+    """Records the batches it checked."""
+
+    kind = "batch"
+
+    def __init__(self) -> None:
+        """Initialize :py:class:`BatchChecker`."""
+        self.batches: list[list[str]] = []
+
+    def check_batch(self, sources: t.Sequence[str]) -> list[list[plugins.Issue]]:
+        """Check SQL sources."""
+        self.batches.append(list(sources))
+        return super().check_batch(sources)
+
+
+class GrepChecker(plugins.CodeBlockPlugin):
+    """Reports lines with ``bad`` found by ``grep``."""
+
+    kind = "subprocess"
+
+    def external_command(self, source_code: str) -> plugins.ExternalCommand | None:
+        """Get the grep command."""
+        return plugins.ExternalCommand(["sh", "-c", '! grep -n bad "$0" >&2'], ".txt")
+
+    def parse_output(
+        self,
+        output: str,
+        temporary_file_path: pathlib.Path,
+    ) -> t.Iterator[plugins.Issue]:
+        """Parse the grep output."""
+        for line in output.splitlines():
+            (line_number, _) = line.split(":", 1)
+            yield (int(line_number), "Found bad.")
+
+
+class NoPlugin:
+    """No subclass of :py:class:`rstcheck.plugins.CodeBlockPlugin`."""
+
+
+def _entry_points(monkeypatch: pytest.MonkeyPatch, **values: str) -> list[str]:
+    """Let the given entry points be discovered and record the discoveries."""
+    discoveries = []
+
+    def _discover(group: str) -> list[importlib.metadata.EntryPoint]:
+        discoveries.append(group)
+        return [
+            importlib.metadata.EntryPoint(name=name, value=value, group=group)
+            for name, value in values.items()
+        ]
+
+    monkeypatch.setattr(importlib.metadata, "entry_points", _discover)
+    return discoveries
+
+
+def test_entry_points_are_discovered_once_and_loaded_on_first_use(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test plugins of entry points are only created for the languages requested."""
+    discoveries = _entry_points(
+        monkeypatch, sql="tests.plugins_test:SqlChecker", broken="tests.missing:Checker"
+    )
+    registry = plugins.PluginRegistry(builtin_plugins={})
+
+    results = [registry.get("sql"), registry.get("sql"), registry.get("text")]
+
+    assert discoveries == [plugins.ENTRY_POINT_GROUP]
+    assert isinstance(results[0], SqlChecker)
+    assert results[1] is results[0]
+    assert results[2] is None
+
+
+@pytest.mark.parametrize(
+    "value", ["tests.missing:Checker", "tests.plugins_test:NoPlugin"], ids=["missing", "invalid"]
+)
+def test_plugins_which_cannot_be_loaded_are_skipped(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture, value: str
+) -> None:
+    """Test broken plugins are logged once and their language is not checked."""
+    _entry_points(monkeypatch, sql=value)
+    registry = plugins.PluginRegistry(builtin_plugins={})
+
+    results = [registry.get("sql"), registry.get("sql")]
+
+    assert results == [None, None]
+    assert len(caplog.records) == 1
+    assert "language 'sql'" in caplog.records[0].getMessage()
+
+
+def test_builtin_plugins_take_precedence(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test entry points are not discovered for languages with a built-in plugin."""
+    discoveries = _entry_points(monkeypatch, toml="tests.plugins_test:SqlChecker")
+    registry = plugins.PluginRegistry()
+
+    result = registry.get("toml")
+
+    assert discoveries == []
+    assert type(result).__name__ == "TomlChecker"
+
+
+def test_builtin_plugins_are_imported_on_first_use() -> None:
+    """Test the modules of plugins are not imported for documents without their languages."""
+    script = (
+        "import sys, rstcheck\n"
+        "session = rstcheck.Session()\n"
+        "session.check_text('.. code-block:: python\\n\\n    print()\\n')\n"
+        "print('rstcheck._checkers' in sys.modules)\n"
+        "session.check_text('.. code-block:: toml\\n\\n    a = 1\\n')\n"
+        "print('rstcheck._checkers' in sys.modules)\n"
+    )
+
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", script], capture_output=True, check=True, text=True
+    )
+
+    assert result.stdout.split() == ["False", "True"]
+
+
+@pytest.fixture
+def registry(monkeypatch: pytest.MonkeyPatch) -> plugins.PluginRegistry:
+    """Registry with the test plugins used by all checks."""
+    registry = plugins.PluginRegistry(builtin_plugins={})
+    registry.register("sql", SqlChecker())
+    registry.register("batchsql", BatchChecker())
+    registry.register("grep", GrepChecker())
+    monkeypatch.setattr(plugins, "registry", registry)
+    return registry
+
+
+SOURCE = """Title
+=====
+
+.. code-block:: sql
+
+    SELECT 1;
+    DROP TABLE a;
+
+.. code-block:: batchsql
+
+    DROP TABLE b;
+
+.. code-block:: batchsql
+
+    SELECT 2;
+
+.. code-block:: batchsql
+
+    DROP TABLE b;
+
+.. code-block:: python
+
+    print()
+"""
+
+
+def test_cpu_and_batch_plugins_check_code_blocks(registry: plugins.PluginRegistry) -> None:
+    """Test plugins check their code blocks and batch plugins get each source once."""
+    result = list(_checker.check_source(SOURCE))
+
+    assert [(error["line_number"], error["message"]) for error in result] == [
+        (7, "(sql) Do not drop."),
+        (11, "(batchsql) Do not drop."),
+        (19, "(batchsql) Do not drop."),
+    ]
+    batch_checker = registry.get("batchsql")
+    assert isinstance(batch_checker, BatchChecker)
+    assert batch_checker.batches == [["DROP TABLE b;", "SELECT 2;"]]
+
+
+@pytest.mark.usefixtures("registry")
+def test_ignored_languages_are_not_checked_by_plugins() -> None:
+    """Test plugins of ignored languages are not used."""
+    session = rstcheck.Session(ignore_languages="sql,batchsql")
+
+    result = session.check_text(SOURCE)
+
+    assert list(result) == []
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Depends on POSIX shell scripts.")
+@pytest.mark.usefixtures("registry")
+def test_subprocess_plugins_run_external_commands() -> None:
+    """Test subprocess plugins are run like external tools."""
+    source = "Title\n=====\n\n.. code-block:: grep\n\n    good\n    bad\n"
+    code_block_checker = _checker.CodeBlockChecker("<string>")
+
+    external_check = code_block_checker.external_check("bad", "grep")
+    result = rstcheck.Session().check_text(source)
+
+    assert external_check is not None
+    assert external_check.filename_suffix == ".txt"
+    assert [(error["line_number"], error["message"]) for error in result] == [
+        (7, "(grep) Found bad.")
+    ]
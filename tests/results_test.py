@@ -0,0 +1,45 @@
+"""Tests for ``results`` module."""
+
+from __future__ import annotations
+
+import pathlib
+
+from rstcheck_core import types
+
+from rstcheck.results import LintResults
+
+
+def test_iteration_keeps_order_and_values() -> None:
+    """Test stored issues are returned unchanged in order of insertion."""
+    errors = [
+        types.LintError(source_origin=pathlib.Path("a.rst"), line_number=3, message="Foo"),
+        types.LintError(source_origin="<stdin>", line_number=1, message="Bar"),
+        types.LintError(source_origin=pathlib.Path("a.rst"), line_number=0, message="Foo"),
+    ]
+
+    result = LintResults(errors)
+
+    assert list(result) == errors
+    assert len(result) == 3
+    assert result[1] == errors[1]
+
+
+def test_origins_and_messages_are_interned() -> None:
+    """Test equal origins and messages are only stored once."""
+    result = LintResults()
+
+    for line_number in range(100):
+        result.add(pathlib.Path("a.rst"), line_number, "Foo")
+    result.add(pathlib.Path("b.rst"), 1, "Foo")
+
+    assert result.source_origins == [pathlib.Path("a.rst"), pathlib.Path("b.rst")]
+    assert len(result._messages) == 1
+    assert len(result) == 101
+
+
+def test_empty_store_is_falsy() -> None:
+    """Test an empty store has length 0."""
+    result = LintResults()
+
+    assert not result
+    assert list(result) == []
@@ -0,0 +1,178 @@
+"""Tests for ``session`` module."""
+
+from __future__ import annotations
+
+import concurrent.futures
+import contextlib
+import pathlib
+import sys
+import threading
+import time
+import typing as t
+
+import docutils.parsers.rst
+import docutils.parsers.rst.directives
+import pytest
+from rstcheck_core import _sphinx, config
+
+import rstcheck
+from rstcheck import _checker
+from tests.conftest import EXAMPLES_DIR
+
+
+@pytest.mark.parametrize(
+    "test_file", sorted(EXAMPLES_DIR.glob("*/*.rst")), ids=lambda p: f"{p.parent.name}/{p.name}"
+)
+def test_check_file_matches_check_file(test_file: pathlib.Path) -> None:
+    """Test issues are the same as found by ``_checker.check_file``."""
+    expected = _checker.check_file(
+        test_file, config.RstcheckConfig(), overwrite_with_file_config=False
+    )
+    session = rstcheck.Session()
+
+    result = session.check_file(test_file)
+
+    assert list(result) == expected
+
+
+def test_check_text_uses_options() -> None:
+    """Test the options are used like by the CLI."""
+    test_file = EXAMPLES_DIR / "with_configuration" / "bad.rst"
+    rstcheck_config = config.RstcheckConfig(
+        config_path=pathlib.Path("NONE"), report_level="ERROR", ignore_languages="cpp"
+    )
+    expected = _checker.check_file(test_file, rstcheck_config)
+    session = rstcheck.Session(report_level="ERROR", ignore_languages="cpp")
+
+    result = session.check_text(test_file.read_text("utf-8"), source_file=test_file)
+
+    assert list(result) == expected
+    assert all("(cpp)" not in error["message"] for error in result)
+
+
+def test_config_file_is_loaded_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the passed config file is loaded on creation only."""
+    load_calls = []
+    load_config_file_from_path = config.load_config_file_from_path
+
+    def _load(*args: t.Any, **kwargs: t.Any) -> t.Any:  # noqa: ANN401
+        load_calls.append(args)
+        return load_config_file_from_path(*args, **kwargs)
+
+    monkeypatch.setattr(config, "load_config_file_from_path", _load)
+    test_file = EXAMPLES_DIR / "with_configuration" / "bad.rst"
+    session = rstcheck.Session(EXAMPLES_DIR / "with_configuration" / "rstcheck.ini")
+
+    results = [session.check_file(test_file), session.check_file(test_file)]
+
+    assert len(load_calls) == 1
+    assert session.config.report_level == config.ReportLevel.WARNING
+    assert list(results[0]) == list(results[1])
+    assert all("(cpp)" not in error["message"] for error in results[0])
+
+
+def test_config_files_are_searched_once_per_directory(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test config files of the directories of checked files are searched once per directory."""
+    search_calls = []
+    load_config_file_from_dir_tree = config.load_config_file_from_dir_tree
+
+    def _search(*args: t.Any, **kwargs: t.Any) -> t.Any:  # noqa: ANN401
+        search_calls.append(args)
+        return load_config_file_from_dir_tree(*args, **kwargs)
+
+    monkeypatch.setattr(config, "load_config_file_from_dir_tree", _search)
+    (tmp_path / ".rstcheck.cfg").write_text("[rstcheck]\nreport_level = NONE\n")
+    for name in ("a.rst", "b.rst"):
+        (tmp_path / name).write_text("Title\n===\n")
+    session = rstcheck.Session()
+
+    results = [session.check_file(tmp_path / "a.rst"), session.check_file(tmp_path / "b.rst")]
+
+    assert len(search_calls) == 1
+    assert [len(result) for result in results] == [0, 0]
+
+
+def test_options_win_over_config_files(tmp_path: pathlib.Path) -> None:
+    """Test passed options take precedence over found config files."""
+    (tmp_path / ".rstcheck.cfg").write_text("[rstcheck]\nreport_level = NONE\n")
+    (tmp_path / "a.rst").write_text("Title\n===\n")
+    session = rstcheck.Session(report_level="INFO")
+
+    result = session.check_file(tmp_path / "a.rst")
+
+    assert len(result) == 1
+
+
+def test_check_text_from_threads_matches_serial_checks() -> None:
+    """Test concurrent checks with different inline config find the same issues."""
+    sources = [
+        ".. rstcheck: ignore-directives=foo\n\n.. foo::\n\n.. bar::\n",
+        ".. rstcheck: ignore-roles=bar\n\n:foo:`x` and :bar:`y`\n",
+        ".. foo::\n\n:bar:`y`\n\n.. code-block:: python\n\n    print(\n",
+        "Title\n===\n\n.. code-block:: rst\n\n    .. foo::\n",
+    ] * 8
+    session = rstcheck.Session()
+    expected = [list(session.check_text(source)) for source in sources]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        result = [list(errors) for errors in executor.map(session.check_text, sources)]
+
+    assert result == expected
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Depends on POSIX shell scripts.")
+def test_external_checks_run_without_docutils_lock(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test other threads can parse while an external tool is running."""
+    compiler = tmp_path / "cc"
+    started = tmp_path / "started"
+    compiler.write_text(f"#!/bin/sh\ntouch {started}\nsleep 2\n")
+    compiler.chmod(0o755)
+    monkeypatch.setenv("CC", str(compiler))
+    session = rstcheck.Session()
+    thread = threading.Thread(
+        target=session.check_text, args=("Example\n=======\n\n.. code-block:: c\n\n    int x;\n",)
+    )
+    thread.start()
+    while not started.exists():
+        time.sleep(0.01)
+
+    start = time.perf_counter()
+    session.check_text("Title\n=====\n")
+    duration = time.perf_counter() - start
+    thread.join()
+
+    assert duration < 1
+
+
+class _SphinxOnlyDirective(docutils.parsers.rst.Directive):
+    """Directive registered by the fake Sphinx application."""
+
+    def run(self) -> list[t.Any]:
+        """Create no nodes."""
+        return []
+
+
+def test_sphinx_is_loaded_once_per_session(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the dummy Sphinx application is created once and its directives stay registered."""
+    entered = []
+
+    @contextlib.contextmanager
+    def load_sphinx_if_available() -> t.Iterator[None]:
+        entered.append(True)
+        docutils.parsers.rst.directives.register_directive("sphinx-only", _SphinxOnlyDirective)
+        yield
+
+    monkeypatch.setattr(_sphinx, "load_sphinx_if_available", load_sphinx_if_available)
+    session = rstcheck.Session(config_path=pathlib.Path("NONE"))
+
+    results = [
+        list(session.check_text(f"Example {index}\n==========\n\n.. sphinx-only::\n"))
+        for index in range(5)
+    ]
+
+    assert entered == [True]
+    assert results == [[]] * 5